@@ -1,21 +1,25 @@
 
 import sys
 import os
-import win32com.client
-import pandas as pd
+# Grading, the document backend, autosave and the task loader are imported
+# where TestWindow first needs them, so the login window shows without them
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QPushButton, QProgressBar,
-                             QComboBox, QFrame, QFileDialog, QMessageBox,
+                             QComboBox, QFrame, QMessageBox,
                              QTextEdit, QShortcut,
-                             QDesktopWidget,
                              QSlider)
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QIcon, QKeySequence
-from PyQt5.QtCore import QDateTime
-from datetime import datetime
+from PyQt5.QtGui import QKeySequence
 from PyQt5.QtWidgets import QSizeGrip
+from descriptions import DescriptionRenderer
+from exam_timer import ExamTimer
+from window_geometry import ScreenGeometry, WindowGeometry
+from styles import description_style
 # from PyQt5.QtCore import QWIDGETSIZE_MAX
 
+TIMER_STYLE = 'font-family: monospace; font-size: 12px; color: white;'
+ZOOM_DEBOUNCE_MS = 120  # Restyle the description once the zoom slider settles
+
 
 class TaskDetail:
     def __init__(self, task_id, description, required_actions, file_name):
@@ -26,19 +30,45 @@ class TaskDetail:
 
 
 class TestWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, project=None):
         super().__init__()
+        from backends import create_backend
+        from catalog import default_catalog
+        from document_sessions import DocumentSessions
+        from autosave import Autosaver
+        from session import SessionState
         
+        self.catalog = default_catalog()  # Indexed projects; tasks load on selection
+        self.project = project or (self.catalog.projects() or [None])[0]
+
         self.is_always_on_top = True
-        self.word_app = None
+        self.backend = create_backend()  # Word over COM, or the .docx directly
+        self.documents = DocumentSessions(self.backend)  # Open documents, by path
+        self.task_history = []  # Tasks in the order visited, to predict the next one
+        self.journal = None  # Session journal, opened by the startup thread
+        self.startup = None  # Startup work running off the UI thread
+        self.resumed_documents = {}  # Source path key -> copy restored from the last save
+        self.applied_font_size = None  # Font size the description stylesheet was built for
+        self.descriptions = DescriptionRenderer()  # Task descriptions, rendered once each
         self.source_doc = None
         self.current_task = 1
-        self.total_tasks = 10
-        self.task_states = {i: 'incomplete' for i in range(1, 11)}
+        self.total_tasks = self.project.task_count if self.project else 10
+        self.task_states = SessionState(self.total_tasks)  # One byte per task, with totals
+        self.task_states.subscribe(self.on_task_state_changed)
         self.task_details = {}  # Will store TaskDetail objects
+        self.task_results = {}  # Latest grading result per task
+        self.last_saved_path = None
         self.save_folder = self.create_save_folder()  # Initialize save folder
-
-        # Get screen dimensions
+        self.autosaver = None
+        if self.save_folder:
+            # Saves run on a worker thread, on an interval and on task changes
+            self.autosaver = Autosaver(self.backend, self.save_folder, self.autosave_state,
+                                       parent=self)
+            self.autosaver.saved.connect(self.on_autosaved)
+            self.autosaver.failed.connect(self.on_autosave_failed)
+
+        # Get screen dimensions, cached and refreshed when screens change
+        self.screens = ScreenGeometry(parent=self)
         self.screen_size = self.get_screen_size()
         
         
@@ -51,13 +81,19 @@ class TestWindow(QMainWindow):
         self.window_height = int(self.screen_size.height() * 0.2)  # 20% of screen height
         
         # Calculate position (centered horizontally, bottom of screen)
-        self.window_x = int((self.screen_size.width() - self.window_width) / 2)
-        self.window_y = int(self.screen_size.height() - self.window_height)
-        self.load_task_details()  # Load tasks from Excel
+        self.window_x = self.screen_size.x() + int((self.screen_size.width() - self.window_width) / 2)
+        self.window_y = self.screen_size.y() + int(self.screen_size.height() - self.window_height)
+        self.window_geometry = WindowGeometry(self, self.screens, self.backend.activate,
+                                              min_height=self.min_height)
+        self.graders = {}  # One per source document, built when first needed
+        self.progress_bar = None
         self.initUI()
         
         # Position window at bottom
         self.position_window_bottom()
+
+        # Tasks and Word load once the window is on screen
+        QTimer.singleShot(0, self.finish_startup)
         
 
     def set_window_flags(self):
@@ -84,21 +120,13 @@ class TestWindow(QMainWindow):
         self.show()
         
         # Reactivate Word window if it exists
-        if self.word_app:
-            try:
-                self.word_app.Activate()
-            except:
-                pass
+        self.backend.activate()
 
     def toggle_always_on_top(self):
         """Toggle always-on-top state"""
         self.is_always_on_top = not self.is_always_on_top
         self.update_pin_button_style()
         self.set_window_flags()
-    def position_window_bottom(self):
-        """Position window at the bottom of the screen"""
-        self.move(self.window_x, self.window_y)
-
     def update_pin_button_style(self):
         """Update pin button appearance based on state"""
         if self.is_always_on_top:
@@ -131,32 +159,6 @@ class TestWindow(QMainWindow):
             ''')
             self.pin_button.setToolTip("Click to pin window on top")
 
-    def launch_word(self):
-        """Launch Microsoft Word application with window positioning"""
-        try:
-            # Create Word application instance
-            self.word_app = win32com.client.Dispatch("Word.Application")
-            self.word_app.Visible = True
-            
-            # Position Word window
-            if hasattr(self.word_app, 'WindowState'):
-                self.word_app.WindowState = 1  # Maximize Word window
-            
-            # Set initial file
-            self.open_source_document(1)
-
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Error launching Word: {str(e)}")
-
-    def resizeEvent(self, event):
-        """Handle window resize events"""
-        super().resizeEvent(event)
-        # Ensure Word window is visible if it exists
-        if self.word_app:
-            try:
-                self.word_app.Activate()
-            except:
-                pass
     def create_zoom_control(self):
         """Create zoom control slider"""
         zoom_container = QHBoxLayout()
@@ -199,7 +201,12 @@ class TestWindow(QMainWindow):
                 border: 1px solid #FFF0AA;
             }
         ''')
-        self.zoom_slider.valueChanged.connect(self.update_font_size)
+        # Dragging the slider emits every step; only the value it settles on is applied
+        self.zoom_timer = QTimer(self)
+        self.zoom_timer.setSingleShot(True)
+        self.zoom_timer.setInterval(ZOOM_DEBOUNCE_MS)
+        self.zoom_timer.timeout.connect(self.update_font_size)
+        self.zoom_slider.valueChanged.connect(lambda value: self.zoom_timer.start())
         
         # Create zoom in label
         zoom_in_label = QLabel("A+")
@@ -219,93 +226,22 @@ class TestWindow(QMainWindow):
         
         return zoom_container
 
-    def update_font_size(self):
-        """Update the font size of the description text"""
-        font_size = self.zoom_slider.value()
-        self.description_text.setStyleSheet(f'''
-            QTextEdit {{
-                background-color: transparent;
-                color: white;
-                border: none;
-                font-size: {font_size}px;
-                line-height: 1.6;
-                selection-background-color: rgba(255, 215, 0, 0.3);
-                selection-color: white;
-            }}
-            QTextEdit:focus {{
-                border: none;
-                outline: none;
-            }}
-            QScrollBar:vertical {{
-                border: none;
-                background: rgba(255, 255, 255, 0.1);
-                width: 10px;
-                margin: 0;
-            }}
-            QScrollBar::handle:vertical {{
-                background: rgba(255, 255, 255, 0.3);
-                min-height: 20px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background: rgba(255, 255, 255, 0.4);
-            }}
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                height: 0;
-                background: none;
-            }}
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
-                background: none;
-            }}
-        ''')
-
-
-    def load_task_details(self):
-        try:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            excel_path = os.path.join(
-                current_dir, "Project1_Requirements.xlsx")
-
-            if not os.path.exists(excel_path):
-                QMessageBox.warning(
-                    self, "Error", f"Task file not found: {excel_path}")
-                return
-
-            df = pd.read_excel(excel_path)
-
-            for _, row in df.iterrows():
-                task_id = row['TaskID']
-                task_detail = TaskDetail(
-                    task_id=task_id,
-                    description=row['Description'],
-                    required_actions=row['RequiredActions'].split(
-                        ';') if isinstance(row['RequiredActions'], str) else [],
-                    file_name=row['FileName']
-                )
-                self.task_details[task_id] = task_detail
-
-        except Exception as e:
-            QMessageBox.warning(
-                self, "Error", f"Error loading task details: {str(e)}")
-
     def get_screen_size(self):
         """Get the screen size of the primary display"""
-        desktop = QDesktopWidget()
-        screen_rect = desktop.availableGeometry(desktop.primaryScreen())
-        return screen_rect
+        return self.screens.primary
 
     def center_window(self):
         """Center the window on the screen"""
         frame_geometry = self.frameGeometry()
-        screen_center = QDesktopWidget().availableGeometry().center()
-        frame_geometry.moveCenter(screen_center)
+        frame_geometry.moveCenter(self.screens.area_for(frame_geometry).center())
         self.move(frame_geometry.topLeft())
 
     def create_save_folder(self):
         """Create folder structure for saving files"""
         try:
             current_dir = os.path.dirname(os.path.abspath(__file__))
-            save_folder = os.path.join(current_dir, "Completed_Tasks")
+            save_folder = os.environ.get('MOS_SAVE_FOLDER') or os.path.join(
+                current_dir, "Completed_Tasks")
             
             # Create main save folder if it doesn't exist
             if not os.path.exists(save_folder):
@@ -323,63 +259,51 @@ class TestWindow(QMainWindow):
             return None
 
     def save_current_document(self):
-        """Save the current document"""
+        """Save the current document and wait until it has been written"""
+        from autosave import SaveTimeout
         try:
-            if not self.word_app or not self.source_doc:
+            if not self.source_doc or not self.autosaver:
                 return False
-                
-            # Create save folders if they don't exist
-            if not hasattr(self, 'save_folder'):
-                self.save_folder = self.create_save_folder()
-                
-            if not self.save_folder:
+
+            # The autosave worker does the writing, so saves never overlap
+            result = self.autosaver.save_now('manual')
+            if result is None:
                 return False
-                
-            # Create save path
-            task_folder = os.path.join(self.save_folder, f"Task_{self.current_task}")
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"Task_{self.current_task}_{timestamp}.docx"
-            save_path = os.path.join(task_folder, filename)
-            
-            # Save document
-            self.source_doc.SaveAs(str(save_path))
+            if not result.ok:
+                raise Exception(result.error)
+            self.last_saved_path = result.working_copy
             return True
             
+        except SaveTimeout:
+            # Word is hung or showing a dialog; the window stays usable
+            QMessageBox.warning(self, "Error", "Word did not finish saving in time. "
+                                               "Close any open dialog in Word and try again.")
+            return False
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error saving document: {str(e)}")
             return False
 
-    def closeEvent(self, event):
-        """Handle application close event"""
-        try:
-            if self.word_app:
-                # Check if there are unsaved changes
-                if self.source_doc and not self.source_doc.Saved:
-                    reply = QMessageBox.question(
-                        self, 
-                        'Save Changes?',
-                        'Do you want to save your changes before closing?',
-                        QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
-                    )
-                    
-                    if reply == QMessageBox.Cancel:
-                        event.ignore()
-                        return
-                    elif reply == QMessageBox.Yes:
-                        if self.save_current_document():
-                            self.show_save_summary()
-                        
-                # Close Word application
-                try:
-                    if self.source_doc:
-                        self.source_doc.Close(SaveChanges=False)
-                    self.word_app.Quit()
-                except:
-                    pass
-        except:
-            pass
-            
-        event.accept()
+    def autosave_state(self):
+        """Document, task and source path the autosaver should save, or None"""
+        if not self.source_doc:
+            return None
+        return self.source_doc, self.current_task, self.current_doc_path
+
+    def request_autosave(self, reason, force=False, callback=None):
+        """Queue a background save; returns False if nothing was queued"""
+        if not self.autosaver:
+            return False
+        return self.autosaver.request(reason, force, callback)
+
+    def on_autosaved(self, result):
+        """Show when the work was last saved"""
+        self.journal_event('save', durable=True, task=result.task, source=result.source,
+                           manifest=result.manifest_path)
+        self.timer_label.setToolTip(
+            f"Last saved {result.finished_at.strftime('%H:%M:%S')} ({result.reason})")
+
+    def on_autosave_failed(self, result):
+        self.timer_label.setToolTip(f"Autosave failed: {result.error}")
 
     def show_save_summary(self):
         """Show summary of saved files"""
@@ -420,102 +344,6 @@ class TestWindow(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error showing summary: {str(e)}")
 
-    def moveEvent(self, event):
-        """Handle window move events to maintain bottom position"""
-        super().moveEvent(event)
-        new_pos = event.pos()
-        
-        # If window is moved vertically, reset to bottom
-        screen_bottom = self.screen_size.height()
-        if new_pos.y() + self.height() != screen_bottom:
-            self.move(new_pos.x(), screen_bottom - self.height())
-        
-        # Keep window within screen bounds horizontally
-        if new_pos.x() < 0:
-            self.move(0, new_pos.y())
-        elif new_pos.x() + self.width() > self.screen_size.width():
-            self.move(self.screen_size.width() - self.width(), new_pos.y())
-
-    def position_window_bottom(self):
-        """Position window at the bottom of the screen"""
-        screen_bottom = self.screen_size.height()
-        self.move(self.window_x, screen_bottom - self.height())
-
-    
-    def update_layout_for_resize(self):
-        """Update layout elements based on window size"""
-        current_width = self.width()
-        
-        # Update button widths
-        nav_button_width = int(current_width * 0.1)  # 10% of window width
-        for btn in [self.prev_btn, self.mark_complete_btn, 
-                   self.mark_review_btn, self.next_btn]:
-            if btn:
-                btn.setFixedWidth(nav_button_width)
-        
-        # Update task button widths
-        task_button_width = int(current_width * 0.08)  # 8% of window width
-        for btn in self.task_buttons:
-            if btn:
-                btn.setFixedWidth(task_button_width)
-        
-        # Update progress bar width
-        progress_bar = self.findChild(QProgressBar)
-        if progress_bar:
-            progress_bar.setFixedWidth(int(current_width * 0.15))
-        
-        # Update description text minimum width
-        if hasattr(self, 'description_text'):
-            self.description_text.setMinimumWidth(int(current_width * 0.95))
-
-    def resizeEvent(self, event):
-        """Handle window resize events"""
-        super().resizeEvent(event)
-        
-        # Don't allow height to be less than minimum
-        if self.height() < self.min_height:
-            self.resize(self.width(), self.min_height)
-        
-        # Don't allow width to be less than minimum
-        if self.width() < self.min_width:
-            self.resize(self.min_width, self.height())
-        
-        # Update resize grip position
-        if hasattr(self, 'resize_grip'):
-            self.resize_grip.move(
-                self.width() - self.resize_grip.width(),
-                self.height() - self.resize_grip.height()
-            )
-        
-        # Update layout elements
-        self.update_layout_for_resize()
-        
-        # Maintain bottom position
-        self.position_window_bottom()
-        
-        # Ensure Word window remains visible
-        if self.word_app:
-            try:
-                self.word_app.Activate()
-            except:
-                pass
-
-    def moveEvent(self, event):
-        """Handle window move events to maintain bottom position"""
-        super().moveEvent(event)
-        new_pos = event.pos()
-        
-        # Always keep window at screen bottom while allowing horizontal movement
-        screen_bottom = self.screen_size.height()
-        self.move(new_pos.x(), screen_bottom - self.height())
-        
-        # Keep window within screen bounds horizontally
-        if new_pos.x() < 0:
-            self.move(0, screen_bottom - self.height())
-        elif new_pos.x() + self.width() > self.screen_size.width():
-            self.move(self.screen_size.width() - self.width(), 
-                     screen_bottom - self.height())
-            
     def init_resize_grip(self):
         """Initialize the resize grip"""
         self.resize_grip = QSizeGrip(self)
@@ -608,9 +436,11 @@ class TestWindow(QMainWindow):
 
         # Create project selection combo box
         self.project_combo = QComboBox()
-        self.project_combo.addItem('Project 1 - Word Associate 2019/365')
-        self.project_combo.addItem('Project 2 - Word Associate 2019/365')
-        self.project_combo.addItem('Project 3 - Word Associate 2019/365')
+        for project in self.catalog.projects(self.project.exam if self.project else None):
+            self.project_combo.addItem(project.title, project.id)
+        if self.project:
+            self.project_combo.setCurrentIndex(self.project_combo.findData(self.project.id))
+        self.current_project_index = self.project_combo.currentIndex()
         self.project_combo.setFixedWidth(250)
         self.project_combo.setStyleSheet('''
             QComboBox {
@@ -668,6 +498,7 @@ class TestWindow(QMainWindow):
         progress_bar.setValue(0)
         progress_bar.setFixedWidth(int(self.window_width * 0.15))
         progress_bar.setFixedHeight(24)
+        self.progress_bar = progress_bar
         progress_bar.setStyleSheet('''
             QProgressBar {
                 border: 1px solid white;
@@ -685,7 +516,7 @@ class TestWindow(QMainWindow):
 
         # Timer label
         self.timer_label = QLabel('00:00:00')
-        self.timer_label.setStyleSheet('font-family: monospace; font-size: 12px; color: white;')
+        self.timer_label.setStyleSheet(TIMER_STYLE)
 
         # Add all elements to top bar
         top_bar.addWidget(self.pin_button)
@@ -698,21 +529,11 @@ class TestWindow(QMainWindow):
         top_bar.addStretch()
         top_bar.addWidget(self.timer_label)
 
-        # Create task bar
-        task_bar = QHBoxLayout()
-        task_bar.setSpacing(2)  # Reduced spacing between buttons
-
-        # Add task buttons with reduced size
-        self.task_buttons = []
-        button_width = int(self.window_width * 0.08)  # Slightly wider buttons
-        for i in range(1, self.total_tasks + 1):
-            task_btn = QPushButton(f'Task {i}')
-            task_btn.setFixedHeight(24)  # Match other button heights
-            task_btn.setFixedWidth(button_width)
-            task_btn.setStyleSheet(self.get_task_button_style())
-            task_btn.clicked.connect(lambda checked, num=i: self.go_to_task(num))
-            self.task_buttons.append(task_btn)
-            task_bar.addWidget(task_btn)
+        # Create task strip; it only paints the tasks in view, however many there are
+        from task_strip import TaskStrip
+        self.task_strip = TaskStrip(self.task_states)
+        self.task_strip.set_item_size(int(self.window_width * 0.08), 24)
+        self.task_strip.task_selected.connect(self.go_to_task)
 
         # Create content area
         content_layout = QHBoxLayout()
@@ -820,26 +641,138 @@ class TestWindow(QMainWindow):
 
         # Add all layouts to main layout
         main_layout.addLayout(top_bar)
-        main_layout.addLayout(task_bar)
+        main_layout.addWidget(self.task_strip)
         main_layout.addWidget(description_container, 1)
         main_layout.addLayout(bottom_bar)
 
         # Initialize UI state
         self.update_navigation_buttons()
-        self.update_task_buttons()
-        self.update_task_description(self.current_task)
-
-        # Start timer and launch Word
-        self.seconds = 0
+        self.update_task_strip()
+        self.show_startup_progress("Loading tasks...")
+
+        # Timer starts once Word is ready (see finish_startup). The exam clock
+        # runs off a monotonic clock; the QTimer tick only polls it
+        self.seconds = 0  # Whole seconds shown on the timer label
+        self.exam_timer = ExamTimer()
+        self.setup_time_limit()
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_timer)
-        self.timer.start(1000)
-        self.launch_word()
         # Update resize grip position at the end
         self.resize_grip.move(
             self.width() - self.resize_grip.width(),
             self.height() - self.resize_grip.height()
         )
+
+    def index_task_search(self):
+        """Let the task strip search the loaded tasks' descriptions and actions"""
+        self.task_strip.set_texts(dict(
+            (number, ' '.join([task.description] + list(task.required_actions)))
+            for number, task in self.task_details.items()))
+
+    def show_startup_progress(self, message):
+        """Show what startup is doing, with the controls disabled until it is done"""
+        for btn in [self.prev_btn, self.mark_complete_btn, self.mark_review_btn,
+                    self.next_btn, self.submit_btn, self.restart_btn, self.task_strip]:
+            btn.setEnabled(False)
+        self.description_text.setDocument(self.descriptions.message(
+            f"<div style='margin: 5px 0; color: #2b579a;'>{message}</div>"))
+
+    def finish_startup(self):
+        """Load tasks, read the journal and start Word on a worker thread once the window
+        has been painted"""
+        from document_sessions import DocumentSessions
+        from startup import Startup
+        self.startup = Startup(self.project, self.backend, self.save_folder, self.total_tasks,
+                               DocumentSessions.key, parent=self)
+        self.startup.progress.connect(self.show_startup_progress)
+        self.startup.finished.connect(self.on_startup_finished)
+        self.startup.start()
+
+    def on_startup_finished(self, result):
+        """Apply what the startup thread loaded, open the first document and start the clock"""
+        self.startup = None
+        for message in result.errors:
+            QMessageBox.warning(self, "Error", message)
+        self.load_task_details()  # Records are already loaded, or the error is shown now
+        self.index_task_search()
+        if result.journal is not None:
+            self.resume_session(result.journal, result.restored)  # Pick up after a crash
+        if result.backend_ready:
+            self.documents.start_prefetch()  # Open likely next documents in the background
+            self.open_source_document(self.current_task)
+
+        # Ready: enable the controls and start the exam clock
+        for btn in [self.mark_complete_btn, self.mark_review_btn,
+                    self.submit_btn, self.restart_btn, self.task_strip]:
+            btn.setEnabled(True)
+        self.update_task_ui()
+        self.update_task_description(self.current_task)
+        from exam_timer import TICK_MS
+        self.exam_timer.start(self.current_task)
+        self.timer.start(TICK_MS)
+
+    def resume_session(self, journal, restored):
+        """Restore an unfinished session of this project from the journal, or start one
+
+        restored maps source paths to the copies the startup thread rebuilt from their
+        last saves; documents are reopened from those rather than from the source.
+        """
+        from startup import resumable
+        state = journal.state
+        project_id = self.project.id if self.project else None
+        if resumable(journal, self.project, self.total_tasks):
+            self.task_states.restore(state['session'])
+            self.current_task = state['current_task']
+            self.seconds = state['seconds']
+            self.exam_timer.reset(state['seconds'], dict(
+                (int(task), seconds) for task, seconds in state.get('task_seconds', {}).items()))
+            self.show_elapsed()
+            self.resumed_documents = dict(restored)
+        else:
+            journal.record('start', durable=True, project=project_id, count=self.total_tasks)
+        self.journal = journal
+
+    def stop_autosave(self):
+        """Finish queued saves, then close the journal with the last of them recorded"""
+        if self.autosaver:
+            if not self.autosaver.stop():
+                QMessageBox.warning(self, "Error", "The last save did not finish in time; "
+                                                   "the latest changes may not have been saved.")
+            # Results still queued for the UI thread would arrive after the journal closed
+            self.autosaver.saved.disconnect(self.on_autosaved)
+            result = self.autosaver.last_result
+            if result is not None and result.ok:
+                self.journal_event('save', durable=True, task=result.task, source=result.source,
+                                   manifest=result.manifest_path)
+            self.autosaver = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def journal_event(self, kind, durable=False, **fields):
+        """Append an event to the session journal, once there is one"""
+        if self.journal:
+            self.journal.record(kind, durable, **fields)
+
+    def grader_for(self, task_number):
+        """Grader for the tasks on a task's source document, with results cached next to the saves
+
+        Submissions are graded against the pristine source document, so only
+        what the candidate changed earns credit.
+        """
+        file_name = self.task_details[task_number].file_name
+        grader = self.graders.get(file_name)
+        if grader is None:
+            from grading import Grader, ResultCache
+            cache = None
+            if self.save_folder:
+                # Regrading an unchanged document is then a lookup by part hashes
+                cache = ResultCache(os.path.join(self.save_folder, '.grading-cache'))
+            tasks = [task for task in self.task_details.values() if task.file_name == file_name]
+            grader = self.graders[file_name] = Grader(
+                tasks, cache=cache, original=self.source_document_path(file_name))
+        return grader
+
     def end_project(self):
         """Handle ending the current project"""
         reply = QMessageBox.question(
@@ -850,25 +783,27 @@ class TestWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            from com_dispatcher import DispatchTimeout
+            try:
+                dirty = self.documents.is_dirty()
+            except DispatchTimeout:
+                dirty = True  # Word did not answer; ask rather than lose work
             # Save final state if needed
-            if self.source_doc and not self.source_doc.Saved:
+            if dirty:
                 save_reply = QMessageBox.question(
                     self,
                     'Save Changes',
                     'Do you want to save your changes before ending?',
                     QMessageBox.Yes | QMessageBox.No
                 )
-                if save_reply == QMessageBox.Yes:
-                    self.save_current_document()
+                if save_reply == QMessageBox.Yes and not self.save_current_document():
+                    return  # Stay in the project rather than lose the work
             
             # Close Word and return to project selection
-            if self.word_app:
-                try:
-                    if self.source_doc:
-                        self.source_doc.Close(SaveChanges=False)
-                    self.word_app.Quit()
-                except:
-                    pass
+            self.stop_autosave()
+            self.documents.shutdown()
+            self.backend.quit()
+            self.source_doc = None
             
             # Create and show new skill review window
             self.skill_window = SkillReviewWindow()
@@ -884,12 +819,12 @@ class TestWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
-            # Save current project state if needed
-            self.save_current_document()
+            # Save current project state in the background
+            self.request_autosave('project change', force=True)
             
-            # Reset states
+            # Reset states (task states are rebuilt for the new project's tasks)
             self.current_task = 1
-            self.task_states = {i: 'incomplete' for i in range(1, 11)}
+            self.task_results = {}
             
             # Load new project
             self.load_project(index)
@@ -902,18 +837,34 @@ class TestWindow(QMainWindow):
         self.current_project_index = project_index
         
         try:
+            # Let the queued save finish, then close the old project's documents
+            if self.autosaver:
+                self.autosaver.flush()
+            self.documents.close_all()
+            self.source_doc = None
+
+            self.exam_timer.pause()  # Loading is not exam time
+
+            # Tasks are only read now, from the workbook or its compiled cache
+            self.project = self.catalog.get(self.project_combo.itemData(project_index))
+            self.task_details = {}
+            self.task_history = []
+            self.descriptions.clear(self.description_text)
+            self.resumed_documents = {}
+            self.load_task_details()
+            self.graders = {}
+            self.total_tasks = len(self.task_details)
+            self.task_states.reset(self.total_tasks)  # Repaints the task strip and progress
+            self.index_task_search()
+            self.journal_event('start', durable=True,
+                               project=self.project.id if self.project else None,
+                               count=self.total_tasks)
+
             # Reset UI
-            self.update_task_buttons()
             self.update_navigation_buttons()
             
-            # Reset progress
-            progress_bar = self.findChild(QProgressBar)
-            if progress_bar:
-                progress_bar.setValue(0)
-            
             # Reset timer
-            self.seconds = 0
-            self.timer_label.setText('00:00:00')
+            self.restart_clock()
             
             # Load first task of new project
             self.current_task = 1
@@ -926,7 +877,7 @@ class TestWindow(QMainWindow):
     def submit_project(self):
         """Handle project submission"""
         # Check if all tasks are complete
-        all_complete = all(state == 'complete' for state in self.task_states.values())
+        all_complete = self.task_states.all_complete
         
         if not all_complete:
             reply = QMessageBox.question(
@@ -938,8 +889,15 @@ class TestWindow(QMainWindow):
             if reply == QMessageBox.No:
                 return
 
-        # Save final state
-        if self.save_current_document():
+        # Save final state in the background; finish_submit runs once it is written
+        if not self.request_autosave('submit', force=True, callback=self.finish_submit):
+            QMessageBox.warning(self, "Error", "Failed to save project state")
+
+    def finish_submit(self, result):
+        """Complete a submission after its save has finished"""
+        if result.ok:
+            self.last_saved_path = result.working_copy
+
             # Show completion message
             QMessageBox.information(
                 self,
@@ -951,7 +909,7 @@ class TestWindow(QMainWindow):
             next_index = (self.project_combo.currentIndex() + 1) % self.project_combo.count()
             self.project_combo.setCurrentIndex(next_index)
         else:
-            QMessageBox.warning(self, "Error", "Failed to save project state")
+            QMessageBox.warning(self, "Error", f"Failed to save project state: {result.error}")
 
     def restart_project(self):
         """Restart current project"""
@@ -965,20 +923,14 @@ class TestWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             # Reset states
             self.current_task = 1
-            self.task_states = {i: 'incomplete' for i in range(1, 11)}
+            self.task_states.reset()  # Repaints the task strip and progress
+            self.task_results = {}
             
             # Reset UI
-            self.update_task_buttons()
             self.update_navigation_buttons()
             
-            # Reset progress
-            progress_bar = self.findChild(QProgressBar)
-            if progress_bar:
-                progress_bar.setValue(0)
-            
             # Reset timer
-            self.seconds = 0
-            self.timer_label.setText('00:00:00')
+            self.restart_clock()
             
             # Load first task
             self.update_task_description(self.current_task)
@@ -1005,31 +957,14 @@ class TestWindow(QMainWindow):
         # Update layout elements
         self.update_layout_for_resize()
         
-        # Ensure Word window remains visible
-        if self.word_app:
-            try:
-                self.word_app.Activate()
-            except:
-                pass
+        # Ensure Word window remains visible, without a COM call per resize step
+        self.window_geometry.resized()
 
     def moveEvent(self, event):
         """Handle window move events"""
         super().moveEvent(event)
-        new_pos = event.pos()
-        new_height = self.height()  # Get current height
-        
-        # Calculate maximum allowed height
-        max_height = self.screen_size.height() - new_pos.y()
-        
-        # Keep window within vertical bounds
-        if new_height > max_height:
-            self.resize(self.width(), max_height)
-        
-        # Keep window within horizontal bounds
-        if new_pos.x() < 0:
-            self.move(0, new_pos.y())
-        elif new_pos.x() + self.width() > self.screen_size.width():
-            self.move(self.screen_size.width() - self.width(), new_pos.y())
+        # Kept on screen once the drag settles, not by moving from inside this handler
+        self.window_geometry.moved()
 
     def update_layout_for_resize(self):
         """Update layout elements based on window size"""
@@ -1047,15 +982,11 @@ class TestWindow(QMainWindow):
                 btn.setFixedWidth(nav_button_width)
                 btn.setFixedHeight(button_height)
         
-        # Update task button dimensions
-        task_button_width = int(current_width * 0.08)  # 8% of window width
-        for btn in self.task_buttons:
-            if btn:
-                btn.setFixedWidth(task_button_width)
-                btn.setFixedHeight(button_height)
+        # Update task strip item dimensions
+        self.task_strip.set_item_size(int(current_width * 0.08), button_height)  # 8% of window width
         
         # Update progress bar dimensions
-        progress_bar = self.findChild(QProgressBar)
+        progress_bar = self.progress_bar
         if progress_bar:
             progress_bar.setFixedWidth(int(current_width * 0.15))
             progress_bar.setFixedHeight(button_height)
@@ -1063,167 +994,46 @@ class TestWindow(QMainWindow):
         # Update description text size
         if hasattr(self, 'description_text'):
             self.description_text.setMinimumWidth(int(current_width * 0.95))
-            # Adjust font size based on window height
-            current_font_size = self.zoom_slider.value()
-            self.update_font_size()  # This will trigger font size update
+            self.update_font_size()
 
     def position_window_bottom(self):
         """Position window at the bottom of the screen maintaining current height"""
-        current_height = self.height()
-        screen_bottom = self.screen_size.height()
-        self.move(self.window_x, screen_bottom - current_height)
-    def update_task_description(self, task_number):
-        """Update the task description panel with enhanced formatting and black text"""
-        if task_number in self.task_details:
-            task = self.task_details[task_number]
-            font_size = self.zoom_slider.value()
-            description_text = f"""
-            <div style='margin: 5px 0;'>
-                <div style='margin: 0 0 8px 0; font-size: {font_size}px; color: black;'>{task.description}</div>
-                <p style='color: #2b579a; font-weight: bold; margin: 5px 0; font-size: {font_size}px;'>Required Actions:</p>
-                <ul style='margin: 0; padding-left: 20px; font-size: {font_size}px; color: black;'>
-            """
-            for action in task.required_actions:
-                description_text += f"<li style='margin: 2px 0;'>{action.strip()}</li>"
-            description_text += "</ul></div>"
-            
-            self.description_text.setHtml(description_text)
-        else:
-            default_text = f"""
-            <div style='margin: 5px 0; color: black;'>
-                <div style='margin: 0 0 8px 0;'>Task details not available.</div>
-            </div>
-            """
-            self.description_text.setHtml(default_text)
-
+        self.window_geometry.dock_bottom(self.window_x)
     def update_font_size(self):
         """Update the font size of the description text"""
         font_size = self.zoom_slider.value()
-        self.description_text.setStyleSheet(f'''
-            QTextEdit {{
-                background-color: white;
-                color: black;  /* Changed to black text */
-                border: none;
-                font-size: {font_size}px;
-                line-height: 1.6;
-                selection-background-color: #2b579a;
-                selection-color: white;
-            }}
-            QTextEdit:focus {{
-                border: none;
-                outline: none;
-            }}
-            QScrollBar:vertical {{
-                border: none;
-                background: #f0f0f0;
-                width: 10px;
-                margin: 0;
-            }}
-            QScrollBar::handle:vertical {{
-                background: #2b579a;
-                min-height: 20px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background: #1e3f7a;
-            }}
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
-                height: 0;
-                background: none;
-            }}
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
-                background: none;
-            }}
-        ''')
+        if font_size == self.applied_font_size:
+            return  # Qt would re-parse and re-polish an identical stylesheet
+        self.applied_font_size = font_size
+        self.description_text.setStyleSheet(description_style(font_size))
+        # Rendered descriptions take the new size as they are shown, without a rebuild
+        self.descriptions.font_size = font_size
+        self.descriptions.apply_font(self.description_text.document())
 
     def update_task_description(self, task_number):
-        """Update the task description panel with enhanced formatting and black text"""
-        if task_number in self.task_details:
-            task = self.task_details[task_number]
-            font_size = self.zoom_slider.value()
-            description_text = f"""
-            <div style='margin-bottom: 10px;'>
-                <h3 style='color: #2b579a; margin: 0 0 10px 0; font-size: {font_size + 2}px;'>Task {task_number}</h3>
-                <div style='margin: 0 0 10px 0; font-size: {font_size}px; color: black;'>{task.description}</div>
-                <p style='color: #2b579a; font-weight: bold; margin: 5px 0; font-size: {font_size}px;'>Required Actions:</p>
-                <ul style='margin: 0; padding-left: 20px; font-size: {font_size}px; color: black;'>
-            """
-            for action in task.required_actions:
-                description_text += f"<li style='margin: 3px 0;'>{action.strip()}</li>"
-            description_text += "</ul></div>"
-            
-            self.description_text.setHtml(description_text)
-        else:
-            default_text = f"""
-            <div style='margin-bottom: 10px; color: black;'>
-                <h3 style='color: #2b579a; margin: 0 0 10px 0;'>Task {task_number}</h3>
-                <div style='margin: 0 0 10px 0;'>Task details not available.</div>
-            </div>
-            """
-            self.description_text.setHtml(default_text)
-
-
-    def go_to_task(self, task_number):
-        """Go to a specific task number"""
-        if 1 <= task_number <= self.total_tasks:
-            self.current_task = task_number
-            self.update_task_ui()
-            self.update_task_description(task_number)
-            
-            # Only open document if it's a different file
-            if task_number in self.task_details:
-                task = self.task_details[task_number]
-                file_name = task.file_name
-                current_dir = os.path.dirname(os.path.abspath(__file__))
-                new_path = os.path.join(current_dir, str(file_name))
-                
-                if not hasattr(self, 'current_doc_path') or self.current_doc_path != new_path:
-                    self.open_source_document(task.file_name)
-
-
-    def update_task_ui(self):
-        """Update the UI elements for the current task"""
-        # Update navigation buttons
-        self.update_navigation_buttons()
-
-        # Update task buttons
-        self.update_task_buttons()
-
-        # Update task description
-        self.update_task_description(self.current_task)
-
-        # Update window title
-        self.setWindowTitle(f'Task {self.current_task} of {self.total_tasks}')
+        """Show a task's description, rendered the first time and reused afterwards"""
+        task = self.task_details.get(task_number)
+        self.description_text.setDocument(self.descriptions.document(task_number, task))
 
     def load_task_details(self):
         """Load task details from Excel file"""
         try:
-            # Get the directory of the script
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            excel_path = os.path.join(
-                current_dir, "Project1_Requirements.xlsx")
-
-            if not os.path.exists(excel_path):
+            if self.project is None:
                 QMessageBox.warning(
-                    self, "Error", f"Task file not found: {excel_path}")
+                    self, "Error", f"No project workbooks found in {self.catalog.root}")
                 # Initialize with default task if file not found
                 self.init_default_tasks()
                 return
 
-            # Read Excel file
-            df = pd.read_excel(excel_path)
-
-            # Process each row into TaskDetail objects
-            for _, row in df.iterrows():
-                task_id = row['TaskID']
+            # Read the sheet XML directly; later launches hit the compiled cache
+            for record in self.project.load_tasks():
                 task_detail = TaskDetail(
-                    task_id=task_id,
-                    description=row['Description'],
-                    required_actions=row['RequiredActions'].split(
-                        ';') if isinstance(row['RequiredActions'], str) else [],
-                    file_name=row['FileName']
+                    task_id=record['task_id'],
+                    description=record['description'],
+                    required_actions=record['required_actions'],
+                    file_name=record['file_name']
                 )
-                self.task_details[task_id] = task_detail
+                self.task_details[record['task_id']] = task_detail
 
         except Exception as e:
             QMessageBox.warning(
@@ -1241,22 +1051,6 @@ class TestWindow(QMainWindow):
                 file_name="2019_WE_101_Houseboating.docx"
             )
 
-    def verify_task_completion(self, task_number):
-        """Verify if the task requirements are met"""
-        if task_number not in self.task_details:
-            return False
-
-        task = self.task_details[task_number]
-        try:
-            # This is where you would implement specific checks for each task
-            # For example, checking formatting, content, etc.
-            # For now, we'll just return True
-            return True
-        except Exception as e:
-            QMessageBox.warning(
-                self, "Error", f"Error verifying task: {str(e)}")
-            return False
-
     def mark_task_complete(self):
         """Mark the current task as complete and save work"""
         if self.verify_task_completion(self.current_task):
@@ -1264,17 +1058,8 @@ class TestWindow(QMainWindow):
             # save_success = self.save_current_document()
             # save_msg = "\nWork has been saved." if save_success else "\nCould not save work."
                 
+            # The button and progress bar follow through on_task_state_changed
             self.task_states[self.current_task] = 'complete'
-            self.update_task_buttons()
-            
-            # Calculate progress
-            completed_tasks = sum(1 for state in self.task_states.values() if state == 'complete')
-            progress = (completed_tasks / self.total_tasks) * 100
-            
-            # Update progress bar
-            progress_bar = self.findChild(QProgressBar)
-            if progress_bar:
-                progress_bar.setValue(int(progress))
             
             # # Show completion message
             # QMessageBox.information(
@@ -1286,12 +1071,26 @@ class TestWindow(QMainWindow):
             # Move to next task if not on last task
             if self.current_task < self.total_tasks:
                 self.go_to_next()
-        # else:
-        #     QMessageBox.warning(
-        #         self, 
-        #         "Incomplete", 
-        #         "Please complete all required actions before marking as complete."
-        #     )
+        elif self.current_task in self.task_results:
+            result = self.task_results[self.current_task]
+            if not result.failed_actions and result.unsupported_actions:
+                # Nothing failed, but some actions can only be checked by hand
+                self.task_states[self.current_task] = 'review'
+                QMessageBox.information(
+                    self,
+                    "Review",
+                    "These actions cannot be checked automatically, so the task "
+                    "has been marked for review:\n\n"
+                    + "\n".join(f"- {action}" for action in result.unsupported_actions)
+                )
+                return
+            failed = result.failed_actions
+            QMessageBox.warning(
+                self, 
+                "Incomplete", 
+                "Please complete all required actions before marking as complete.\n\n"
+                + "\n".join(f"- {action}" for action in failed)
+            )
     def get_transparent_button_style(self):
         return '''
             QPushButton {
@@ -1319,47 +1118,6 @@ class TestWindow(QMainWindow):
             }
         '''
 
-    def get_task_button_style(self, is_current=False, state='incomplete'):
-        base_style = '''
-            QPushButton {
-                background-color: %s;
-                color: white;
-                border: none;
-                padding: 5px;
-            }
-            QPushButton:hover {
-                background-color: #1e3f7a;
-            }
-        '''
-
-        if is_current:
-            return base_style % '#1e3f7a'
-
-        colors = {
-            'incomplete': 'transparent',
-            'complete': '#4CAF50',
-            'review': '#FFA500'
-        }
-        return base_style % colors[state]
-
-    def update_task_description(self, task_number):
-        """Update the task description panel with enhanced formatting"""
-        if task_number in self.task_details:
-            task = self.task_details[task_number]
-            description_text = f"""
-            <div style='margin-bottom: 10px;'>
-                <h3 style='color: #FFD700; margin: 0 0 10px 0;'>Task {task_number}</h3>
-                <div style='margin: 0 0 10px 0;'>{task.description}</div>
-                <p style='color: #FFD700; font-weight: bold; margin: 5px 0;'>Required Actions:</p>
-                <ul style='margin: 0; padding-left: 20px;'>
-            """
-            for action in task.required_actions:
-                description_text += f"<li style='margin: 3px 0;'>{action.strip()}</li>"
-            description_text += "</ul></div>"
-
-            # Set the HTML content
-            self.description_text.setHtml(description_text)
-
     def create_context_menu(self, position):
         """Create context menu for the task description"""
         menu = self.description_text.createStandardContextMenu()
@@ -1378,30 +1136,53 @@ class TestWindow(QMainWindow):
             QApplication.clipboard().setText(selected_text)
 
     def update_timer(self):
-        self.seconds += 1
-        hours = self.seconds // 3600
-        minutes = (self.seconds % 3600) // 60
-        seconds = self.seconds % 60
-        self.timer_label.setText(f'{hours:02d}:{minutes:02d}:{seconds:02d}')
-
-    def go_to_previous(self):
-        """Navigate to the previous task"""
-        if self.current_task > 1:
-            self.current_task -= 1
-            self.update_task_ui()
-            self.open_source_document(self.current_task)
-
-    def go_to_next(self):
-        """Navigate to the next task"""
-        if self.current_task < self.total_tasks:
-            self.current_task += 1
-            self.update_task_ui()
-            self.open_source_document(self.current_task)
-
+        """Repaint the clock when its second changes, however late the tick came"""
+        second = self.exam_timer.poll()
+        if second is None:
+            return
+        checkpoint = second // 10 != self.seconds // 10
+        self.seconds = second
+        self.show_elapsed()
+        if checkpoint:
+            # Checkpoint for resume
+            task_seconds = dict((str(task), round(seconds, 1))
+                                for task, seconds in self.exam_timer.task_seconds().items())
+            self.journal_event('tick', seconds=self.seconds, task_seconds=task_seconds)
+
+    def show_elapsed(self):
+        from exam_timer import format_elapsed
+        self.timer_label.setText(format_elapsed(self.seconds))
+
+    def restart_clock(self):
+        """Start the exam clock over from zero on the first task"""
+        self.exam_timer.reset()
+        self.exam_timer.start(1)
+        self.seconds = 0
+        self.show_elapsed()
+        self.timer_label.setStyleSheet(TIMER_STYLE)
+
+    def setup_time_limit(self):
+        """Warn before and when the time limit set by MOS_EXAM_MINUTES runs out"""
+        from exam_timer import configured_limit, WARNING_SECONDS
+        limit = configured_limit()
+        if limit:
+            self.exam_timer.add_limit(max(0, limit - WARNING_SECONDS), self.on_time_warning)
+            self.exam_timer.add_limit(limit, self.on_time_up)
+
+    def on_time_warning(self, elapsed):
+        self.timer_label.setStyleSheet(TIMER_STYLE.replace('white', 'orange'))
+        self.timer_label.setToolTip(f"{int(self.exam_timer.remaining()) // 60 + 1} minutes left")
+
+    def on_time_up(self, elapsed):
+        self.timer_label.setStyleSheet(TIMER_STYLE.replace('white', 'red'))
+        self.timer_label.setToolTip("Time is up")
+        QMessageBox.information(self, 'Time Is Up',
+                                'The exam time is up. Please submit your project.')
 
     def go_to_task(self, task_number):
         """Go to a specific task number"""
         if 1 <= task_number <= self.total_tasks:
+            self.request_autosave('task change')
             self.current_task = task_number
             self.update_task_ui()
             self.update_task_description(task_number)
@@ -1410,6 +1191,7 @@ class TestWindow(QMainWindow):
     def go_to_previous(self):
         """Navigate to the previous task"""
         if self.current_task > 1:
+            self.request_autosave('task change')
             self.current_task -= 1
             self.update_task_ui()
             self.update_task_description(self.current_task)
@@ -1418,6 +1200,7 @@ class TestWindow(QMainWindow):
     def go_to_next(self):
         """Navigate to the next task"""
         if self.current_task < self.total_tasks:
+            self.request_autosave('task change')
             self.current_task += 1
             self.update_task_ui()
             self.update_task_description(self.current_task)
@@ -1425,63 +1208,17 @@ class TestWindow(QMainWindow):
             # QMessageBox.warning(
             #     self, "Incomplete", "Please complete all required actions before marking as complete.")
 
-    def launch_word(self):
-        """Launch Microsoft Word application"""
-        try:
-            # Create Word application instance
-            self.word_app = win32com.client.Dispatch("Word.Application")
-            self.word_app.Visible = True
-
-            # Set initial file
-            self.open_source_document(1)  # Open first task's document
-
-        except Exception as e:
-            QMessageBox.warning(
-                self, "Error", f"Error launching Word: {str(e)}")
-
-    def closeEvent(self, event):
-        """Handle application close event"""
-        try:
-            # Close Word when application closes
-            if self.word_app:
-                if self.source_doc:
-                    try:
-                        self.source_doc.Close(SaveChanges=False)
-                    except:
-                        pass
-                self.word_app.Quit()
-        except:
-            pass
-        event.accept()
-
-
-
-        # Calculate progress
-        completed_tasks = sum(
-            1 for state in self.task_states.values() if state == 'complete')
-        progress = (completed_tasks / self.total_tasks) * 100
-
-        # Update progress bar if it exists
-        progress_bar = self.findChild(QProgressBar)
-        if progress_bar:
-            progress_bar.setValue(int(progress))
-
-        # Automatically move to next task if not on last task
-        if self.current_task < self.total_tasks:
-            self.go_to_next()
-
     def mark_task_for_review(self):
         """Mark the current task for review"""
         self.task_states[self.current_task] = 'review'
-        self.update_task_buttons()
 
     def update_task_ui(self):
         """Update the UI elements for the current task"""
         # Update navigation buttons
         self.update_navigation_buttons()
 
-        # Update task buttons
-        self.update_task_buttons()
+        # Update task strip
+        self.update_task_strip()
 
         # Update window title
         self.setWindowTitle(f'Task {self.current_task} of {self.total_tasks}')
@@ -1505,131 +1242,106 @@ class TestWindow(QMainWindow):
         else:
             self.next_btn.setText(f"Next (Task {self.current_task + 1})")
 
-    def update_task_buttons(self):
-        """Update the appearance of task buttons based on their states"""
-        for i, btn in enumerate(self.task_buttons):
-            task_num = i + 1
-            is_current = task_num == self.current_task
-            state = self.task_states[task_num]
-            btn.setStyleSheet(self.get_task_button_style(is_current, state))
-
-    def open_source_document(self, task_number):
-        """Open the source document for the given task number"""
-        try:
-            # Get the directory of the script
+    def on_task_state_changed(self, task, before, after):
+        """Repaint what a task state change affects; task is None after a reset"""
+        # The task strip's model repaints the task itself
+        if task is None:
+            self.journal_event('reset', count=len(self.task_states))
+            self.update_task_strip()
+        else:
+            self.journal_event('mark', durable=True, task=task, state=after)
+        if self.progress_bar:
+            self.progress_bar.setValue(self.task_states.progress)
+
+    def update_task_strip(self):
+        """Highlight the current task; only its old and new items repaint"""
+        self.task_strip.set_current(self.current_task)
+
+    def source_document_path(self, task_number_or_filename):
+        """Path of the source document for the given task or filename"""
+        # Source documents sit next to the project's workbook
+        if self.project:
+            current_dir = self.project.folder
+        else:
             current_dir = os.path.dirname(os.path.abspath(__file__))
 
-            # Construct the source document path
-            source_path = os.path.join(
-                current_dir, "2019_WE_101_Houseboating.docx")
-
-            if not os.path.exists(source_path):
-                QMessageBox.warning(
-                    self, "Error", f"Source file not found: {source_path}")
-                return
-
-            # Close any existing documents
-            if self.source_doc:
-                try:
-                    self.source_doc.Close()
-                except:
-                    pass
-
-            # Open the source document
-            self.source_doc = self.word_app.Documents.Open(source_path)
-            self.word_app.Visible = True
-
-            # Activate Word window
-            self.word_app.Activate()
-
-        except Exception as e:
-            QMessageBox.warning(
-                self, "Error", f"Error opening document: {str(e)}")
+        # Determine the file name based on input type
+        if isinstance(task_number_or_filename, int):
+            if task_number_or_filename in self.task_details:
+                file_name = self.task_details[task_number_or_filename].file_name
+            else:
+                file_name = "2019_WE_101_Houseboating.docx"  # Default file
+        else:
+            file_name = task_number_or_filename
+        return os.path.join(current_dir, str(file_name))
 
     def open_source_document(self, task_number_or_filename):
         """Open the source document for the given task or filename"""
+        from com_dispatcher import DispatchTimeout
+        new_path = self.source_document_path(task_number_or_filename)
         try:
-            # Get the directory of the script
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            
-            # Determine the file name based on input type
-            if isinstance(task_number_or_filename, int):
-                if task_number_or_filename in self.task_details:
-                    file_name = self.task_details[task_number_or_filename].file_name
-                else:
-                    file_name = "2019_WE_101_Houseboating.docx"  # Default file
-            else:
-                file_name = task_number_or_filename
-            
-            # Track current document path
-            new_path = os.path.join(current_dir, str(file_name))
-            
-            # Check if we already have this document open
-            if hasattr(self, 'current_doc_path') and self.current_doc_path == new_path:
-                # Document already open, just activate it
-                if self.source_doc:
-                    self.word_app.Activate()
-                    return
-            
-            # If path is different or no document is open, proceed with opening
-            if not os.path.exists(new_path):
-                QMessageBox.warning(self, "Error", f"Source file not found: {new_path}")
-                return
-                
-            # Close existing document if it's different
-            if self.source_doc:
-                try:
-                    self.source_doc.Close(SaveChanges=False)
-                except:
-                    pass
-                    
-            # Open the new document
-            self.source_doc = self.word_app.Documents.Open(str(new_path))
+            # Documents stay open once opened, so switching tasks is only a lookup
+            self.source_doc = self.documents.switch(self.working_document_path(new_path))
             self.current_doc_path = new_path  # Track current document path
-            self.word_app.Visible = True
-            self.word_app.Activate()
+
+            if isinstance(task_number_or_filename, int):
+                self.journal_event('navigate', task=task_number_or_filename)
+                self.exam_timer.switch_task(task_number_or_filename)  # Book time per task
+                self.task_history.append(task_number_or_filename)
+                self.prefetch_documents(task_number_or_filename)
             
+        except FileNotFoundError:
+            QMessageBox.warning(self, "Error", f"Source file not found: {new_path}")
+        except DispatchTimeout:
+            # Word is hung or showing a dialog; the window stays usable
+            QMessageBox.warning(self, "Error", "Word did not respond in time. "
+                                               "Close any open dialog in Word and try again.")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error opening document: {str(e)}")
 
+    def prefetch_documents(self, task_number):
+        """Start opening the documents of the tasks the candidate will likely visit next"""
+        from document_sessions import likely_next
+        tasks = likely_next(task_number, self.task_history, self.total_tasks)
+        self.documents.prefetch([self.working_document_path(self.source_document_path(task))
+                                 for task in tasks])
+
+    def working_document_path(self, path):
+        """Where a source document is opened from: its restored copy after a resume"""
+        return self.resumed_documents.get(self.documents.key(path), path)
+
     def verify_task_completion(self, task_number):
-        """Verify if the task requirements are met"""
+        """Verify if the task requirements are met by grading the saved document"""
         if task_number not in self.task_details:
             return False
 
-        task = self.task_details[task_number]
         try:
-            # This is where you would implement specific checks for each task
-            # For example, checking formatting, content, etc.
-            # For now, we'll just return True
-            return True
+            # Grade what the candidate has in Word right now
+            self.task_results.pop(task_number, None)
+            if not self.save_current_document():
+                return False
+
+            # Keep the autosave worker from rewriting the file while it is read
+            with self.autosaver.lock:
+                result = self.grader_for(task_number).grade(self.last_saved_path)[task_number]
+            self.task_results[task_number] = result
+            return result.passed
         except Exception as e:
             QMessageBox.warning(
                 self, "Error", f"Error verifying task: {str(e)}")
             return False
 
-    def launch_word(self):
-        """Launch Microsoft Word application"""
-        try:
-            # Create Word application instance
-            self.word_app = win32com.client.Dispatch("Word.Application")
-            self.word_app.Visible = True
-
-        except Exception as e:
-            QMessageBox.warning(
-                self, "Error", f"Error launching Word: {str(e)}")
-
     def closeEvent(self, event):
         """Handle application close event"""
-        # Close Word when application closes
-        if self.word_app:
-            try:
-                # Close any open documents
-                for doc in self.word_app.Documents:
-                    doc.Close(SaveChanges=False)
-                self.word_app.Quit()
-            except:
-                pass
+        if self.startup is not None:
+            # Closed while still starting: nothing is left to open
+            self.startup.finished.disconnect(self.on_startup_finished)
+        # Save unsaved work and finish pending saves, then close Word and any open documents
+        self.request_autosave('close')
+        self.stop_autosave()
+        self.documents.shutdown()
+        self.backend.quit()
+        self.source_doc = None
         event.accept()
     # ... (rest of the TestWindow methods from your code)
 
@@ -1655,11 +1367,13 @@ class SkillReviewWindow(QMainWindow):
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
 
-        # Add combobox
-        combo = QComboBox()
-        combo.addItem('Word Associate 2019/365 Skill Review 1 (Q.57)')
-        combo.addItem('Word Associate 2019/365 Skill Review 2 (Q.50)')
-        layout.addWidget(combo)
+        # Add combobox, listing the projects in the catalog index
+        from catalog import default_catalog
+        self.catalog = default_catalog()
+        self.combo = QComboBox()
+        for project in self.catalog.projects():
+            self.combo.addItem(project.title, project.id)
+        layout.addWidget(self.combo)
 
         # Add buttons
         btn_layout = QHBoxLayout()
@@ -1682,7 +1396,7 @@ class SkillReviewWindow(QMainWindow):
         self.close()
 
     def launch_test(self):
-        self.test_window = TestWindow()
+        self.test_window = TestWindow(self.catalog.get(self.combo.currentData()))
         self.test_window.show()
         self.close()
 
@@ -1843,7 +1557,16 @@ class MOSTestApp(QMainWindow):
 # df_verify = pd.read_excel(excel_path)
 # print(df_verify.head())
 if __name__ == '__main__':
+    if '--profile-startup' in sys.argv:
+        # Relaunch with import timing and report where the startup time goes
+        from startup_profile import profile_startup
+        sys.exit(profile_startup(os.path.abspath(__file__), sys.argv[1:]))
+
     app = QApplication(sys.argv)
     ex = MOSTestApp()
     ex.show()
+    if '--startup-report' in sys.argv:
+        # Child of --profile-startup: say when the login window is up, then quit
+        from startup_profile import report_ready
+        QTimer.singleShot(0, lambda: report_ready(app))
     sys.exit(app.exec_())
@@ -0,0 +1,212 @@
+"""Saving the exam document off the Qt UI thread
+
+Autosaver owns one worker thread. The UI thread only queues requests, so
+the timer and navigation keep running while Word writes a large document.
+Requests for the same document that arrive while one is queued are folded
+into it. Whether the document has unsaved changes is also asked from the
+worker, so a slow or hung Word never holds up the window. The worker has
+the backend write the document to a working copy in the store, one per
+source document, then ingests it into the PartStore; the manifest rename
+is the commit point. Results come back to the UI thread through Qt signals.
+"""
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from storage import PartStore, STORE_FOLDER, working_copy_name
+
+
+INTERVAL_ENV = 'MOS_AUTOSAVE_INTERVAL'
+DEFAULT_INTERVAL = 60  # seconds
+SAVE_WAIT = 150.0      # seconds the UI waits for a save; Word's own save times out first
+
+
+class SaveTimeout(Exception):
+    """Queued saves did not finish within the time the caller was willing to wait"""
+
+
+class SaveRequest:
+    def __init__(self, doc, token, task, source, reason, force):
+        self.doc = doc
+        self.token = token          # what the worker thread uses to reach doc
+        self.task = task
+        self.source = source
+        self.reason = reason
+        self.force = force          # save even without unsaved changes
+        self.callbacks = []
+
+
+class SaveResult:
+    def __init__(self, request, manifest_path=None, working_copy=None, error=None,
+                 skipped=False):
+        self.task = request.task
+        self.source = request.source
+        self.reason = request.reason
+        self.manifest_path = manifest_path
+        self.working_copy = working_copy
+        self.error = error
+        self.skipped = skipped      # nothing written: the document had no unsaved changes
+        self.finished_at = datetime.now()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class Autosaver(QObject):
+    """Saves the open document from a worker thread, on an interval and on request"""
+
+    saved = pyqtSignal(object)      # SaveResult
+    failed = pyqtSignal(object)     # SaveResult
+    _finished = pyqtSignal(object, object)
+
+    def __init__(self, backend, save_folder, current, interval=None, parent=None):
+        """current() returns (document, task number, source path) or None"""
+        super().__init__(parent)
+        self.backend = backend
+        self.save_folder = save_folder
+        self.current = current
+        self.store = PartStore(os.path.join(save_folder, STORE_FOLDER))
+
+        # Held while a working copy is being written; readers take it too
+        self.lock = threading.Lock()
+        self.last_result = None
+        self.coalesced = 0
+
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()   # id(document) -> SaveRequest
+        self._busy = False
+        self._stopped = False
+        self._finished.connect(self._deliver)
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+
+        if interval is None:
+            interval = int(os.environ.get(INTERVAL_ENV, DEFAULT_INTERVAL))
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(lambda: self.request('interval'))
+        if interval > 0:
+            self.timer.start(interval * 1000)
+
+    def request(self, reason, force=False, callback=None):
+        """Queue a save of the current document; returns False if there is no document
+
+        Without force, the worker skips a document with no unsaved changes.
+        """
+        state = self.current()
+        if state is None:
+            return False
+        doc, task, source = state
+
+        with self._condition:
+            if self._stopped:
+                return False
+            request = self._pending.get(id(doc))
+            if request is not None:
+                # Newest task and reason win; one write covers both requests
+                request.task, request.source, request.reason = task, source, reason
+                request.force = request.force or force
+                self.coalesced += 1
+            else:
+                request = SaveRequest(doc, self.backend.thread_token(doc), task, source, reason,
+                                      force)
+                self._pending[id(doc)] = request
+            if callback is not None:
+                request.callbacks.append(callback)
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout=SAVE_WAIT):
+        """Block until every queued save is written; returns the last SaveResult
+
+        Raises SaveTimeout when that takes longer than timeout seconds.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: not self._pending and not self._busy,
+                                            timeout):
+                raise SaveTimeout(f"Saving did not finish within {timeout:g}s")
+            return self.last_result
+
+    def save_now(self, reason, timeout=SAVE_WAIT):
+        """Save the current document and wait for it, for callers that need the file"""
+        if not self.request(reason, force=True):
+            return None
+        return self.flush(timeout)
+
+    def stop(self, timeout=SAVE_WAIT):
+        """Write what is queued, then end the worker thread; False if it is still saving"""
+        self.timer.stop()
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def working_copy(self, source):
+        """Path the document opened from source is saved to before ingesting"""
+        return os.path.join(self.store.root, working_copy_name(source))
+
+    @property
+    def busy(self):
+        with self._condition:
+            return self._busy or bool(self._pending)
+
+    def _run(self):
+        self.backend.thread_started()
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._pending or self._stopped)
+                    if not self._pending:
+                        return
+                    _, request = self._pending.popitem(last=False)
+                    self._busy = True
+
+                result = self._save(request)
+
+                with self._condition:
+                    self._busy = False
+                    if not result.skipped:
+                        self.last_result = result
+                    self._condition.notify_all()
+                self._finished.emit(result, request.callbacks)
+        finally:
+            self.backend.thread_finished()
+
+    def _save(self, request):
+        try:
+            doc = self.backend.thread_document(request.token)
+            if not request.force and self.backend.is_saved(doc):
+                return SaveResult(request, skipped=True)
+            working_copy = self.working_copy(request.source)
+            with self.lock:
+                self.backend.save_as(doc, working_copy)
+
+            task_folder = os.path.join(self.save_folder, f"Task_{request.task}")
+            os.makedirs(task_folder, exist_ok=True)  # Projects differ in task count
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            manifest_path = os.path.join(task_folder, f"Task_{request.task}_{timestamp}.json")
+            suffix = 1
+            while os.path.exists(manifest_path):
+                manifest_path = os.path.join(
+                    task_folder, f"Task_{request.task}_{timestamp}_{suffix}.json")
+                suffix += 1
+
+            self.store.ingest(working_copy, manifest_path, task=request.task,
+                              source=request.source, reason=request.reason)
+            return SaveResult(request, manifest_path, working_copy)
+        except Exception as e:
+            return SaveResult(request, error=str(e))
+
+    @pyqtSlot(object, object)
+    def _deliver(self, result, callbacks):
+        """Runs on the UI thread"""
+        if not result.ok:
+            self.failed.emit(result)
+        elif not result.skipped:
+            self.saved.emit(result)
+        for callback in callbacks:
+            callback(result)
@@ -0,0 +1,277 @@
+import importlib.util
+import os
+import shutil
+import tempfile
+import zipfile
+
+
+BACKEND_ENV = 'MOS_DOCUMENT_BACKEND'
+
+
+class DocumentBackend:
+    """What the exam window needs from the program editing the .docx"""
+
+    name = None
+    apartment_threaded = False  # True when every call must come from the thread that started it
+
+    def start(self):
+        """Launch the editor, if there is one"""
+
+    def open(self, path):
+        """Open a document and return its handle"""
+        raise NotImplementedError
+
+    def save_as(self, doc, path):
+        raise NotImplementedError
+
+    def close(self, doc, save_changes=False):
+        raise NotImplementedError
+
+    def is_saved(self, doc):
+        """True when the document has no changes since it was opened or saved"""
+        raise NotImplementedError
+
+    def file_path(self, doc):
+        """The file the document was last opened from or saved to"""
+        raise NotImplementedError
+
+    def activate(self, doc=None):
+        """Bring the editor window, showing doc if given, to the front"""
+
+    def quit(self):
+        """Close every open document without saving and shut the editor down"""
+
+    # Saving from a worker thread
+
+    def thread_token(self, doc):
+        """Called on the UI thread: something another thread can turn back into doc"""
+        return doc
+
+    def thread_document(self, token):
+        """Called on the worker thread: the document a thread_token refers to"""
+        return token
+
+    def thread_started(self):
+        """Prepare the calling worker thread for backend calls"""
+
+    def thread_finished(self):
+        """Undo thread_started when the worker thread ends"""
+
+    # Opening documents ahead of time from a worker thread
+
+    def prefetch_token(self):
+        """Called on the UI thread: lets a worker reach the editor, see prefetch"""
+        return None
+
+    def prefetch(self, editor, path):
+        """Called on the worker thread: open path without showing it; returns a thread_token
+
+        editor is thread_document(prefetch_token()), unpacked once by the worker.
+        """
+        return self.thread_token(self.open(path))
+
+    def adopt(self, token):
+        """Called on the UI thread: take over a document prefetch opened"""
+        return self.thread_document(token)
+
+
+class WordBackend(DocumentBackend):
+    """Microsoft Word driven over COM (Windows only)"""
+
+    name = 'word'
+    apartment_threaded = True
+
+    def __init__(self):
+        self.word_app = None
+
+    @staticmethod
+    def available():
+        try:
+            return importlib.util.find_spec('win32com.client') is not None
+        except ImportError:
+            return False    # win32com itself is missing
+
+    def start(self):
+        import win32com.client
+        self.word_app = win32com.client.Dispatch("Word.Application")
+        self.word_app.Visible = True
+
+    def open(self, path):
+        doc = self.word_app.Documents.Open(str(path))
+        self.word_app.Visible = True
+        return doc
+
+    def save_as(self, doc, path):
+        doc.SaveAs(str(path))
+
+    def close(self, doc, save_changes=False):
+        try:
+            doc.Close(SaveChanges=save_changes)
+        except:
+            pass
+
+    def is_saved(self, doc):
+        return bool(doc.Saved)
+
+    def file_path(self, doc):
+        return str(doc.FullName)
+
+    def activate(self, doc=None):
+        if self.word_app:
+            try:
+                if doc is not None:
+                    doc.Activate()
+                self.word_app.Activate()
+            except:
+                pass
+
+    def quit(self):
+        if self.word_app:
+            try:
+                for doc in self.word_app.Documents:
+                    doc.Close(SaveChanges=False)
+                self.word_app.Quit()
+            except:
+                pass
+            self.word_app = None
+
+    # COM objects belong to the thread that created them, so a worker thread
+    # gets its own proxy marshalled through a stream
+
+    def thread_token(self, doc):
+        import pythoncom
+        return pythoncom.CoMarshalInterThreadInterfaceInStream(pythoncom.IID_IDispatch,
+                                                               doc._oleobj_)
+
+    def thread_document(self, token):
+        import pythoncom
+        import win32com.client
+        return win32com.client.Dispatch(
+            pythoncom.CoGetInterfaceAndReleaseStream(token, pythoncom.IID_IDispatch))
+
+    def thread_started(self):
+        import pythoncom
+        pythoncom.CoInitialize()
+
+    def thread_finished(self):
+        import pythoncom
+        pythoncom.CoUninitialize()
+
+    def prefetch_token(self):
+        return self.thread_token(self.word_app)
+
+    def prefetch(self, editor, path):
+        # Opened hidden, so the candidate's window does not change under them
+        doc = editor.Documents.Open(str(path), AddToRecentFiles=False, Visible=False)
+        return self.thread_token(doc)
+
+    def adopt(self, token):
+        doc = self.thread_document(token)
+        doc.Windows(1).Visible = True
+        return doc
+
+
+class LocalDocument:
+    """An open .docx held by LocalBackend; edits replace whole zip parts"""
+
+    def __init__(self, path):
+        self.path = path
+        self.parts = {}         # part name -> replacement bytes
+        self.saved = True
+        self.closed = False
+
+    def read_part(self, name):
+        if name in self.parts:
+            return self.parts[name]
+        with zipfile.ZipFile(self.path) as source:
+            return source.read(name)
+
+    def replace_part(self, name, data):
+        self.parts[name] = data
+        self.saved = False
+
+
+class LocalBackend(DocumentBackend):
+    """Works on the .docx zip directly, for headless runs without Word"""
+
+    name = 'local'
+
+    def __init__(self):
+        self.documents = []
+
+    def open(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        doc = LocalDocument(str(path))
+        self.documents.append(doc)
+        return doc
+
+    def save_as(self, doc, path):
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(suffix='.docx', dir=folder)
+        os.close(fd)
+        try:
+            if doc.parts:
+                with zipfile.ZipFile(doc.path) as source, \
+                        zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+                    for info in source.infolist():
+                        if info.filename in doc.parts:
+                            target.writestr(info, doc.parts[info.filename])
+                        else:
+                            target.writestr(info, source.read(info.filename))
+                    for name in set(doc.parts) - set(source.namelist()):
+                        target.writestr(name, doc.parts[name])
+            else:
+                shutil.copyfile(doc.path, temp_path)
+            os.replace(temp_path, path)
+        except:
+            os.remove(temp_path)
+            raise
+
+        # Like Word's SaveAs, the handle now refers to the new file
+        doc.path = str(path)
+        doc.parts = {}
+        doc.saved = True
+
+    def close(self, doc, save_changes=False):
+        if save_changes and not doc.saved:
+            self.save_as(doc, doc.path)
+        doc.closed = True
+        if doc in self.documents:
+            self.documents.remove(doc)
+
+    def is_saved(self, doc):
+        return doc.saved
+
+    def file_path(self, doc):
+        return doc.path
+
+    def quit(self):
+        for doc in list(self.documents):
+            self.close(doc)
+
+
+BACKENDS = {
+    WordBackend.name: WordBackend,
+    LocalBackend.name: LocalBackend,
+}
+FAKE_WORD = 'fake-word'
+
+
+def create_backend(name=None):
+    """Return a backend by name, MOS_DOCUMENT_BACKEND, or Word when COM is available
+
+    Word runs behind a com_dispatcher thread, so a slow Word never blocks the caller.
+    """
+    name = name or os.environ.get(BACKEND_ENV)
+    if name == FAKE_WORD:
+        from fake_word import FakeWordBackend
+        backend = FakeWordBackend()
+    elif name:
+        backend = BACKENDS[name]()
+    else:
+        backend = WordBackend() if WordBackend.available() else LocalBackend()
+    if backend.apartment_threaded:
+        from com_dispatcher import DispatchedBackend
+        backend = DispatchedBackend(backend)
+    return backend
@@ -0,0 +1,335 @@
+"""Grade a tree of saved submissions from the command line
+
+Walks ROOT for the Task_N folders the exam window saves into (a
+Completed_Tasks folder per candidate, at any depth) and grades every
+submission in them against that task's RequiredActions, giving credit only
+for what the candidate changed from the task's pristine document (found
+next to the requirements workbook). Both part store
+manifests (.json) and plain .docx saves are graded. The work is spread over
+a process pool, and each result is appended to the report as soon as it
+comes back. Running the same command again after an interruption skips
+everything already in the report.
+
+    python batch_grade.py ROOT REPORT [--requirements XLSX | --project ID]
+                          [--workers N] [--latest] [--restart] [--changes]
+                          [--cache DIR | --no-cache]
+
+A REPORT ending in .csv is written as CSV, anything else as JSON Lines.
+Outcomes are cached by part hashes under ROOT/.grading-cache (--cache to
+move it), so identical resubmissions are looked up rather than graded, and
+saves from the part store are only rebuilt into a .docx on a cache miss.
+With --changes the report also lists what the candidate changed where the task's
+description points; an empty list there means the task was not touched.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import types
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+from grading import UNSUPPORTED, Grader, ResultCache, diff_documents
+from storage import ManifestParts, read_manifest, store_for_manifest
+from task_loader import load_task_records
+
+
+FIELDS = ['file', 'candidate', 'task', 'saved_at', 'passed', 'status', 'failed_actions',
+          'unsupported_actions', 'changes', 'error', 'seconds']
+TASK_FOLDER = re.compile(r'Task_(\d+)$')
+SAVE_FOLDER = 'Completed_Tasks'     # what the exam window saves the Task_N folders into
+CACHE_FOLDER = '.grading-cache'
+
+
+def find_submissions(root, latest=False):
+    """Yield (path relative to root, candidate, task number) for every saved submission"""
+    for folder, folders, files in os.walk(root):
+        # Skip the part store, caches and other hidden folders
+        folders[:] = sorted(name for name in folders if not name.startswith('.'))
+        match = TASK_FOLDER.match(os.path.basename(folder))
+        if not match:
+            continue
+        names = [name for name in sorted(files)
+                 if name.endswith(('.json', '.docx')) and not name.startswith(('~$', '.'))]
+        if latest and names:
+            names = [max(names, key=lambda name: os.path.getmtime(os.path.join(folder, name)))]
+        # The candidate is the folder holding Completed_Tasks, not Completed_Tasks itself
+        parts = os.path.relpath(os.path.dirname(folder), root).split(os.sep)
+        if parts[-1] == SAVE_FOLDER:
+            parts.pop()
+        candidate = '/'.join(parts) or '.'
+        for name in names:
+            path = os.path.relpath(os.path.join(folder, name), root).replace(os.sep, '/')
+            yield path, candidate, int(match.group(1))
+
+
+# Worker process state, set up once by _init_worker
+_tasks = {}
+_graders = {}
+_cache = None
+_originals = None   # folder of the pristine task documents
+_changes = False    # whether rows list the changes in each task's region
+
+
+def _init_worker(records, cache_root, originals=None, changes=False):
+    global _cache, _originals, _changes
+    for record in records:
+        _tasks[record['task_id']] = types.SimpleNamespace(**record)
+    if cache_root:
+        _cache = ResultCache(cache_root)
+    _originals = originals
+    _changes = changes
+
+
+def _original(task):
+    """Path of a task's pristine document, or None when grading without originals"""
+    if _originals is None:
+        return None
+    return os.path.join(_originals, task.file_name)
+
+
+def task_changes(task, submission):
+    """Descriptions of the blocks the candidate changed in the region a task refers to"""
+    regions = diff_documents(_original(task), submission).regions([task])
+    return [change.describe() for change in regions[task.task_id]]
+
+
+def grade_file(root, path, task):
+    """Grade one submission against its task; runs in a worker process and returns a report row"""
+    started = time.perf_counter()
+    full_path = os.path.join(root, path)
+    row = {'file': path, 'task': task, 'saved_at': '', 'passed': None, 'status': '',
+           'failed_actions': [], 'unsupported_actions': [], 'changes': [], 'error': ''}
+    try:
+        grader = _graders.get(task)
+        if grader is None:
+            if task not in _tasks:
+                raise KeyError(f"Task {task} is not in the requirements")
+            # One grader per task, so only that task's rules are evaluated
+            grader = _graders[task] = Grader([_tasks[task]], cache=_cache,
+                                             original=_original(_tasks[task]))
+
+        if path.endswith('.json'):
+            manifest = read_manifest(full_path)
+            row['saved_at'] = manifest['saved_at']
+            result = None
+            if _cache is not None:
+                # The manifest already lists every part's hash: no rebuild on a hit
+                outcomes, missing = _cache.lookup(grader.index, ManifestParts(manifest))
+                if not missing:
+                    result = grader.results(outcomes)[task]
+        else:
+            row['saved_at'] = datetime.fromtimestamp(
+                os.path.getmtime(full_path)).isoformat(timespec='seconds')
+            result = grader.grade(full_path)[task]
+            if _changes:
+                row['changes'] = task_changes(_tasks[task], full_path)
+
+        if path.endswith('.json') and (result is None or _changes):
+            fd, docx_path = tempfile.mkstemp(suffix='.docx', prefix='mos-grade-')
+            os.close(fd)
+            try:
+                store_for_manifest(full_path).materialize(full_path, docx_path)
+                if result is None:
+                    result = grader.grade(docx_path)[task]
+                if _changes:
+                    row['changes'] = task_changes(_tasks[task], docx_path)
+            finally:
+                os.remove(docx_path)
+
+        row['passed'] = result.passed
+        row['status'] = result.status   # 'unsupported' needs a manual check
+        row['failed_actions'] = result.failed_actions
+        row['unsupported_actions'] = result.unsupported_actions
+    except Exception as e:
+        row['error'] = str(e)
+    row['seconds'] = round(time.perf_counter() - started, 4)
+    return row
+
+
+def _complete_csv(written):
+    """(text up to the end of the last complete record, the records' files) of a CSV report
+
+    A record is complete when it has every field and ends in a newline
+    outside quotes; a header that is cut off leaves nothing. Raises
+    ValueError for a header with other columns than FIELDS.
+    """
+    # Only '\n' ends a line: splitlines() would also split on U+2028 and the like
+    lines = re.findall(r'[^\n]*\n|[^\n]+$', written)
+    reader = csv.reader(lines)
+    kept = 0
+    files = []
+    try:
+        for record in reader:
+            if len(record) != len(FIELDS) or not lines[reader.line_num - 1].endswith('\n'):
+                break
+            if kept:
+                files.append(record[0])
+            elif record != FIELDS:
+                break
+            kept = reader.line_num
+    except csv.Error:
+        pass    # a quoted field cut off by the interruption
+    if not kept and lines and lines[0].endswith('\n'):
+        raise ValueError("its columns differ from this version's; "
+                         "use --restart or another report file")
+    return ''.join(lines[:kept]), files
+
+
+class Report:
+    """A CSV or JSON Lines report that is appended to row by row
+
+    The rows already in the file are the checkpoint: their submissions are
+    not graded again. Rows are flushed one at a time, so an interrupted run
+    loses at most a cut-off last row, which is dropped on resume. A CSV row
+    can span lines (an error message with newlines, quoted), so CSV files
+    are cut after the last complete record rather than the last newline.
+    """
+
+    def __init__(self, path, restart=False):
+        self.path = path
+        self.csv = path.lower().endswith('.csv')
+        self.done = set()
+        text = ''
+        if not restart and os.path.exists(path):
+            with open(path, encoding='utf-8', newline='') as source:
+                written = source.read()
+            if self.csv:
+                text, files = _complete_csv(written)
+            else:
+                text = written[:written.rfind('\n') + 1]
+                # Not splitlines(): JSON leaves separators such as U+2028 unescaped
+                files = [json.loads(line)['file'] for line in text.split('\n') if line]
+            self.done = set(files)
+            if text != written:
+                # Rewrite without the cut-off line, via a rename so the rest is never at risk
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                                 prefix='.tmp-')
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as out:
+                    out.write(text)
+                os.replace(temp_path, path)
+
+        self.file = open(path, 'a' if text else 'w', encoding='utf-8', newline='')
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, FIELDS, lineterminator='\n')
+            if not text:
+                self.writer.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            row = dict(row, failed_actions='; '.join(row['failed_actions']),
+                       unsupported_actions='; '.join(row['unsupported_actions']),
+                       changes='; '.join(row['changes']))
+            self.writer.writerow(row)
+        else:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.done.add(row['file'])
+
+    def close(self):
+        self.file.close()
+
+
+def run(root, report, records, workers=None, latest=False, cache_root=None, originals=None,
+        changes=False):
+    """Grade what the report does not have yet; returns (graded, passed, unsupported, errors)
+
+    originals is the folder holding the tasks' pristine documents; without
+    it every item counts as changed. With changes, rows also list each
+    submission's changes against them.
+    """
+    submissions = [item for item in find_submissions(root, latest) if item[0] not in report.done]
+    print(f"{len(report.done)} already graded, {len(submissions)} to go", file=sys.stderr)
+
+    graded = passed = unsupported = errors = 0
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(records, cache_root, originals, changes)) as pool:
+        # Keep a bounded number of jobs in flight so huge trees do not queue up in memory
+        window = workers * 4
+        jobs = iter(submissions)
+        pending = {}
+        try:
+            while True:
+                for path, candidate, task in jobs:
+                    pending[pool.submit(grade_file, root, path, task)] = candidate
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = future.result()
+                    row['candidate'] = pending.pop(future)
+                    report.write(row)
+                    graded += 1
+                    passed += row['passed'] is True
+                    unsupported += row['status'] == UNSUPPORTED
+                    errors += bool(row['error'])
+                    if graded % 500 == 0:
+                        rate = graded / (time.perf_counter() - started)
+                        print(f"  {graded}/{len(submissions)} graded, {rate:.0f}/s",
+                              file=sys.stderr)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=True, cancel_futures=True)
+            print("Interrupted; run the same command again to resume", file=sys.stderr)
+    return graded, passed, unsupported, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('root', help='folder holding the candidates\' Completed_Tasks folders')
+    parser.add_argument('report', help='report to write, .csv or JSON Lines')
+    parser.add_argument('--requirements', help='requirements workbook to grade against')
+    parser.add_argument('--project', help='catalog project to grade against')
+    parser.add_argument('--workers', type=int, help='processes to use (default: all cores)')
+    parser.add_argument('--latest', action='store_true',
+                        help='only grade the newest save of each task')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore what the report already holds')
+    parser.add_argument('--changes', action='store_true',
+                        help='list what each submission changed in its task\'s region')
+    parser.add_argument('--cache', help=f'result cache folder (default: ROOT/{CACHE_FOLDER})')
+    parser.add_argument('--no-cache', action='store_true', help='grade every file in full')
+    options = parser.parse_args(argv)
+
+    requirements = options.requirements
+    if requirements is None:
+        from catalog import default_catalog
+        catalog = default_catalog()
+        project = catalog.get(options.project) if options.project else (
+            catalog.projects() or [None])[0]
+        if project is None:
+            parser.error("no such project" if options.project else "no project in the catalog")
+        requirements = project.requirements
+
+    root = os.path.abspath(options.root)
+    cache_root = None
+    if not options.no_cache:
+        cache_root = os.path.abspath(options.cache or os.path.join(root, CACHE_FOLDER))
+
+    # The task documents sit next to the requirements workbook
+    originals = os.path.dirname(os.path.abspath(requirements))
+
+    try:
+        report = Report(options.report, options.restart)
+    except ValueError as e:
+        parser.error(f"{options.report}: {e}")
+    try:
+        graded, passed, unsupported, errors = run(root, report, load_task_records(requirements),
+                                     options.workers, options.latest, cache_root, originals,
+                                     options.changes)
+    finally:
+        report.close()
+    failed = graded - passed - unsupported - errors
+    print(f"Graded {graded}: {passed} passed, {failed} failed, {unsupported} need a manual "
+          f"check, {errors} errors. Report: {options.report}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Cold-start cost of loading the task definitions
+
+Each path runs in a fresh interpreter so module import time is included,
+which is where pandas spends most of its time:
+
+  pandas   import pandas, read_excel + iterrows, as app.py used to
+  parse    task_loader with the compiled cache disabled
+  cached   task_loader reading its compiled cache (primed beforehand)
+
+    python benchmarks/bench_startup.py [runs]
+"""
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOK = os.path.join(ROOT, 'Project1_Requirements.xlsx')
+
+PATHS = {
+    'pandas': '''
+import pandas as pd
+df = pd.read_excel(WORKBOOK)
+tasks = [(row['TaskID'], row['RequiredActions'].split(';')) for _, row in df.iterrows()]
+''',
+    'parse': '''
+from task_loader import load_task_records
+tasks = load_task_records(WORKBOOK, use_cache=False)
+''',
+    'cached': '''
+from task_loader import load_task_records
+tasks = load_task_records(WORKBOOK)
+''',
+}
+
+CHILD = '''
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, %(root)r)
+WORKBOOK = %(workbook)r
+%(body)s
+print(time.perf_counter() - start)
+'''
+
+
+def run(body, workbook):
+    script = CHILD % {'root': ROOT, 'workbook': workbook, 'body': body}
+    result = subprocess.run([sys.executable, '-c', script], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(runs):
+    with tempfile.TemporaryDirectory() as folder:
+        # A private copy so the benchmark's cache never touches the real one
+        workbook = os.path.join(folder, os.path.basename(WORKBOOK))
+        shutil.copy2(WORKBOOK, workbook)
+        run(PATHS['cached'], workbook)
+
+        for name, body in PATHS.items():
+            times = [run(body, workbook) for _ in range(runs)]
+            if None in times:
+                print('%-8s unavailable (import failed)' % name)
+                continue
+            print('%-8s median %8.1f ms   min %8.1f ms   (%d runs)'
+                  % (name, statistics.median(times) * 1e3, min(times) * 1e3, runs))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,137 @@
+"""Throughput of the streaming document reader on large generated documents
+
+Builds .docx files with N paragraphs (mixed headings, list items, formatted
+body text, tables and a drawing) from the exam document's styles and
+numbering, then reports paragraphs/second and peak traced memory for a bare
+walk and for a full grading pass.
+
+    python benchmarks/bench_stream.py [paragraph counts...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from grading import DocxPackage, Grader, WordDocument, walk_document  # noqa: E402
+from grading.document import PARAGRAPH  # noqa: E402
+
+SOURCE_DOC = os.path.join(ROOT, '2019_WE_101_Houseboating.docx')
+
+DOCUMENT_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    ' xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing">'
+    '<w:body>'
+)
+DOCUMENT_TAIL = (
+    '<w:sectPr><w:footerReference w:type="default" r:id="rId8"/><w:titlePg/></w:sectPr>'
+    '</w:body></w:document>'
+)
+
+# One block is ten paragraphs: heading, body text, three list items, a 2x2 table
+# (four cell paragraphs) and a paragraph holding an anchored drawing
+BLOCK = (
+    '<w:p><w:pPr><w:pStyle w:val="Heading1"/></w:pPr><w:r><w:t>Section {n}</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:jc w:val="center"/></w:pPr>'
+    '<w:r><w:rPr><w:b/><w:color w:val="FFC000" w:themeColor="accent4"/><w:sz w:val="32"/></w:rPr>'
+    '<w:t xml:space="preserve">Prices from $18.50 per night </w:t></w:r>'
+    '<w:r><w:t>for block {n}.</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:pStyle w:val="ListParagraph"/><w:numPr><w:ilvl w:val="0"/>'
+    '<w:numId w:val="39"/></w:numPr></w:pPr><w:r><w:t>Camping</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:pStyle w:val="ListParagraph"/><w:numPr><w:ilvl w:val="0"/>'
+    '<w:numId w:val="39"/></w:numPr></w:pPr><w:r><w:t>Hotels and Condos</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:pStyle w:val="ListParagraph"/><w:numPr><w:ilvl w:val="0"/>'
+    '<w:numId w:val="38"/></w:numPr></w:pPr><w:r><w:t>Houseboats</w:t></w:r></w:p>'
+    '<w:tbl><w:tblPr><w:tblBorders><w:top w:val="single" w:sz="4"/></w:tblBorders></w:tblPr>'
+    '<w:tr><w:tc><w:tcPr><w:gridSpan w:val="2"/></w:tcPr><w:p><w:pPr><w:jc w:val="center"/></w:pPr>'
+    '<w:r><w:t>Season</w:t></w:r></w:p></w:tc><w:tc><w:p><w:r><w:t>Rate</w:t></w:r></w:p></w:tc></w:tr>'
+    '<w:tr><w:tc><w:p><w:r><w:t>Summer</w:t></w:r></w:p></w:tc>'
+    '<w:tc><w:p><w:r><w:t>$250.00</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    '<w:p><w:r><w:drawing><wp:anchor><wp:extent cx="3200400" cy="1802170"/>'
+    '<wp:wrapSquare wrapText="bothSides"/></wp:anchor></w:drawing></w:r></w:p>'
+)
+PARAGRAPHS_PER_BLOCK = 10
+
+
+class Task:
+    def __init__(self, task_id, description, required_actions):
+        self.task_id = task_id
+        self.description = description
+        self.required_actions = required_actions
+
+
+TASKS = [
+    Task(1, 'Format the title', ['Apply Bold', 'Center align', 'Set font size to 16pt',
+                                 'Apply Gold theme color']),
+    Task(2, 'Format the heading', ['Apply theme color', 'Left align', 'Apply Heading 1 style']),
+    Task(3, 'Create a table', ['Insert table', 'Apply borders', 'Merge header cells',
+                               'Center align headers']),
+    Task(5, 'Create a bulleted list', ['Create bulleted list', 'Apply consistent spacing',
+                                       'Set proper indentation']),
+    Task(6, 'Add headers and footers', ['Add page numbers', 'Set different first page']),
+    Task(7, 'Insert the image', ['Insert image', 'Set width to 3.5 inches',
+                                 'Apply text wrapping']),
+    Task(8, 'Format prices', ['Apply currency format', 'Add spacing between sections']),
+    Task(10, 'Apply heading styles', ['Apply Heading styles', 'Ensure consistent formatting']),
+]
+
+
+def build_document(path, paragraphs):
+    """Write a .docx with roughly `paragraphs` paragraphs next to the exam's other parts"""
+    blocks = max(1, paragraphs // PARAGRAPHS_PER_BLOCK)
+    with zipfile.ZipFile(SOURCE_DOC) as source, \
+            zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as target:
+        for info in source.infolist():
+            if info.filename == 'word/document.xml' or info.filename.startswith('word/media/'):
+                continue
+            target.writestr(info, source.read(info.filename))
+        with target.open('word/document.xml', 'w', force_zip64=True) as out:
+            out.write(DOCUMENT_HEAD.encode())
+            for n in range(blocks):
+                out.write(BLOCK.format(n=n).encode())
+            out.write(DOCUMENT_TAIL.encode())
+    return blocks * PARAGRAPHS_PER_BLOCK
+
+
+def measure(label, paragraphs, func):
+    """Time a run untraced, then repeat it under tracemalloc for peak memory"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('%-8s %9d paragraphs %8.3f s %12.0f para/s %9.1f MB peak'
+          % (label, paragraphs, elapsed, paragraphs / elapsed, peak / 1e6))
+
+
+def walk(path):
+    with DocxPackage(path) as package:
+        count = 0
+        for _, element, _ in walk_document(WordDocument(package)):
+            if element == PARAGRAPH:
+                count += 1
+    return count
+
+
+def main(sizes):
+    grader = Grader(TASKS)
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            path = os.path.join(folder, 'generated_%d.docx' % size)
+            paragraphs = build_document(path, size)
+            print('%s: %.1f KB zipped' % (os.path.basename(path), os.path.getsize(path) / 1e3))
+            measure('walk', paragraphs, lambda: walk(path))
+            measure('grade', paragraphs, lambda: grader.grade(path))
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
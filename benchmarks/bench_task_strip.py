@@ -0,0 +1,97 @@
+"""Repaint cost of the task strip per navigation
+
+Builds a TaskStrip over N tasks on the offscreen Qt platform, some marked
+complete or for review, and walks from task to task. Each navigation moves
+the highlight, changes the state of the task left behind, as marking it
+does, and repaints the strip synchronously. The delegate's paint calls are
+counted, to show that a navigation only repaints the rows in sight whatever
+the number of tasks. A filtered run times typing a search word.
+
+    python benchmarks/bench_task_strip.py [task counts...] [--moves N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from session import SessionState  # noqa: E402
+from task_strip import TaskDelegate, TaskStrip  # noqa: E402
+
+STATES = ('incomplete', 'complete', 'review')
+
+
+class CountingDelegate(TaskDelegate):
+    paints = 0
+
+    def paint(self, painter, option, index):
+        CountingDelegate.paints += 1
+        super().paint(painter, option, index)
+
+
+def build_strip(count):
+    states = SessionState(count)
+    for task in range(1, count + 1):
+        states[task] = STATES[task % 3]
+    strip = TaskStrip(states)
+    strip.delegate = CountingDelegate(strip)
+    strip.view.setItemDelegate(strip.delegate)
+    strip.set_texts(dict((task, f'Task {task} heading table list')
+                         for task in range(1, count + 1)))
+    strip.resize(900, 40)
+    strip.show()
+    return states, strip
+
+
+def bench_navigation(app, count, moves):
+    """Milliseconds and delegate paints per navigation, plus ms per search keystroke"""
+    states, strip = build_strip(count)
+    app.processEvents()
+    times, paints = [], []
+    previous = 1
+    for move in range(moves):
+        current = (move + 1) % count + 1
+        before = CountingDelegate.paints
+        started = time.perf_counter()
+        states[previous] = STATES[move % 3]
+        strip.set_current(current)
+        previous = current
+        strip.view.viewport().repaint()
+        app.processEvents()
+        times.append((time.perf_counter() - started) * 1000)
+        paints.append(CountingDelegate.paints - before)
+
+    started = time.perf_counter()
+    for text in ('h', 'he', 'hea', 'head', 'heading'):
+        strip.search.setText(text)
+        strip.view.viewport().repaint()
+        app.processEvents()
+    search = (time.perf_counter() - started) * 1000 / 5
+
+    strip.close()
+    strip.deleteLater()
+    app.processEvents()
+    return statistics.median(times), statistics.median(paints), search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('counts', nargs='*', type=int, default=[10, 50, 200, 500])
+    parser.add_argument('--moves', type=int, default=100, help='navigations to time per run')
+    options = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    print(f"{'tasks':>6} {'navigate ms':>12} {'paints':>7} {'search ms':>10}")
+    for count in options.counts:
+        navigate, paints, search = bench_navigation(app, count, options.moves)
+        print(f"{count:>6} {navigate:>12.2f} {paints:>7.0f} {search:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
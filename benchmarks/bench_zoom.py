@@ -0,0 +1,58 @@
+"""Cost of a zoom slider drag, restyling the description per step or once
+
+Drags the font size over the whole slider range on the offscreen Qt
+platform, restyling a task description on every step versus once when the
+drag settles, as the window's zoom timer does.
+
+    python benchmarks/bench_zoom.py [--runs N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+from styles import description_style  # noqa: E402
+
+
+def bench_zoom(app, debounced):
+    """Milliseconds to drag the zoom slider from the smallest to the largest size"""
+    text = QTextEdit()
+    text.setHtml('<p>' + 'Apply the Heading 1 style to the title. ' * 40 + '</p>')
+    text.resize(600, 200)
+    text.show()
+    app.processEvents()
+    started = time.perf_counter()
+    sizes = range(8, 25)
+    for size in sizes:
+        if not debounced:
+            text.setStyleSheet(description_style(size))
+            text.repaint()
+        app.processEvents()
+    if debounced:
+        text.setStyleSheet(description_style(sizes[-1]))
+        text.repaint()
+    elapsed = (time.perf_counter() - started) * 1000
+    text.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='drags to time each way')
+    options = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    every_step = statistics.median(bench_zoom(app, debounced=False) for _ in range(options.runs))
+    settled = statistics.median(bench_zoom(app, debounced=True) for _ in range(options.runs))
+    print(f"zoom drag: {every_step:.1f} ms restyling every step, {settled:.1f} ms debounced")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Replay scripted exam sessions against TestWindow without a display
+
+Each level runs in its own process on the offscreen Qt platform with the
+local document backend. It opens N TestWindows side by side and plays one
+script per window, interleaving the windows action by action. Dialogs
+answer Yes/OK straight away. Reports sessions/second, p50/p99 latency per
+action, the peak RSS of the level's process and how many times a document
+was actually opened.
+
+Scripts are either generated at random or loaded from a JSON file holding a
+list of sessions, each a list of [action, *args] steps, for example
+[["go_to_task", 3], ["edit"], ["mark_task_complete"], ["submit_project"]].
+
+    python benchmarks/replay_sessions.py [--sessions 1 10 50] [--actions 40]
+                                         [--seed 1] [--script sessions.json]
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TOTAL_TASKS = 10
+
+# Relative frequency of each action in generated scripts
+ACTION_WEIGHTS = {
+    'go_to_task': 6,
+    'go_to_next': 4,
+    'go_to_previous': 2,
+    'edit': 6,
+    'mark_task_complete': 4,
+    'mark_task_for_review': 2,
+    'submit_project': 1,
+    'restart_project': 1,
+}
+
+
+def random_script(rng, length):
+    names = list(ACTION_WEIGHTS)
+    weights = [ACTION_WEIGHTS[name] for name in names]
+    script = []
+    for name in rng.choices(names, weights, k=length):
+        if name == 'go_to_task':
+            script.append([name, rng.randint(1, TOTAL_TASKS)])
+        else:
+            script.append([name])
+    return script
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def answer_dialogs():
+    """Make every QMessageBox return immediately, as if the candidate clicked Yes/OK"""
+    from PyQt5.QtWidgets import QMessageBox
+    QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.Yes)
+    QMessageBox.warning = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+    QMessageBox.information = staticmethod(lambda *args, **kwargs: QMessageBox.Ok)
+
+
+def edit(window):
+    """Stand in for the candidate typing in Word: the open document becomes dirty"""
+    doc = window.source_doc
+    if doc is not None:
+        doc.replace_part('word/document.xml', doc.read_part('word/document.xml'))
+
+
+def run_level(count, scripts):
+    """Play `count` sessions in this process; returns the level's measurements"""
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    os.environ['MOS_DOCUMENT_BACKEND'] = 'local'
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    answer_dialogs()
+    from app import TestWindow
+
+    latencies = {}
+
+    def timed(name, func, *args):
+        start = time.perf_counter()
+        func(*args)
+        app.processEvents()
+        latencies.setdefault(name, []).append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as folder:
+        started = time.perf_counter()
+        windows = []
+        for index in range(count):
+            os.environ['MOS_SAVE_FOLDER'] = os.path.join(folder, 'session_%d' % index)
+            timed('start', lambda: windows.append(TestWindow()))
+
+        plays = [(window, scripts[index % len(scripts)]) for index, window in enumerate(windows)]
+        for step in range(max(len(script) for _, script in plays)):
+            for window, script in plays:
+                if step < len(script):
+                    name, args = script[step][0], script[step][1:]
+                    func = (lambda w=window: edit(w)) if name == 'edit' else getattr(window, name)
+                    timed(name, func, *args)
+
+        opens = sum(window.documents.opens for window in windows)
+        prefetched = sum(window.documents.prefetched for window in windows)
+        for window in windows:
+            timed('close', window.close)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'sessions': count,
+        'elapsed': elapsed,
+        'peak_rss': peak_rss(),
+        'opens': opens,
+        'prefetched': prefetched,
+        'latency': dict((name, [percentile(values, 0.5), percentile(values, 0.99), len(values)])
+                        for name, values in latencies.items()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--actions', type=int, default=40, help='steps per generated script')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--script', help='JSON file with recorded sessions')
+    parser.add_argument('--level', type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.script:
+        with open(options.script, encoding='utf-8') as source:
+            scripts = json.load(source)
+    else:
+        rng = random.Random(options.seed)
+        scripts = [random_script(rng, options.actions) for _ in range(max(options.sessions))]
+
+    if options.level is not None:
+        # Child process: run one level and hand the numbers back as JSON
+        print(json.dumps(run_level(options.level, scripts)))
+        return
+
+    for count in options.sessions:
+        # A fresh process per level so peak RSS belongs to that level alone
+        command = [sys.executable, os.path.abspath(__file__), '--level', str(count),
+                   '--actions', str(options.actions), '--seed', str(options.seed),
+                   '--sessions'] + [str(n) for n in options.sessions]
+        if options.script:
+            command += ['--script', options.script]
+        output = subprocess.run(command, check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print('%d sessions: %.2f sessions/s, %.1f s total, %.1f MB peak RSS, '
+              '%d document opens (%d prefetched)'
+              % (count, count / result['elapsed'], result['elapsed'], result['peak_rss'] / 1e6,
+                 result['opens'], result['prefetched']))
+        for name, (p50, p99, calls) in sorted(result['latency'].items()):
+            print('    %-22s %6d calls  p50 %8.2f ms  p99 %8.2f ms'
+                  % (name, calls, p50 * 1e3, p99 * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""Catalog of the exam projects on disk
+
+A project is a requirements workbook named <id>_Requirements.xlsx plus the
+source documents its FileName column names, in the same folder. A
+project.json next to the workbooks can set the exam and titles:
+
+    {"exam": "MO-200", "projects": {"Project1": {"title": "Skill Review 1"}}}
+
+The catalog root (MOS_PROJECTS_DIR, or the app folder) is searched for
+workbooks. The index in .cache/catalog.json keeps each project's id, exam,
+task count and source file hashes, and what every folder it searched
+held. Refreshing it stats each folder and lists only those whose mtime
+changed, then stats the files it already knows, so the picker opens
+straight away however many projects and folders there are. A project's
+tasks are read when it is selected.
+
+    python catalog.py [ROOT]
+"""
+import hashlib
+import json
+import os
+import posixpath
+import sys
+import tempfile
+
+from task_loader import CACHE_FOLDER, load_task_records
+
+
+INDEX_FORMAT = 2
+ROOT_ENV = 'MOS_PROJECTS_DIR'
+SHEET_SUFFIX = '_Requirements.xlsx'
+PROJECT_FILE = 'project.json'
+DEFAULT_EXAM = 'MO-100'
+
+# Folders under the root that hold saves, never projects
+SKIP_FOLDERS = {'Completed_Tasks'}
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    """[mtime_ns, size], or None for a missing file"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class Project:
+    """One catalog entry; tasks are loaded on first use"""
+
+    def __init__(self, root, entry):
+        self.id = entry['id']
+        self.title = entry['title']
+        self.exam = entry['exam']
+        self.task_count = entry['task_count']
+        self.folder = os.path.join(root, entry['folder'])
+        self.requirements = os.path.join(root, entry['requirements'])
+        # Source file name -> SHA-256, None when the file is missing
+        self.files = dict((name, info['sha256']) for name, info in entry['files'].items())
+        self._tasks = None
+
+    def source_path(self, file_name):
+        return os.path.join(self.folder, str(file_name))
+
+    def load_tasks(self):
+        """Task records from the workbook, or from its compiled cache"""
+        if self._tasks is None:
+            self._tasks = load_task_records(self.requirements)
+        return self._tasks
+
+
+class Catalog:
+    """Index of the projects under a root folder"""
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self.index_path = os.path.join(self.root, CACHE_FOLDER, 'catalog.json')
+        index = self._read_index()
+        self.entries = index.get('projects', {})    # workbook path relative to root -> entry
+        self.folders = index.get('folders', {})     # folder relative to root -> listing
+        self.listed = 0                             # folders read from disk by refresh()
+        self._projects = {}
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as source:
+                index = json.load(source)
+        except (OSError, ValueError):
+            return {}
+        if index.get('format') != INDEX_FORMAT:
+            return {}
+        return index
+
+    def _write_index(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path),
+                                             prefix='.tmp-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                json.dump({'format': INDEX_FORMAT, 'projects': self.entries,
+                           'folders': self.folders}, out, ensure_ascii=False)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # A read-only root still works, it just rescans every launch
+            pass
+
+    def _listing(self, relative):
+        """{'mtime', 'folders', 'workbooks'} of a folder, listed only if its mtime changed
+
+        Adding, removing or renaming an entry changes its folder's mtime, so an
+        unchanged mtime means the cached listing still holds.
+        """
+        path = os.path.join(self.root, relative)
+        mtime = os.stat(path).st_mtime_ns
+        listing = self.folders.get(relative)
+        if listing is not None and listing['mtime'] == mtime:
+            return listing
+        folders, workbooks = [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.name.startswith('.') and entry.name not in SKIP_FOLDERS:
+                        folders.append(entry.name)
+                elif entry.name.endswith(SHEET_SUFFIX) and not entry.name.startswith('~$'):
+                    workbooks.append(entry.name)
+        self.listed += 1
+        return {'mtime': mtime, 'folders': sorted(folders), 'workbooks': sorted(workbooks)}
+
+    def _workbooks(self, folders):
+        """Yield (folder, workbook name) for every project under the root
+
+        Fills folders with the listing of every folder searched.
+        """
+        pending = ['.']
+        while pending:
+            relative = pending.pop()
+            try:
+                listing = folders[relative] = self._listing(relative)
+            except OSError:
+                continue    # Removed while searching, or not readable
+            folder = os.path.normpath(os.path.join(self.root, relative))
+            for name in listing['workbooks']:
+                yield folder, name
+            pending.extend(reversed([posixpath.join(relative, name) if relative != '.' else name
+                                     for name in listing['folders']]))
+
+    def refresh(self):
+        """Bring the index up to date with the disk; returns how many entries were rebuilt"""
+        entries = {}
+        folders = {}
+        rebuilt = 0
+        for folder, name in self._workbooks(folders):
+            path = os.path.join(folder, name)
+            key = os.path.relpath(path, self.root).replace(os.sep, '/')
+            signature = [_stat(path), _stat(os.path.join(folder, PROJECT_FILE))]
+            entry = self.entries.get(key)
+            if entry is None or entry['signature'] != signature:
+                try:
+                    entry = self._build(folder, name, signature)
+                except Exception:
+                    # A broken workbook should not hide every other project
+                    continue
+                rebuilt += 1
+            elif self._refresh_files(entry, folder):
+                rebuilt += 1
+            entries[key] = entry
+
+        changed = rebuilt or entries.keys() != self.entries.keys() or folders != self.folders
+        self.entries = entries
+        self.folders = folders
+        self._projects = {}
+        if changed:
+            self._write_index()
+        return rebuilt
+
+    def _build(self, folder, name, signature):
+        stem = name[:-len(SHEET_SUFFIX)]
+        meta = {}
+        if signature[1] is not None:
+            with open(os.path.join(folder, PROJECT_FILE), encoding='utf-8') as source:
+                meta = json.load(source)
+        overrides = meta.get('projects', {}).get(stem, {})
+
+        relative_folder = os.path.relpath(folder, self.root).replace(os.sep, '/')
+        records = load_task_records(os.path.join(folder, name))
+        entry = {
+            'id': stem if relative_folder == '.' else relative_folder + '/' + stem,
+            'title': overrides.get('title', stem.replace('_', ' ')),
+            'exam': overrides.get('exam', meta.get('exam', DEFAULT_EXAM)),
+            'folder': relative_folder,
+            'requirements': (name if relative_folder == '.'
+                             else relative_folder + '/' + name),
+            'signature': signature,
+            'task_count': len(records),
+            'files': dict((str(record['file_name']), {'stat': None, 'sha256': None})
+                          for record in records if record['file_name']),
+        }
+        self._refresh_files(entry, folder)
+        return entry
+
+    def _refresh_files(self, entry, folder):
+        """Rehash the source files whose stat changed; returns True if any did"""
+        changed = False
+        for name, info in entry['files'].items():
+            path = os.path.join(folder, name)
+            stat = _stat(path)
+            if stat != info['stat']:
+                info['stat'] = stat
+                info['sha256'] = _file_hash(path) if stat is not None else None
+                changed = True
+        return changed
+
+    def _project(self, entry):
+        project = self._projects.get(entry['id'])
+        if project is None:
+            project = self._projects[entry['id']] = Project(self.root, entry)
+        return project
+
+    def projects(self, exam=None):
+        """Projects sorted by exam and title, optionally only one exam's"""
+        entries = sorted(self.entries.values(), key=lambda entry: (entry['exam'], entry['title']))
+        return [self._project(entry) for entry in entries
+                if exam is None or entry['exam'] == exam]
+
+    def get(self, project_id):
+        for entry in self.entries.values():
+            if entry['id'] == project_id:
+                return self._project(entry)
+        return None
+
+    def exams(self):
+        return sorted(set(entry['exam'] for entry in self.entries.values()))
+
+
+_default = None
+
+
+def default_catalog():
+    """The app's catalog, refreshed once per process"""
+    global _default
+    if _default is None:
+        root = os.environ.get(ROOT_ENV) or os.path.dirname(os.path.abspath(__file__))
+        _default = Catalog(root)
+        _default.refresh()
+    return _default
+
+
+if __name__ == '__main__':
+    catalog = Catalog(sys.argv[1] if len(sys.argv) > 1 else
+                      os.environ.get(ROOT_ENV) or os.path.dirname(os.path.abspath(__file__)))
+    rebuilt = catalog.refresh()
+    for project in catalog.projects():
+        missing = [name for name, digest in project.files.items() if digest is None]
+        print(f"{project.exam:8} {project.task_count:3} tasks  {project.id}  ({project.title})"
+              + (f"  missing: {', '.join(missing)}" if missing else ''))
+    print(f"{len(catalog.entries)} projects, {rebuilt} reindexed")
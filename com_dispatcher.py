@@ -0,0 +1,316 @@
+"""Word automation on a thread of its own
+
+Dispatcher runs callables one at a time on a single worker thread and
+hands back concurrent.futures.Future objects. For Word that thread owns the
+COM apartment: Word is started there, every document lives there, and no
+other thread touches a COM object. Calls the window does not need an
+answer to (activate, close) are queued and return at once. The others wait
+on their future with a timeout, so a hung Word costs the window a bounded
+wait instead of a freeze. Calls Word rejects because it is busy are retried
+with backoff. Adjacent queued calls with the same key, such as a burst of
+activations, run once and share the result. Background work such as
+prefetching queues behind everything the window asks for.
+
+DispatchedBackend wraps a DocumentBackend this way; create_backend() puts
+Word behind one. On Linux, fake_word.FakeWordBackend stands in for Word:
+
+    python com_dispatcher.py [--latency S] [--busy-rate R] [--documents N]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from backends import DocumentBackend
+
+
+URGENT, BACKGROUND = 0, 1
+
+CALL_TIMEOUT = 10.0     # seconds; quick property reads and activation
+OPEN_TIMEOUT = 60.0
+SAVE_TIMEOUT = 120.0
+RETRIES = 4
+RETRY_DELAY = 0.1       # seconds, doubled on every retry
+
+# HRESULTs Word returns while it is busy, e.g. with a dialog open
+RPC_E_CALL_REJECTED = -2147418111
+RPC_E_SERVERCALL_RETRYLATER = -2147417846
+BUSY_HRESULTS = (RPC_E_CALL_REJECTED, RPC_E_SERVERCALL_RETRYLATER)
+
+
+class DispatchTimeout(TimeoutError):
+    pass
+
+
+def is_busy(error):
+    """True for the COM errors that mean "try again later" rather than failure"""
+    args = getattr(error, 'args', None)
+    return bool(args) and args[0] in BUSY_HRESULTS
+
+
+class Command:
+    def __init__(self, function, args, key, retries, timeout):
+        self.function = function
+        self.args = args
+        self.key = key
+        self.retries = retries
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.future = Future()
+
+    @property
+    def name(self):
+        return getattr(self.function, '__name__', repr(self.function))
+
+
+class Dispatcher:
+    """Runs callables in order on one worker thread, started on first use"""
+
+    def __init__(self, thread_started=None, thread_finished=None, name='automation'):
+        self.thread_started = thread_started
+        self.thread_finished = thread_finished
+        self.name = name
+        self.calls = 0          # commands actually run
+        self.batched = 0        # commands folded into an adjacent one
+        self.retried = 0
+        self.timeouts = 0
+        self._condition = threading.Condition()
+        self._queues = (deque(), deque())   # by priority, URGENT first
+        self._thread = None
+        self._stopping = False
+
+    @property
+    def worker(self):
+        return self._thread
+
+    def submit(self, function, *args, key=None, retries=0, timeout=None, priority=URGENT):
+        """Queue function(*args); returns its Future
+
+        Adjacent commands with the same key are merged: the last one runs and
+        every merged future gets its result.
+        """
+        command = Command(function, args, key, retries, timeout)
+        with self._condition:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._queues[priority].append(command)
+            self._condition.notify()
+        return command.future
+
+    def call(self, function, *args, timeout=CALL_TIMEOUT, **options):
+        """Run function(*args) on the worker and wait for its result"""
+        if threading.current_thread() is self._thread:
+            return function(*args)  # already on the worker, e.g. from a queued command
+        future = self.submit(function, *args, timeout=timeout, **options)
+        try:
+            return future.result(timeout)
+        except FutureTimeout:
+            future.cancel()     # dropped if it has not started yet
+            self.timeouts += 1
+            name = getattr(function, '__name__', 'call')
+            raise DispatchTimeout(f"{name} did not finish within {timeout:g}s")
+
+    def stop(self, timeout=None):
+        """Run what is queued, then end the worker thread; the next submit starts a new one"""
+        with self._condition:
+            thread = self._thread
+            self._stopping = True
+            self._condition.notify()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _next(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._queues[0] or self._queues[1] or self._stopping)
+            for queue in self._queues:
+                if queue:
+                    batch = [queue.popleft()]
+                    while batch[0].key is not None and queue and queue[0].key == batch[0].key:
+                        batch.append(queue.popleft())
+                    return batch
+            self._thread = None
+            return None
+
+    def _run(self):
+        if self.thread_started:
+            self.thread_started()
+        try:
+            while True:
+                batch = self._next()
+                if batch is None:
+                    return
+                self._execute(batch)
+        finally:
+            if self.thread_finished:
+                self.thread_finished()
+
+    def _execute(self, batch):
+        futures = [command.future for command in batch
+                   if command.future.set_running_or_notify_cancel()]
+        if not futures:
+            return
+        command = batch[-1]
+        self.batched += len(batch) - 1
+        attempt = 0
+        while True:
+            try:
+                result = command.function(*command.args)
+            except Exception as e:
+                late = command.deadline is not None and time.monotonic() > command.deadline
+                if attempt < command.retries and is_busy(e) and not late:
+                    time.sleep(RETRY_DELAY * 2 ** attempt)
+                    attempt += 1
+                    self.retried += 1
+                    continue
+                for future in futures:
+                    future.set_exception(e)
+            else:
+                for future in futures:
+                    future.set_result(result)
+            break
+        self.calls += 1
+
+
+class DispatchedBackend(DocumentBackend):
+    """A DocumentBackend whose every call runs on a Dispatcher thread
+
+    The wrapped backend's objects never leave that thread, so other threads
+    need no marshalling: thread tokens are the handles themselves and the
+    autosave and prefetch threads simply queue their calls.
+    """
+
+    def __init__(self, backend, dispatcher=None):
+        self.backend = backend
+        self.name = backend.name
+        self.dispatcher = dispatcher or Dispatcher(backend.thread_started,
+                                                   backend.thread_finished)
+        self._editor = None     # the editor as seen from the worker, for prefetching
+
+    def start(self):
+        self.dispatcher.call(self.backend.start, timeout=OPEN_TIMEOUT)
+
+    def open(self, path):
+        return self.dispatcher.call(self.backend.open, path, timeout=OPEN_TIMEOUT,
+                                    retries=RETRIES)
+
+    def save_as(self, doc, path):
+        self.dispatcher.call(self.backend.save_as, doc, path, timeout=SAVE_TIMEOUT,
+                             retries=RETRIES)
+
+    def close(self, doc, save_changes=False):
+        if save_changes:
+            self.dispatcher.call(self.backend.close, doc, True, timeout=SAVE_TIMEOUT,
+                                 retries=RETRIES)
+        else:
+            self.dispatcher.submit(self.backend.close, doc, False, retries=RETRIES)
+
+    def is_saved(self, doc):
+        return self.dispatcher.call(self.backend.is_saved, doc, key=('is_saved', id(doc)),
+                                    retries=RETRIES)
+
+    def file_path(self, doc):
+        return self.dispatcher.call(self.backend.file_path, doc, retries=RETRIES)
+
+    def activate(self, doc=None):
+        # Only the last of a burst of activations matters
+        self.dispatcher.submit(self.backend.activate, doc, key='activate')
+
+    def quit(self):
+        def quit_editor():
+            self._editor = None
+            self.backend.quit()
+        try:
+            self.dispatcher.call(quit_editor, timeout=SAVE_TIMEOUT)
+        except DispatchTimeout:
+            pass
+        self.dispatcher.stop(CALL_TIMEOUT)
+
+    # Other threads reach documents through the dispatcher, not by marshalling
+
+    def thread_token(self, doc):
+        return doc
+
+    def thread_document(self, token):
+        return token
+
+    def thread_started(self):
+        pass
+
+    def thread_finished(self):
+        pass
+
+    def prefetch_token(self):
+        return None
+
+    def prefetch(self, editor, path):
+        return self.dispatcher.call(self._prefetch, path, timeout=OPEN_TIMEOUT,
+                                    retries=RETRIES, priority=BACKGROUND)
+
+    def _prefetch(self, path):
+        if self._editor is None:
+            token = self.backend.prefetch_token()
+            self._editor = self.backend.thread_document(token) if token is not None else None
+        return self.backend.prefetch(self._editor, path)
+
+    def adopt(self, token):
+        return self.dispatcher.call(self.backend.adopt, token)
+
+
+def main(argv=None):
+    """Drive the fake Word through the dispatcher and report what the UI thread waited"""
+    from fake_word import FakeWordBackend
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per Word call')
+    parser.add_argument('--busy-rate', type=float, default=0.1,
+                        help='share of calls Word rejects as busy')
+    parser.add_argument('--documents', type=int, default=5)
+    options = parser.parse_args(argv)
+
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '2019_WE_101_Houseboating.docx')
+    folder = tempfile.mkdtemp(prefix='mos-dispatch-')
+    try:
+        paths = []
+        for number in range(options.documents):
+            paths.append(os.path.join(folder, f'task{number + 1}.docx'))
+            shutil.copyfile(source, paths[-1])
+
+        backend = DispatchedBackend(FakeWordBackend(options.latency, options.busy_rate, seed=1))
+        started = time.perf_counter()
+        backend.start()
+        docs = [backend.open(path) for path in paths]
+        opened = time.perf_counter() - started
+
+        # A drag or resize: the UI thread only queues these
+        started = time.perf_counter()
+        for _ in range(200):
+            backend.activate(docs[0])
+        queued = time.perf_counter() - started
+
+        for doc in docs:
+            doc.edit()
+        saved = [backend.is_saved(doc) for doc in docs]
+        backend.save_as(docs[0], os.path.join(folder, 'saved.docx'))
+        for doc in docs:
+            backend.close(doc)
+        backend.quit()
+
+        dispatcher = backend.dispatcher
+        print(f"opened {len(docs)} documents in {opened:.2f}s; "
+              f"200 activations queued in {queued * 1000:.1f} ms")
+        print(f"{dispatcher.calls} calls run, {dispatcher.batched} merged, "
+              f"{dispatcher.retried} busy retries, {dispatcher.timeouts} timeouts; "
+              f"saved flags {saved}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
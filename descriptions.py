@@ -0,0 +1,80 @@
+"""Task descriptions rendered once into QTextDocuments and reused
+
+setHtml() parses the HTML and lays the whole QTextEdit out again, which the
+exam window used to do on every navigation and zoom step. Here each task's
+description is parsed into its own QTextDocument the first time it is
+shown and kept; showing it again is a setDocument(), whose layout is also
+kept while the width stays the same. A document is rebuilt only when its
+task's description or actions change. The HTML carries no font sizes, so a
+zoom only sets the document's default font.
+"""
+from PyQt5.QtGui import QTextDocument
+
+
+DEFAULT_FONT_SIZE = 13
+
+UNAVAILABLE_HTML = (
+    "<div style='margin: 5px 0; color: black;'>"
+    "<div style='margin: 0 0 8px 0;'>Task details not available.</div>"
+    "</div>")
+
+
+def description_html(task_number, task):
+    """HTML for a task's description, or a placeholder when task is None"""
+    if task is None:
+        return UNAVAILABLE_HTML
+    actions = ''.join(f"<li style='margin: 2px 0;'>{action}</li>"
+                      for action in task.required_actions)
+    return (
+        "<div style='margin-bottom: 10px;'>"
+        f"<h3 style='color: #2b579a; margin: 0 0 10px 0;'>Task {task_number}</h3>"
+        f"<div style='margin: 0 0 10px 0; color: black;'>{task.description}</div>"
+        "<p style='color: #2b579a; font-weight: bold; margin: 5px 0;'>Required Actions:</p>"
+        f"<ul style='margin: 0; padding-left: 20px; color: black;'>{actions}</ul>"
+        "</div>")
+
+
+class DescriptionRenderer:
+    """Cache of rendered task descriptions, one QTextDocument per task number"""
+
+    def __init__(self, font_size=DEFAULT_FONT_SIZE):
+        self.font_size = font_size
+        self._documents = {}    # task number -> (definition, QTextDocument)
+        self._message = QTextDocument()
+        self.renders = 0        # documents built, for benchmarks
+
+    def document(self, task_number, task):
+        """The rendered description of a task, built the first time or after it changed"""
+        definition = (task.description, tuple(task.required_actions)) if task else None
+        cached = self._documents.get(task_number)
+        if cached is None or cached[0] != definition:
+            document = QTextDocument()
+            document.setHtml(description_html(task_number, task))
+            self.renders += 1
+            cached = self._documents[task_number] = (definition, document)
+        return self.apply_font(cached[1])
+
+    def message(self, html):
+        """A scratch document for status messages, so cached descriptions are never overwritten"""
+        self._message.setHtml(html)
+        return self.apply_font(self._message)
+
+    def apply_font(self, document):
+        """Give a document the current font size; only documents shown again pay for a zoom"""
+        font = document.defaultFont()
+        if font.pixelSize() != self.font_size:
+            font.setPixelSize(self.font_size)
+            document.setDefaultFont(font)
+        return document
+
+    def clear(self, view=None):
+        """Forget every rendered description
+
+        The documents have no Qt parent and are deleted with the last
+        reference, so a view still showing one is first given the empty
+        message document.
+        """
+        if view is not None and any(view.document() is document
+                                    for _, document in self._documents.values()):
+            view.setDocument(self.message(''))
+        self._documents.clear()
@@ -0,0 +1,242 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+
+
+LIMIT_ENV = 'MOS_OPEN_DOCUMENTS'
+DEFAULT_LIMIT = 4
+TAKE_WAIT = 10.0    # seconds a switch waits for a prefetch in progress before opening directly
+
+
+def likely_next(current, history, total, depth=2):
+    """Tasks the candidate will probably open next, most likely first
+
+    Tasks that followed the current one earlier in the history come first,
+    since candidates go back to recheck, then the next and previous task.
+    """
+    followers = Counter(after for before, after in zip(history, history[1:])
+                        if before == current)
+    ranked = [task for task, _ in followers.most_common()] + [current + 1, current - 1]
+    tasks = []
+    for task in ranked:
+        if 1 <= task <= total and task != current and task not in tasks:
+            tasks.append(task)
+    return tasks[:depth]
+
+
+class Prefetcher:
+    """Opens documents on a worker thread for DocumentSessions to adopt later"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.failed = 0
+        self._editor_token = backend.prefetch_token()
+        self._condition = threading.Condition()
+        self._queue = []                # keys still to open, most likely first
+        self._opening = None            # key the worker is opening right now
+        self._ready = OrderedDict()     # key -> thread token, in the order they were opened
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='prefetch', daemon=True)
+        self._thread.start()
+
+    def request(self, keys):
+        """Replace the queue; the newest prediction wins"""
+        with self._condition:
+            self._queue = [key for key in keys if key != self._opening and key not in self._ready]
+            self._condition.notify_all()
+
+    def take(self, key=None, timeout=TAKE_WAIT):
+        """Hand over every opened document as (key, token) pairs
+
+        If key is being opened right now this waits for it, up to timeout
+        seconds; after that, or if it is only queued, the caller opens it
+        directly. A copy the worker finishes later comes with the next take.
+        """
+        with self._condition:
+            if key in self._queue:
+                self._queue.remove(key)
+            if key is not None:
+                self._condition.wait_for(lambda: self._opening != key, timeout)
+            ready = list(self._ready.items())
+            self._ready.clear()
+        return ready
+
+    def cancel(self):
+        """Drop the queue and wait for the document being opened, if any"""
+        with self._condition:
+            self._queue = []
+            self._condition.wait_for(lambda: self._opening is None)
+
+    def stop(self, timeout=None):
+        with self._condition:
+            self._queue = []
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        self.backend.thread_started()
+        editor = None
+        try:
+            if self._editor_token is not None:
+                editor = self.backend.thread_document(self._editor_token)
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._queue or self._stopped)
+                    if self._stopped:
+                        return
+                    key = self._opening = self._queue.pop(0)
+
+                try:
+                    token = self.backend.prefetch(editor, key)
+                except Exception:
+                    # Not fatal: switch() opens the document itself
+                    token = None
+
+                with self._condition:
+                    if token is None:
+                        self.failed += 1
+                    else:
+                        self._ready[key] = token
+                    self._opening = None
+                    self._condition.notify_all()
+        finally:
+            editor = None   # release the editor proxy before COM is torn down
+            self.backend.thread_finished()
+
+
+class DocumentSessions:
+    """Open exam documents by path, kept open across task switches
+
+    Every file is opened through the backend once. Switching tasks only looks
+    up the open handle, so moving between tasks that share a document costs
+    no document I/O and no trip to Word. With prefetching started, documents
+    the candidate is likely to need next are opened on a worker thread and
+    handed over on the switch. At most limit documents stay open; the least
+    recently used saved ones are closed first. A closed document that was
+    saved elsewhere, such as to an autosave working copy, is opened again
+    from that file, so closing it never loses the candidate's edits.
+    """
+
+    def __init__(self, backend, limit=None):
+        self.backend = backend
+        self.handles = OrderedDict()    # normalized path -> handle, least recently used first
+        self.reopen = {}                # normalized path -> file an evicted document was saved to
+        self.current_path = None
+        self.limit = limit if limit is not None else int(
+            os.environ.get(LIMIT_ENV, DEFAULT_LIMIT))
+        self.prefetcher = None
+        self.opens = 0              # real opens, for load tests
+        self.prefetched = 0         # opens done ahead of time by the prefetcher
+        self.evicted = 0
+
+    @staticmethod
+    def key(path):
+        return os.path.normcase(os.path.abspath(str(path)))
+
+    def __contains__(self, path):
+        return self.key(path) in self.handles
+
+    @property
+    def current(self):
+        return self.handles.get(self.current_path)
+
+    def switch(self, path):
+        """Make a document the active one, opening it only the first time"""
+        key = self.key(path)
+        self._adopt(key)
+        doc = self.handles.get(key)
+        if doc is None:
+            source = self.reopen.get(key, key)
+            if not os.path.exists(source):
+                raise FileNotFoundError(path)
+            doc = self.backend.open(source)
+            self.reopen.pop(key, None)
+            self.handles[key] = doc
+            self.opens += 1
+        self.handles.move_to_end(key)
+        if key != self.current_path:
+            self.current_path = key
+            self.backend.activate(doc)
+        self._evict()
+        return doc
+
+    def start_prefetch(self):
+        """Open predicted documents on a worker thread from now on; call after backend.start()"""
+        if self.prefetcher is None:
+            self.prefetcher = Prefetcher(self.backend)
+
+    def prefetch(self, paths):
+        """Have the prefetcher open these documents, most likely first"""
+        if self.prefetcher is None:
+            return
+        keys = []
+        for path in paths:
+            key = self.key(path)
+            # Evicted documents reopen from their saved copy in switch()
+            if (key not in self.handles and key not in self.reopen and key not in keys
+                    and os.path.exists(key)):
+                keys.append(key)
+        self.prefetcher.request(keys[:self.limit - 1] if self.limit else keys)
+
+    def _adopt(self, key=None):
+        """Take over what the prefetcher has opened, waiting for key if it is in progress"""
+        if self.prefetcher is None:
+            return
+        for ready_key, token in self.prefetcher.take(key):
+            doc = self.backend.adopt(token)
+            if ready_key in self.handles:
+                # Opened directly in the meantime; keep that handle
+                self.backend.close(doc)
+                continue
+            self.handles[ready_key] = doc
+            self.prefetched += 1
+
+    def _evict(self):
+        """Close the least recently used documents over the limit, never current or unsaved ones
+
+        Remembers where each was last saved, to open it from there again.
+        """
+        if not self.limit:
+            return
+        for key in list(self.handles):
+            if len(self.handles) <= self.limit:
+                break
+            doc = self.handles[key]
+            if key != self.current_path and self.backend.is_saved(doc):
+                saved_to = self.key(self.backend.file_path(doc))
+                if saved_to != key:
+                    self.reopen[key] = saved_to
+                self.close(key)
+                self.evicted += 1
+
+    def is_dirty(self, path=None):
+        """True when a document (the current one by default) has unsaved changes"""
+        doc = self.handles.get(self.key(path)) if path else self.current
+        return doc is not None and not self.backend.is_saved(doc)
+
+    def dirty_paths(self):
+        return [path for path, doc in self.handles.items() if not self.backend.is_saved(doc)]
+
+    def close(self, path, save_changes=False):
+        key = self.key(path)
+        doc = self.handles.pop(key, None)
+        if doc is not None:
+            self.backend.close(doc, save_changes)
+        if key == self.current_path:
+            self.current_path = None
+
+    def close_all(self):
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+            self._adopt()
+        for path in list(self.handles):
+            self.close(path)
+        self.reopen.clear()
+
+    def shutdown(self):
+        """Close every document and end the prefetch thread"""
+        self.close_all()
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
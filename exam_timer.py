@@ -0,0 +1,153 @@
+"""Exam clock derived from a monotonic clock rather than counted ticks
+
+A QTimer tick can arrive late, or several can be coalesced into one, while
+the UI thread is busy in Word, a message box or a save. Counting ticks then
+falls behind real time. ExamTimer instead stores when it was started and
+adds up the running spans, so whatever the tick rate the elapsed time is
+exact. poll() returns the whole second only when it has changed, so the
+label is repainted once a second however often the UI asks. Time is also
+booked to the task that is open, and limits call back once when crossed.
+"""
+import os
+import time
+
+
+LIMIT_ENV = 'MOS_EXAM_MINUTES'
+WARNING_SECONDS = 5 * 60    # warn this long before the limit
+TICK_MS = 200               # how often the UI polls; the display stays within this of real time
+
+
+def configured_limit():
+    """The exam time limit in seconds from MOS_EXAM_MINUTES, or None for no limit"""
+    try:
+        minutes = float(os.environ.get(LIMIT_ENV, ''))
+    except ValueError:
+        return None
+    return minutes * 60 if minutes > 0 else None
+
+
+def format_elapsed(seconds):
+    """hh:mm:ss for a whole number of seconds"""
+    seconds = max(0, int(seconds))
+    return f'{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}'
+
+
+class ExamTimer:
+    """Elapsed exam time with pause/resume, per-task totals and time limits"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._limits = []           # [seconds, callback, fired], in order added
+        self.reset()
+
+    def reset(self, elapsed=0.0, task_seconds=None):
+        """Stop and start over from elapsed, e.g. the time restored from a journal"""
+        self._banked = float(elapsed)           # time of the finished running spans
+        self._started = None                    # clock() when the running span began
+        self._task = None
+        self._task_banked = dict(task_seconds or {})
+        self._task_started = None
+        self._shown = None
+        for limit in self._limits:
+            limit[2] = limit[0] <= self._banked
+
+    @property
+    def running(self):
+        return self._started is not None
+
+    @property
+    def elapsed(self):
+        """Seconds of exam time so far, as a float"""
+        if self._started is None:
+            return self._banked
+        return self._banked + self.clock() - self._started
+
+    @property
+    def task(self):
+        return self._task
+
+    def start(self, task=None):
+        """Start or resume the clock, booking time to task from now on"""
+        if self._started is None:
+            now = self.clock()
+            self._started = now
+            if self._task is not None:
+                self._task_started = now
+        if task is not None:
+            self.switch_task(task)
+
+    resume = start
+
+    def pause(self):
+        if self._started is None:
+            return
+        now = self.clock()
+        self._banked += now - self._started
+        self._started = None
+        self._book_task(now)
+
+    def switch_task(self, task):
+        """Book the time so far to the open task and start timing task"""
+        if task == self._task:
+            return
+        now = self.clock()
+        self._book_task(now)
+        self._task = task
+        if self._started is not None:
+            self._task_started = now
+
+    def _book_task(self, now):
+        if self._task is not None and self._task_started is not None:
+            self._task_banked[self._task] = (self._task_banked.get(self._task, 0.0)
+                                             + now - self._task_started)
+        self._task_started = None
+
+    def task_seconds(self, task=None):
+        """Seconds spent on a task, or {task: seconds} for every task"""
+        totals = dict(self._task_banked)
+        if self._task is not None and self._task_started is not None:
+            totals[self._task] = totals.get(self._task, 0.0) + self.clock() - self._task_started
+        if task is not None:
+            return totals.get(task, 0.0)
+        return totals
+
+    def add_limit(self, seconds, callback):
+        """Call callback(elapsed) once, the first time elapsed reaches seconds"""
+        self._limits.append([seconds, callback, seconds <= self.elapsed])
+
+    def remaining(self):
+        """Seconds left before the last limit, or None without limits"""
+        if not self._limits:
+            return None
+        return max(0.0, max(limit[0] for limit in self._limits) - self.elapsed)
+
+    def poll(self):
+        """The whole elapsed second if it changed since the last poll, else None
+
+        Also fires the limits that have been crossed; call it from the UI tick.
+        """
+        elapsed = self.elapsed
+        for limit in self._limits:
+            if not limit[2] and elapsed >= limit[0]:
+                limit[2] = True
+                limit[1](elapsed)
+        second = int(elapsed)
+        if second == self._shown:
+            return None
+        self._shown = second
+        return second
+
+
+if __name__ == '__main__':
+    # Show that a blocked UI thread no longer slows the clock down
+    timer = ExamTimer()
+    timer.start(task=1)
+    ticks = 0
+    started = time.monotonic()
+    while time.monotonic() - started < 3:
+        time.sleep(0.7 if ticks % 3 == 0 else 0.05)   # every third tick is "blocked"
+        ticks += 1
+        second = timer.poll()
+        if second is not None:
+            print(format_elapsed(second))
+    print(f"{ticks} ticks, elapsed {timer.elapsed:.2f}s, task 1: {timer.task_seconds(1):.2f}s")
@@ -0,0 +1,158 @@
+"""A stand-in for Word's automation server, to run the COM code path on Linux
+
+FakeWordApplication mimics the part of Word's object model WordBackend
+uses: Documents.Open, SaveAs, Close, Saved, Activate, Windows(1).Visible
+and Quit. Like a single-threaded COM apartment, every call must come from
+the thread that created the application, or it fails with
+RPC_E_WRONG_THREAD. Each call takes a set latency, and a share of calls
+can be rejected as busy, the way Word rejects calls while a dialog is open.
+
+Select it with MOS_DOCUMENT_BACKEND=fake-word. MOS_FAKE_WORD_LATENCY and
+MOS_FAKE_WORD_BUSY_RATE set the latency in seconds and the busy share.
+"""
+import os
+import random
+import shutil
+import threading
+import time
+
+from backends import WordBackend
+
+
+LATENCY_ENV = 'MOS_FAKE_WORD_LATENCY'
+BUSY_RATE_ENV = 'MOS_FAKE_WORD_BUSY_RATE'
+
+RPC_E_CALL_REJECTED = -2147418111
+RPC_E_WRONG_THREAD = -2147417842
+FILE_NOT_FOUND = -2146823114
+
+
+class FakeComError(Exception):
+    """Shaped like pywintypes.com_error: args are (hresult, message, excepinfo, argerror)"""
+
+    def __init__(self, hresult, message):
+        super().__init__(hresult, message, None, None)
+
+
+class FakeWordApplication:
+    def __init__(self, latency=0.0, busy_rate=0.0, seed=None):
+        self.owner = threading.get_ident()
+        self.latency = latency
+        self.busy_rate = busy_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.Visible = False
+        self.Documents = FakeDocuments(self)
+
+    def _call(self):
+        if threading.get_ident() != self.owner:
+            raise FakeComError(RPC_E_WRONG_THREAD, "The application called an interface that "
+                                                   "was marshalled for a different thread.")
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.busy_rate and self.random.random() < self.busy_rate:
+            raise FakeComError(RPC_E_CALL_REJECTED, "Call was rejected by callee.")
+
+    def Activate(self):
+        self._call()
+
+    def Quit(self):
+        self._call()
+        self.Documents.documents = []
+
+
+class FakeDocuments:
+    def __init__(self, app):
+        self.app = app
+        self.documents = []
+
+    def Open(self, path, AddToRecentFiles=True, Visible=True):
+        self.app._call()
+        if not os.path.exists(path):
+            raise FakeComError(FILE_NOT_FOUND, f"Sorry, we couldn't find your file. ({path})")
+        doc = FakeDocument(self.app, path, Visible)
+        self.documents.append(doc)
+        return doc
+
+    def __iter__(self):
+        self.app._call()
+        return iter(list(self.documents))
+
+
+class FakeWindow:
+    def __init__(self, visible):
+        self.Visible = visible
+
+
+class FakeDocument:
+    def __init__(self, app, path, visible):
+        self.app = app
+        self.FullName = str(path)
+        self._saved = True
+        self._window = FakeWindow(visible)
+
+    @property
+    def Saved(self):
+        self.app._call()
+        return self._saved
+
+    def Windows(self, index):
+        self.app._call()
+        return self._window
+
+    def Activate(self):
+        self.app._call()
+
+    def SaveAs(self, path):
+        self.app._call()
+        if os.path.abspath(path) != os.path.abspath(self.FullName):
+            shutil.copyfile(self.FullName, path)
+        self.FullName = str(path)
+        self._saved = True
+
+    def Close(self, SaveChanges=False):
+        self.app._call()
+        if SaveChanges and not self._saved:
+            self._saved = True
+        if self in self.app.Documents.documents:
+            self.app.Documents.documents.remove(self)
+
+    def edit(self):
+        """Stand in for the candidate typing; not part of Word's object model"""
+        self._saved = False
+
+
+class FakeWordBackend(WordBackend):
+    """WordBackend over FakeWordApplication instead of Word"""
+
+    name = 'fake-word'
+
+    def __init__(self, latency=None, busy_rate=None, seed=None):
+        super().__init__()
+        self.latency = float(os.environ.get(LATENCY_ENV, 0.0)) if latency is None else latency
+        self.busy_rate = (float(os.environ.get(BUSY_RATE_ENV, 0.0))
+                          if busy_rate is None else busy_rate)
+        self.seed = seed
+
+    @staticmethod
+    def available():
+        return True
+
+    def start(self):
+        self.word_app = FakeWordApplication(self.latency, self.busy_rate, self.seed)
+        self.word_app.Visible = True
+
+    # Nothing to marshal, so a call from the wrong thread fails like it would in Word
+
+    def thread_token(self, doc):
+        return doc
+
+    def thread_document(self, token):
+        return token
+
+    def thread_started(self):
+        pass
+
+    def thread_finished(self):
+        pass
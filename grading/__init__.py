@@ -0,0 +1,22 @@
+"""Headless grading of saved Word submissions straight from the .docx zip"""
+
+from .engine import (ActionResult, TaskResult, Grader, grade_submission,
+                     PASS, FAIL, UNSUPPORTED)
+from .cache import ResultCache
+from .package import DocxPackage
+from .document import WordDocument
+from .styles import StyleResolver
+from .numbering import NumberingIndex, ListLevel, numbering_index
+from .stream import iter_part, walk_document
+from .rules import Rule, Predicate, Locator, RuleIndex, compile_action, GRADER_VERSION
+from .diff import Change, ChangedItems, DocumentDiff, diff_documents, diff_packages
+
+__all__ = [
+    'ActionResult', 'TaskResult', 'Grader', 'grade_submission', 'ResultCache',
+    'PASS', 'FAIL', 'UNSUPPORTED',
+    'DocxPackage', 'WordDocument', 'StyleResolver',
+    'NumberingIndex', 'ListLevel', 'numbering_index',
+    'iter_part', 'walk_document',
+    'Rule', 'Predicate', 'Locator', 'RuleIndex', 'compile_action', 'GRADER_VERSION',
+    'Change', 'ChangedItems', 'DocumentDiff', 'diff_documents', 'diff_packages',
+]
@@ -0,0 +1,111 @@
+"""Grading outcomes cached on disk, keyed by what the rules actually read
+
+The rules of a RuleIndex fall in two groups: those reading the body and
+those reading headers and footers. Each group's outcomes are stored under
+a key built from the group's fingerprint (its rules, their locators, the
+pristine document they are graded against and GRADER_VERSION) and the SHA-256 of every part the group reads, including
+the styles, numbering and theme parts both groups resolve formatting from.
+Regrading an unchanged submission is therefore a lookup, and an edit
+confined to footer1.xml only reruns the header/footer rules.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+from .document import DOCUMENT, HEADER_FOOTER, WordDocument
+from .package import DOCUMENT_PART, STYLES_PART, NUMBERING_PART, THEME_PART
+
+
+SHARED_PARTS = (STYLES_PART, NUMBERING_PART, THEME_PART)
+DOCUMENT_RELS = 'word/_rels/document.xml.rels'
+
+_HEADER_FOOTER_PART = re.compile(r'word/(?:header|footer)[^/]*\.xml$')
+
+
+def group_parts(package, part):
+    """Names of the parts the rules reading `part` depend on
+
+    package only needs part_names() and part_digest(), so a stored manifest
+    can stand in for an unpacked .docx.
+    """
+    if part == DOCUMENT:
+        names = [DOCUMENT_PART]
+    else:
+        # The relationships say which headers and footers are in use
+        names = [name for name in package.part_names() if _HEADER_FOOTER_PART.match(name)]
+        names.append(DOCUMENT_RELS)
+    return names + list(SHARED_PARTS)
+
+
+class ResultCache:
+    """Outcomes of rule groups, one small JSON file per key under root"""
+
+    def __init__(self, root):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, index, package, part):
+        digest = hashlib.sha256(index.fingerprint(part).encode('ascii'))
+        for name in group_parts(package, part):
+            digest.update(('\0%s\0%s' % (name, package.part_digest(name))).encode('utf-8'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], key[2:] + '.json')
+
+    def get(self, key):
+        try:
+            with open(self.path(key), encoding='utf-8') as source:
+                return json.load(source)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, outcomes):
+        path = self.path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                json.dump(outcomes, out, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError:
+            # Only a cache: grading still works without it
+            pass
+
+    def lookup(self, index, package):
+        """Return ({rule: (passed, detail)} found in the cache, [(part, key)] that missed)"""
+        outcomes = {}
+        missing = []
+        for part in (DOCUMENT, HEADER_FOOTER):
+            rules = index.rules_in(part)
+            if not rules:
+                continue
+            key = self.key(index, package, part)
+            cached = self.get(key)
+            if cached is None or len(cached) != len(rules):
+                self.misses += 1
+                missing.append((part, key))
+                continue
+            self.hits += 1
+            for rule, (passed, detail) in zip(rules, cached):
+                outcomes[rule] = (passed, detail)
+        return outcomes, missing
+
+    def evaluate(self, index, package, doc=None, changes=None):
+        """{rule: (passed, detail)} for every rule, walking only the parts that missed
+
+        changes is called for the ChangedItems to grade with, only on a miss.
+        """
+        outcomes, missing = self.lookup(index, package)
+        if missing:
+            if doc is None:
+                doc = WordDocument(package)
+            fresh = index.evaluate(doc, parts=[part for part, _ in missing],
+                                   changed=changes() if changes else None)
+            for part, key in missing:
+                self.put(key, [list(fresh[rule]) for rule in index.rules_in(part)])
+            outcomes.update(fresh)
+        return outcomes
@@ -0,0 +1,380 @@
+"""Structural diff of a submission against the pristine exam document
+
+Every top-level block of the body (paragraph, table, content control or
+the closing section properties) is reduced to a digest of its content and formatting. Noise Word adds on every save (rsids,
+proofing marks, the _GoBack bookmark, runs split at revision boundaries) is
+left out, so an untouched paragraph hashes the same before and after a
+round trip through Word. The two block sequences are then aligned
+patience-style: common ends first, then blocks whose digest is unique on
+both sides as anchors, recursing into the gaps. What is left unmatched is
+reported as inserted, deleted or modified blocks, with the runs or rows
+that differ inside modified ones. changed_items() turns the result into the
+set of items grading gives credit for: those in inserted or modified blocks
+and those in any other part the candidate rewrote.
+"""
+import hashlib
+import xml.etree.ElementTree as ET
+from bisect import bisect_left
+
+from .document import PARAGRAPH, TABLE, SECTION, WordDocument
+from .package import DocxPackage, W, DOCUMENT_PART
+from .rules import Locator
+from .stream import SAVE_MARKERS, is_block
+
+
+INSERTED = 'inserted'
+DELETED = 'deleted'
+MODIFIED = 'modified'
+
+# Block kind of top-level content controls and other containers of paragraphs
+CONTENT = 'content'
+
+_P = W + 'p'
+_TBL = W + 'tbl'
+_TR = W + 'tr'
+_R = W + 'r'
+_T = W + 't'
+_PPR = W + 'pPr'
+_RPR = W + 'rPr'
+_SECT_PR = W + 'sectPr'
+_BODY = W + 'body'
+
+# Elements Word rewrites on save without any change by the candidate
+_IGNORED_TAGS = SAVE_MARKERS | frozenset([W + 'rsid'])
+_IGNORED_ATTRS = ('rsid', 'paraId', 'textId')
+
+
+def _feed(hasher, element):
+    """Add an element's canonical form (without save noise) to a hash"""
+    hasher.update(element.tag.encode())
+    for name, value in sorted(element.attrib.items()):
+        if not name.rsplit('}', 1)[-1].startswith(_IGNORED_ATTRS):
+            hasher.update(('\x01%s=%s' % (name, value)).encode())
+    if element.text:
+        hasher.update(('\x02' + element.text).encode())
+    for child in element:
+        if child.tag not in _IGNORED_TAGS:
+            _feed(hasher, child)
+    hasher.update(b'\x03')
+
+
+def _digest(*elements):
+    hasher = hashlib.sha1()
+    for element in elements:
+        if element is not None:
+            _feed(hasher, element)
+        hasher.update(b'\x04')
+    return hasher.digest()
+
+
+def _run_segments(paragraph):
+    """Digests of a paragraph's runs, merging neighbours Word merely split apart"""
+    segments = []
+    previous_rpr = None
+    text = []
+    for run in paragraph.iter(_R):
+        rpr = _digest(run.find(_RPR))
+        content = [child for child in run
+                   if child.tag not in (_RPR, _T) and child.tag not in _IGNORED_TAGS]
+        run_text = ''.join(node.text or '' for node in run.iter(_T))
+        if not content and rpr == previous_rpr:
+            text.append(run_text)
+            continue
+        if previous_rpr is not None:
+            segments.append(hashlib.sha1(previous_rpr + ''.join(text).encode()).digest())
+        if content:
+            segments.append(_digest(run))
+            previous_rpr, text = None, []
+        else:
+            previous_rpr, text = rpr, [run_text]
+    if previous_rpr is not None:
+        segments.append(hashlib.sha1(previous_rpr + ''.join(text).encode()).digest())
+    return tuple(segments)
+
+
+class Block:
+    """One top-level paragraph, table or other block of a document body"""
+
+    __slots__ = ('element', 'index', 'digest', 'parts', 'paragraphs')
+
+    def __init__(self, element, index, digest, parts, paragraphs):
+        self.element = element          # PARAGRAPH, TABLE, SECTION or CONTENT
+        self.index = index
+        self.digest = digest
+        self.parts = parts              # run digests of a paragraph, row digests of a table
+        self.paragraphs = paragraphs    # Paragraph items, cell paragraphs for a table
+
+    @property
+    def text(self):
+        return '\n'.join(paragraph.text for paragraph in self.paragraphs)
+
+    def __repr__(self):
+        return '<Block %s %d %r>' % (self.element, self.index, self.text[:40])
+
+
+def read_blocks(doc):
+    """Return the top-level blocks of a document body, streamed with iterparse
+
+    Blocks are numbered as stream.iter_part numbers the items it yields.
+    """
+    blocks = []
+    depth = 0
+    body = None
+    table_count = 0
+    with doc.package.open(DOCUMENT_PART) as source:
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if element.tag == _BODY:
+                    body, body_depth = element, depth
+                continue
+            depth -= 1
+            if body is None or depth != body_depth:
+                continue
+            if not is_block(element):
+                body.remove(element)
+                continue
+
+            if element.tag == _P:
+                paragraphs = [doc.build_paragraph(element)]
+                segments = _run_segments(element)
+                digest = _digest(element.find(_PPR)) + b''.join(segments)
+                blocks.append(Block(PARAGRAPH, len(blocks), hashlib.sha1(digest).digest(),
+                                    segments, paragraphs))
+            elif element.tag == _TBL:
+                table_count += 1
+                paragraphs = []
+                for row_index, row in enumerate(element.iter(_TR)):
+                    for cell_paragraph in row.iter(_P):
+                        paragraphs.append(doc.build_paragraph(cell_paragraph, table_count,
+                                                              row_index))
+                rows = tuple(_digest(row) for row in element.iter(_TR))
+                blocks.append(Block(TABLE, len(blocks), _digest(element), rows, paragraphs))
+            else:
+                kind = SECTION if element.tag == _SECT_PR else CONTENT
+                paragraphs = [doc.build_paragraph(paragraph) for paragraph in element.iter(_P)]
+                blocks.append(Block(kind, len(blocks), _digest(element), (), paragraphs))
+            body.remove(element)
+    return blocks
+
+
+def _unique(keys, lo, hi):
+    positions = {}
+    for index in range(lo, hi):
+        key = keys[index]
+        positions[key] = None if key in positions else index
+    return positions
+
+
+def _anchors(a, b, a_lo, a_hi, b_lo, b_hi):
+    """Longest increasing run of digests that occur exactly once on both sides"""
+    unique_a = _unique(a, a_lo, a_hi)
+    unique_b = _unique(b, b_lo, b_hi)
+    pairs = [(unique_a[key], index) for key, index in unique_b.items()
+             if index is not None and unique_a.get(key) is not None]
+    pairs.sort()
+
+    # Patience sorting over the b positions, in a order
+    tails, tail_pairs, back = [], [], []
+    for pair in pairs:
+        slot = bisect_left(tails, pair[1])
+        back.append(tail_pairs[slot - 1] if slot else None)
+        if slot == len(tails):
+            tails.append(pair[1])
+            tail_pairs.append(len(back) - 1)
+        else:
+            tails[slot] = pair[1]
+            tail_pairs[slot] = len(back) - 1
+    result = []
+    node = tail_pairs[-1] if tail_pairs else None
+    while node is not None:
+        result.append(pairs[node])
+        node = back[node]
+    result.reverse()
+    return result
+
+
+def align(a, b):
+    """Align two digest sequences; returns [(i or None, j or None)] in order
+
+    Pairs with both indexes set and equal digests are unchanged; the rest are
+    the gaps between them, paired positionally where both sides have entries.
+    """
+    pairs = []
+    # Work items are finished pairs or ranges still to align, popped in order
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if len(item) == 2:
+            pairs.append(item)
+            continue
+        a_lo, a_hi, b_lo, b_hi = item
+
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            pairs.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        tail = []
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            tail.append((a_hi, b_hi))
+        stack.extend(tail)      # already reversed, so they pop in order
+
+        anchors = _anchors(a, b, a_lo, a_hi, b_lo, b_hi) if a_lo < a_hi and b_lo < b_hi else []
+        if not anchors:
+            gap = []
+            for offset in range(max(a_hi - a_lo, b_hi - b_lo)):
+                gap.append((a_lo + offset if a_lo + offset < a_hi else None,
+                            b_lo + offset if b_lo + offset < b_hi else None))
+            stack.extend(reversed(gap))
+            continue
+
+        work = []
+        previous_a, previous_b = a_lo, b_lo
+        for i, j in anchors:
+            work.append((previous_a, i, previous_b, j))
+            work.append((i, j))
+            previous_a, previous_b = i + 1, j + 1
+        work.append((previous_a, a_hi, previous_b, b_hi))
+        stack.extend(reversed(work))
+    return pairs
+
+
+class Change:
+    """A block inserted, deleted or modified by the candidate"""
+
+    def __init__(self, kind, original=None, submission=None, changed_parts=()):
+        self.kind = kind
+        self.original = original
+        self.submission = submission
+        self.changed_parts = changed_parts  # runs (paragraph) or rows (table) that differ
+
+    @property
+    def element(self):
+        return (self.submission or self.original).element
+
+    @property
+    def paragraphs(self):
+        return (self.submission or self.original).paragraphs
+
+    def describe(self):
+        """One line for showing the candidate what they changed"""
+        block = self.submission or self.original
+        text = block.text.strip().replace('\n', ' / ')
+        if len(text) > 60:
+            text = text[:57] + '...'
+        quoted = ' "%s"' % text if text else ''
+        if self.kind == MODIFIED:
+            what = 'text' if self.original.text != self.submission.text else 'formatting'
+            return '%s %d: %s changed%s' % (block.element.capitalize(), block.index + 1,
+                                           what, quoted)
+        return '%s %s%s' % (block.element.capitalize(), self.kind, quoted and ':' + quoted)
+
+    def __repr__(self):
+        return '<Change %s %r>' % (self.kind, self.describe())
+
+
+class DocumentDiff:
+    """Changes between the original body and a submission's body"""
+
+    def __init__(self, original_blocks, submission_blocks, changes, changed_parts):
+        self.original_blocks = original_blocks
+        self.submission_blocks = submission_blocks
+        self.changes = changes
+        self.changed_parts = changed_parts  # other zip parts added, removed or rewritten
+
+    @property
+    def unchanged(self):
+        return not self.changes and not self.changed_parts
+
+    def changed_items(self):
+        """The ChangedItems grading gives credit for"""
+        return ChangedItems([change.submission.index for change in self.changes
+                             if change.submission is not None], self.changed_parts)
+
+    def changed_paragraphs(self):
+        """Paragraph items of the submission that were inserted or modified"""
+        for change in self.changes:
+            if change.submission is not None:
+                for paragraph in change.submission.paragraphs:
+                    yield paragraph
+
+    def regions(self, tasks):
+        """Return {task_id: [Change]} for the paragraphs each task description refers to
+
+        As in grading, a task's region is the first locator alternative that
+        selects any paragraph of the submission.
+        """
+        paragraphs = [paragraph for block in self.submission_blocks
+                      for paragraph in block.paragraphs]
+        regions = {}
+        for task in tasks:
+            locator = Locator.from_description(task.description)
+            hit = set()
+            for paragraph in paragraphs:
+                hit.update(locator.hits(paragraph))
+            if not hit:
+                regions[task.task_id] = []
+                continue
+            chosen = min(hit)
+            regions[task.task_id] = [
+                change for change in self.changes
+                if any(chosen in locator.hits(paragraph) for paragraph in change.paragraphs)]
+        return regions
+
+
+class ChangedItems:
+    """Which items of a submission the candidate changed, tested with `item in changed`
+
+    Items of document.xml count when their top-level block was inserted or
+    modified; items of any other part when that part differs as a whole.
+    """
+
+    def __init__(self, blocks, parts):
+        self.blocks = frozenset(blocks)     # submission block indexes
+        self.parts = frozenset(parts)
+
+    def __contains__(self, item):
+        part_name, index = item.block
+        if part_name == DOCUMENT_PART:
+            return index in self.blocks
+        return part_name in self.parts
+
+
+def _changed_parts(original, submission):
+    """Zip parts other than document.xml that differ, by CRC"""
+    before = original.part_checksums()
+    after = submission.part_checksums()
+    return sorted(name for name in set(before) | set(after)
+                  if name != DOCUMENT_PART and before.get(name) != after.get(name))
+
+
+def diff_documents(original_path, submission_path):
+    """Compare a saved submission with the pristine exam document"""
+    with DocxPackage(original_path) as original, DocxPackage(submission_path) as submission:
+        return diff_packages(original, submission)
+
+
+def diff_packages(original, submission):
+    """Compare two open DocxPackages; diff_documents for packages already open"""
+    before = read_blocks(WordDocument(original))
+    after = read_blocks(WordDocument(submission))
+    changed_parts = _changed_parts(original, submission)
+
+    changes = []
+    for i, j in align([block.digest for block in before], [block.digest for block in after]):
+        if i is None:
+            changes.append(Change(INSERTED, submission=after[j]))
+        elif j is None:
+            changes.append(Change(DELETED, original=before[i]))
+        elif before[i].digest != after[j].digest:
+            if before[i].element != after[j].element:
+                changes.append(Change(DELETED, original=before[i]))
+                changes.append(Change(INSERTED, submission=after[j]))
+                continue
+            parts = [part_j for part_i, part_j in align(before[i].parts, after[j].parts)
+                     if part_j is not None and (part_i is None
+                                                or before[i].parts[part_i] != after[j].parts[part_j])]
+            changes.append(Change(MODIFIED, before[i], after[j], parts))
+    return DocumentDiff(before, after, changes, changed_parts)
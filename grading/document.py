@@ -0,0 +1,189 @@
+from .numbering import numbering_index
+from .package import W, WP, STYLES_PART, THEME_PART, w_val
+from .styles import StyleResolver, to_int, toggle
+
+
+# Parts and element types rules are indexed by
+DOCUMENT = 'document'
+HEADER_FOOTER = 'header_footer'
+
+PARAGRAPH = 'paragraph'
+RUN = 'run'
+TABLE = 'table'
+DRAWING = 'drawing'
+SECTION = 'section'
+FIELD = 'field'
+
+
+class Item:
+    """Base for the document items a rule can inspect"""
+
+    block = None    # (part name, top-level block index), set by the stream reader
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+
+class Paragraph(Item):
+    """A paragraph with its effective paragraph and run formatting"""
+
+    def __init__(self, style_id, style_name, props, runs, table=None, row_index=None):
+        self.style_id = style_id
+        self.style_name = style_name
+        self.props = props
+        self.runs = runs            # list of (text, effective run props)
+        self.table = table
+        self.row_index = row_index
+        self.text = ''.join(text for text, _ in runs)
+
+    def get(self, key, default=None):
+        if key in self.props:
+            return self.props[key]
+        return getattr(self, key, default)
+
+    @property
+    def in_table(self):
+        return self.table is not None
+
+    @property
+    def is_heading(self):
+        return self.style_name.startswith('heading')
+
+    @property
+    def is_table_header(self):
+        return self.table is not None and self.row_index == 0
+
+    @property
+    def text_runs(self):
+        return [props for text, props in self.runs if text.strip()]
+
+
+class Run(Item):
+    def __init__(self, text, props):
+        self.text = text
+        self.props = props
+
+    def get(self, key, default=None):
+        if key in self.props:
+            return self.props[key]
+        return getattr(self, key, default)
+
+
+class Table(Item):
+    def __init__(self, has_borders, merged_header, rows):
+        self.rows = rows
+        self.has_borders = has_borders
+        self.merged_header = merged_header
+        self.present = True
+
+
+class Drawing(Item):
+    def __init__(self, anchored, wrap, width):
+        self.anchored = anchored
+        self.wrap = wrap
+        self.width = width
+        self.present = True
+
+
+class Section(Item):
+    def __init__(self, title_page):
+        self.title_page = title_page
+
+
+class Field(Item):
+    def __init__(self, instruction):
+        self.instruction = instruction.strip()
+
+
+class WordDocument:
+    """Styles, numbering and theme of a .docx, plus builders for streamed items
+
+    The small definition parts are parsed up front; document.xml and the
+    headers/footers are streamed by grading.stream.walk_document.
+    """
+
+    def __init__(self, package):
+        self.package = package
+
+        self._numbering = None
+        self.resolver = StyleResolver(package.xml(STYLES_PART), package.xml(THEME_PART),
+                                      numbering=self.numbering_level)
+
+    @property
+    def theme_colors(self):
+        return self.resolver.theme_colors
+
+    def style_chain(self, style_id):
+        return self.resolver.style_chain(style_id)
+
+    def style_name(self, style_id):
+        return self.resolver.style_name(style_id)
+
+    # Numbering
+
+    def numbering_level(self, num_id, ilvl):
+        """Return the ListLevel for a list paragraph, or None"""
+        # numbering.xml is only read once a list paragraph is actually seen
+        if self._numbering is None:
+            self._numbering = numbering_index(self.package)
+        return self._numbering.level(num_id, ilvl)
+
+    # Building items from (fully parsed) elements
+
+    def build_paragraph(self, element, table=None, row_index=None):
+        resolver = self.resolver
+        ppr = element.find(W + 'pPr')
+        style_id = resolver.paragraph_style_id(ppr)
+        props = resolver.paragraph_props(style_id, ppr)
+
+        runs = []
+        for run in element.iter(W + 'r'):
+            text = ''.join(node.text or '' for node in run.iter(W + 't'))
+            if text:
+                runs.append((text, resolver.run_props(style_id, run.find(W + 'rPr'))))
+
+        return Paragraph(style_id, resolver.style_name(style_id), props, runs, table, row_index)
+
+    def _has_border(self, element, tag):
+        for borders in element.iter(W + tag):
+            for edge in borders:
+                if w_val(edge) not in (None, 'nil', 'none'):
+                    return True
+        return False
+
+    def build_table(self, element):
+        has_borders = (self._has_border(element, 'tblBorders')
+                       or self._has_border(element, 'tcBorders'))
+        if not has_borders:
+            style_id = w_val(element.find(W + 'tblPr/' + W + 'tblStyle'))
+            has_borders = any(self._has_border(style, 'tblBorders')
+                              for style in self.style_chain(style_id))
+
+        rows = element.findall(W + 'tr')
+        merged_header = False
+        row = rows[0] if rows else None
+        if row is not None:
+            for cell in row.findall(W + 'tc'):
+                tc_pr = cell.find(W + 'tcPr')
+                if tc_pr is None:
+                    continue
+                span = to_int(w_val(tc_pr.find(W + 'gridSpan'))) or 1
+                if span > 1 or tc_pr.find(W + 'hMerge') is not None:
+                    merged_header = True
+        return Table(has_borders, merged_header, len(rows))
+
+    def build_drawings(self, element):
+        for frame in element:
+            anchored = frame.tag == WP + 'anchor'
+            wrap = None
+            if anchored:
+                for child in frame:
+                    if child.tag.startswith(WP + 'wrap'):
+                        wrap = child.tag[len(WP):]
+            extent = frame.find(WP + 'extent')
+            width = to_int(extent.get('cx')) if extent is not None else None
+            yield Drawing(anchored, wrap, width)
+
+    def build_section(self, element):
+        title_pg = element.find(W + 'titlePg')
+        return Section(title_pg is not None and toggle(title_pg))
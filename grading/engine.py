@@ -0,0 +1,125 @@
+import hashlib
+from functools import partial
+
+from .diff import diff_packages
+from .document import WordDocument
+from .package import DocxPackage
+from .rules import RuleIndex
+
+
+class ActionResult:
+    """Outcome of one RequiredActions clause"""
+
+    def __init__(self, action, passed, detail='', supported=True):
+        self.action = action
+        self.passed = passed
+        self.detail = detail
+        self.supported = supported
+
+    def __repr__(self):
+        status = 'PASS' if self.passed else ('FAIL' if self.supported else 'UNSUPPORTED')
+        return '<ActionResult %s %r: %s>' % (status, self.action, self.detail)
+
+
+PASS = 'pass'
+FAIL = 'fail'
+UNSUPPORTED = 'unsupported'
+
+
+class TaskResult:
+    """Outcome of grading one task
+
+    status is FAIL when a gradable clause failed, UNSUPPORTED when the rest
+    passed but some clause cannot be graded automatically (it needs a manual
+    check, so the task does not pass), and PASS otherwise.
+    """
+
+    def __init__(self, task_id, actions):
+        self.task_id = task_id
+        self.actions = actions
+
+    @property
+    def status(self):
+        if self.failed_actions:
+            return FAIL
+        if self.unsupported_actions or not self.actions:
+            return UNSUPPORTED
+        return PASS
+
+    @property
+    def passed(self):
+        return self.status == PASS
+
+    @property
+    def failed_actions(self):
+        return [result.action for result in self.actions
+                if result.supported and not result.passed]
+
+    @property
+    def unsupported_actions(self):
+        return [result.action for result in self.actions if not result.supported]
+
+
+class Grader:
+    """Grades saved .docx submissions against a fixed set of TaskDetail requirements
+
+    RequiredActions are compiled into a RuleIndex once; each submission is then
+    walked a single time and every rule is evaluated during that walk. With
+    the original task document, only what the candidate changed from it
+    earns credit, so an untouched document fails every gradable task.
+    """
+
+    def __init__(self, tasks, cache=None, original=None):
+        self.original = original  # path of the pristine task document, or None
+        baseline = None
+        if original is not None:
+            with open(original, 'rb') as source:
+                baseline = hashlib.sha256(source.read()).hexdigest()
+        self.index = RuleIndex(tasks, baseline)
+        if original is not None:
+            with DocxPackage(original) as package:
+                self.index.count_original(WordDocument(package))
+        self.cache = cache  # a ResultCache, or None to evaluate every time
+
+    def changes(self, package):
+        """ChangedItems of a submission against the original, or None without one"""
+        if self.original is None:
+            return None
+        with DocxPackage(self.original) as original:
+            return diff_packages(original, package).changed_items()
+
+    def grade_document(self, doc):
+        if self.cache is None:
+            return self.results(self.index.evaluate(doc, changed=self.changes(doc.package)))
+        return self.results(self.cache.evaluate(self.index, doc.package, doc,
+                                                partial(self.changes, doc.package)))
+
+    def results(self, outcomes):
+        """Turn {rule: (passed, detail)} into {task_id: TaskResult}"""
+        results = {}
+        for compiled in self.index.tasks:
+            actions = []
+            for rule in compiled.rules:
+                if not rule.supported:
+                    detail = 'not gradable' if rule.predicate is None else 'no target named'
+                    actions.append(ActionResult(rule.action, False, detail, supported=False))
+                    continue
+                passed, detail = outcomes[rule]
+                actions.append(ActionResult(rule.action, bool(passed), detail))
+            results[compiled.task_id] = TaskResult(compiled.task_id, actions)
+        return results
+
+    def grade(self, path):
+        """Grade one submission against every task; returns {task_id: TaskResult}"""
+        with DocxPackage(path) as package:
+            if self.cache is None:
+                return self.grade_document(WordDocument(package))
+            # Styles and theme are only parsed, and the original only diffed,
+            # when some rule group is not cached
+            return self.results(self.cache.evaluate(
+                self.index, package, changes=partial(self.changes, package)))
+
+
+def grade_submission(path, tasks, original=None):
+    """Grade a saved .docx against tasks; returns {task_id: TaskResult}"""
+    return Grader(tasks, original=original).grade(path)
@@ -0,0 +1,110 @@
+"""Index of list definitions from word/numbering.xml
+
+The numbering part of the exam file carries hundreds of abstractNum/num
+definitions, most of them unused. NumberingIndex resolves every
+(numId, ilvl) pair to its format, level text, start value and indentation
+in one pass the first time a list paragraph asks for it, and indexes are
+shared between documents whose numbering part has the same content.
+"""
+import hashlib
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from .package import W, NUMBERING_PART, w_val
+from .styles import read_ppr, to_int
+
+
+# Built indexes kept per numbering.xml content hash
+CACHE_SIZE = 16
+_cache = OrderedDict()
+
+
+class ListLevel:
+    """Resolved definition of one list level"""
+
+    __slots__ = ('num_fmt', 'level_text', 'start', 'props')
+
+    def __init__(self, num_fmt, level_text, start, props):
+        self.num_fmt = num_fmt
+        self.level_text = level_text
+        self.start = start
+        self.props = props          # indentation and tabs from the level's w:pPr
+
+    def __repr__(self):
+        return '<ListLevel %s %r>' % (self.num_fmt, self.level_text)
+
+
+def _read_level(lvl):
+    return ListLevel(w_val(lvl.find(W + 'numFmt')),
+                     w_val(lvl.find(W + 'lvlText')),
+                     to_int(w_val(lvl.find(W + 'start'))),
+                     read_ppr(lvl.find(W + 'pPr')))
+
+
+class NumberingIndex:
+    """(numId, ilvl) -> ListLevel for one numbering part"""
+
+    def __init__(self, root):
+        self.levels = {}
+        if root is not None:
+            self._build(root)
+
+    def _build(self, root):
+        abstract_levels = {}
+        style_links = {}
+        num_style_links = {}
+        for abstract in root.findall(W + 'abstractNum'):
+            abstract_id = to_int(abstract.get(W + 'abstractNumId'))
+            abstract_levels[abstract_id] = dict(
+                (to_int(lvl.get(W + 'ilvl')), _read_level(lvl))
+                for lvl in abstract.findall(W + 'lvl'))
+            link = w_val(abstract.find(W + 'styleLink'))
+            if link:
+                style_links[link] = abstract_id
+            link = w_val(abstract.find(W + 'numStyleLink'))
+            if link:
+                num_style_links[abstract_id] = link
+
+        for num in root.findall(W + 'num'):
+            num_id = to_int(num.get(W + 'numId'))
+            abstract_id = to_int(w_val(num.find(W + 'abstractNumId')))
+            # An abstractNum that only points at a numbering style takes its
+            # levels from the abstractNum defining that style
+            if abstract_id in num_style_links:
+                abstract_id = style_links.get(num_style_links[abstract_id], abstract_id)
+
+            levels = dict(abstract_levels.get(abstract_id, {}))
+            # A w:lvlOverride on the concrete num wins over the abstract definition
+            for override in num.findall(W + 'lvlOverride'):
+                ilvl = to_int(override.get(W + 'ilvl'))
+                lvl = override.find(W + 'lvl')
+                if lvl is not None:
+                    levels[ilvl] = _read_level(lvl)
+            for ilvl, level in levels.items():
+                self.levels[num_id, ilvl] = level
+
+    def level(self, num_id, ilvl):
+        """Return the ListLevel for a list paragraph, or None"""
+        return self.levels.get((num_id, ilvl))
+
+    def __len__(self):
+        return len(self.levels)
+
+
+def numbering_index(package):
+    """Return the NumberingIndex for a package, reusing one built for identical content"""
+    if not package.has_part(NUMBERING_PART):
+        return NumberingIndex(None)
+
+    data = package.read(NUMBERING_PART)
+    digest = hashlib.sha1(data).hexdigest()
+    index = _cache.get(digest)
+    if index is not None:
+        _cache.move_to_end(digest)
+        return index
+
+    index = NumberingIndex(ET.fromstring(data))
+    _cache[digest] = index
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return index
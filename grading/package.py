@@ -0,0 +1,107 @@
+import hashlib
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+# OOXML namespaces used by the grader
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+R_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+WP_NS = 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+W = '{%s}' % W_NS
+R = '{%s}' % R_NS
+A = '{%s}' % A_NS
+WP = '{%s}' % WP_NS
+
+DOCUMENT_PART = 'word/document.xml'
+STYLES_PART = 'word/styles.xml'
+NUMBERING_PART = 'word/numbering.xml'
+THEME_PART = 'word/theme/theme1.xml'
+
+
+def w_val(element, attr='val', default=None):
+    """Read a w:-namespaced attribute from an element that may be None"""
+    if element is None:
+        return default
+    return element.get(W + attr, default)
+
+
+class DocxPackage:
+    """Read-only access to the parts of a .docx zip, without Word"""
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._names = set(self._zip.namelist())
+        self._xml_cache = {}
+        self._rels_cache = {}
+        self._digest_cache = {}
+
+    def close(self):
+        self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def has_part(self, name):
+        return name in self._names
+
+    def part_names(self):
+        return sorted(self._names)
+
+    def part_checksums(self):
+        """Return {part name: CRC-32} straight from the zip directory"""
+        return dict((info.filename, info.CRC) for info in self._zip.infolist())
+
+    def part_digest(self, name):
+        """SHA-256 of a part's bytes, or None if the package has no such part"""
+        if name not in self._digest_cache:
+            self._digest_cache[name] = (hashlib.sha256(self._zip.read(name)).hexdigest()
+                                        if name in self._names else None)
+        return self._digest_cache[name]
+
+    def read(self, name):
+        """Return the raw bytes of a part"""
+        return self._zip.read(name)
+
+    def open(self, name):
+        """Return a file object streaming a part's bytes out of the zip"""
+        return self._zip.open(name)
+
+    def xml(self, name):
+        """Return the parsed root element of an XML part, or None if missing"""
+        if name not in self._xml_cache:
+            if name in self._names:
+                self._xml_cache[name] = ET.fromstring(self._zip.read(name))
+            else:
+                self._xml_cache[name] = None
+        return self._xml_cache[name]
+
+    def relationships(self, name):
+        """Return {rId: (type, target part name)} for a part"""
+        if name in self._rels_cache:
+            return self._rels_cache[name]
+
+        folder, base = posixpath.split(name)
+        rels_name = posixpath.join(folder, '_rels', base + '.rels')
+        rels = {}
+        root = self.xml(rels_name)
+        if root is not None:
+            for rel in root:
+                target = rel.get('Target', '')
+                if rel.get('TargetMode') != 'External':
+                    target = posixpath.normpath(posixpath.join(folder, target))
+                rels[rel.get('Id')] = (rel.get('Type', '').rsplit('/', 1)[-1], target)
+        self._rels_cache[name] = rels
+        return rels
+
+    def header_footer_parts(self):
+        """Return the part names of all headers and footers used by the document"""
+        return [target for rel_type, target in self.relationships(DOCUMENT_PART).values()
+                if rel_type in ('header', 'footer')]
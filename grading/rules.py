@@ -0,0 +1,477 @@
+import hashlib
+import json
+import re
+
+from .document import (DOCUMENT, HEADER_FOOTER, PARAGRAPH, RUN, TABLE, DRAWING,
+                       SECTION, FIELD)
+from .stream import walk_document
+
+
+# English names Word's colour picker gives the theme slots
+THEME_COLOR_NAMES = {
+    'blue-gray': 'dk2', 'blue gray': 'dk2',
+    'blue': 'accent1', 'orange': 'accent2', 'gray': 'accent3', 'grey': 'accent3',
+    'gold': 'accent4', 'dark blue': 'accent5', 'green': 'accent6',
+}
+
+BULLET_FORMATS = ('bullet',)
+NUMBER_FORMATS = ('decimal', 'decimalZero', 'lowerLetter', 'upperLetter',
+                  'lowerRoman', 'upperRoman', 'ordinal', 'cardinalText')
+
+# Part of every cached result's key: bump when a rule's behaviour changes
+GRADER_VERSION = 4
+
+EMU_PER_INCH = 914400
+EMU_PER_CM = 360000
+
+ANY = 'any'
+EVERY = 'every'
+NEW = 'new'     # more items match than in the original document
+
+_QUOTED = re.compile(r'"([^"]+)"|“([^”]+)”')
+_CURRENCY = re.compile(r'[$€£¥]\s?\d[\d,]*(?:\.\d+)?')
+_LETTERS = re.compile(r'[^\W\d_]')
+
+
+def _theme_match(value, expected, doc):
+    """value is a run's props; expected a theme slot or None for any theme colour"""
+    if expected is None:
+        return bool(value.get('theme_color'))
+    return value.get('theme_color') == expected or (
+        value.get('color') is not None and value.get('color') == doc.theme_colors.get(expected))
+
+
+# Comparison operators: op(value, expected, doc) -> bool
+OPS = {
+    'eq': lambda value, expected, doc: value == expected,
+    'in': lambda value, expected, doc: value in expected,
+    'gt': lambda value, expected, doc: value is not None and value > expected,
+    'near': lambda value, expected, doc: value is not None and abs(value - expected) <= expected * 0.01,
+    'match': lambda value, expected, doc: value is not None and expected.search(value) is not None,
+    'contains': lambda value, expected, doc: expected in (value or ()),
+    'keyword': lambda value, expected, doc: (value or '').split()[:1] == [expected],
+    'theme': _theme_match,
+}
+
+
+class Locator:
+    """Ordered fallbacks for the paragraphs a task description refers to
+
+    The first alternative that matches any paragraph in the document wins.
+    Quoted text names the target outright; otherwise words such as "title"
+    or "table" pick the kind of paragraph. A description that names neither
+    gives no alternatives, and rules that need a target cannot be graded.
+    """
+
+    def __init__(self, alternatives):
+        self.alternatives = alternatives
+
+    @classmethod
+    def from_description(cls, description):
+        description = description or ''
+        alternatives = []
+        for match in _QUOTED.finditer(description):
+            alternatives.append(('text', (match.group(1) or match.group(2)).strip().lower()))
+        if alternatives:
+            return cls(alternatives)
+
+        lowered = description.lower()
+        if 'title' in lowered:
+            alternatives.append(('style_name', 'title'))
+        if 'heading' in lowered:
+            alternatives.append(('is_heading', True))
+        if 'list' in lowered:
+            alternatives.append(('listed', True))
+        if 'table' in lowered:
+            alternatives.append(('in_table', True))
+        return cls(alternatives)
+
+    def hits(self, paragraph):
+        """Return the indexes of the alternatives that select a paragraph"""
+        text = paragraph.text
+        if not text.strip():
+            return ()
+        found = []
+        for index, (kind, value) in enumerate(self.alternatives):
+            if kind == 'text':
+                selected = value in text.lower()
+            elif kind == 'listed':
+                selected = 'num_id' in paragraph.props
+            else:
+                selected = paragraph.get(kind) == value
+            if selected:
+                found.append(index)
+        return found
+
+
+class State:
+    __slots__ = ('scoped', 'matched', 'failed', 'changed', 'credited', 'before', 'example',
+                 'values')
+
+    def __init__(self):
+        self.scoped = 0
+        self.matched = 0
+        self.failed = 0
+        self.changed = 0        # scoped items the candidate changed
+        self.credited = 0       # matched items the candidate changed
+        self.before = 0         # items matching in the original, for NEW
+        self.example = None
+        self.values = {}
+
+
+class Predicate:
+    """A typed check: property of an element in a part, compared to an expected value
+
+    Items are selected by `where` (an item attribute that must be truthy), then
+    `quantifier` decides whether ANY or EVERY selected item has to pass.
+    RUN predicates test every text run of a paragraph. Only items the
+    candidate changed earn credit: ANY needs a changed item that passes, and
+    EVERY needs at least one changed item among those it checks. NEW counts
+    instead: more items must match than in the original, so an image already
+    in the exam document does not count as inserted even once resized.
+    """
+
+    def __init__(self, part, element, prop, op, expected=None, default=None,
+                 quantifier=ANY, where=None, located=False):
+        self.part = part
+        self.element = element
+        self.prop = prop
+        self.op = op
+        self.expected = expected
+        self.default = default
+        self.quantifier = quantifier
+        self.where = where
+        self.located = located
+        self._compare = OPS[op]
+
+    def test(self, item, doc):
+        if self.element == RUN:
+            runs = item.text_runs
+            if self.prop is None:
+                return bool(runs) and all(self._compare(props, self.expected, doc) for props in runs)
+            return bool(runs) and all(
+                self._compare(props.get(self.prop, self.default), self.expected, doc)
+                for props in runs)
+        props = self.prop if isinstance(self.prop, tuple) else (self.prop,)
+        return any(self._compare(item.get(prop, self.default), self.expected, doc)
+                   for prop in props)
+
+    def visit(self, state, item, doc, changed=True):
+        if self.where and not item.get(self.where):
+            return
+        if self.element in (PARAGRAPH, RUN) and not item.text.strip():
+            return
+        state.scoped += 1
+        state.changed += changed
+        if self.test(item, doc):
+            state.matched += 1
+            state.credited += changed
+            # Prefer a changed item as the example shown to the candidate
+            if state.example is None or changed and state.credited == 1:
+                state.example = _describe(item)
+        else:
+            state.failed += 1
+
+    def result(self, state):
+        if self.quantifier == EVERY:
+            if not state.scoped:
+                return False, 'nothing to check'
+            if state.failed:
+                return False, '%d of %d matched' % (state.matched, state.scoped)
+            if not state.changed:
+                return False, 'unchanged from the original'
+            return True, '%d of %d matched' % (state.matched, state.scoped)
+        if self.quantifier == NEW:
+            added = state.matched - state.before
+            if added > 0:
+                return True, '%d new %s' % (added, self.element)
+            if state.matched:
+                return False, 'none added to the %d in the original' % state.before
+            return False, 'no %s matched' % self.element
+        if state.credited:
+            return True, state.example
+        if state.matched:
+            return False, 'already in the original: %s' % state.example
+        return False, 'no %s matched' % self.element
+
+
+class Consistency(Predicate):
+    """All selected items share the same values for `keys`, per `group_by` group
+
+    With keys=None on RUN predicates every resolved run property is compared.
+    """
+
+    def __init__(self, part, element, keys, group_by=None, where=None, located=False):
+        super().__init__(part, element, keys, 'eq', where=where, located=located)
+        self.group_by = group_by
+
+    def visit(self, state, item, doc, changed=True):
+        if self.where and not item.get(self.where):
+            return
+        group = item.get(self.group_by) if self.group_by else None
+        values = state.values.setdefault(group, set())
+        if self.element == RUN:
+            for props in item.text_runs:
+                state.scoped += 1
+                state.changed += changed
+                if self.prop is None:
+                    values.add(tuple(sorted(props.items())))
+                else:
+                    values.add(tuple(props.get(key) for key in self.prop))
+        elif item.text.strip():
+            state.scoped += 1
+            state.changed += changed
+            values.add(tuple(item.get(key) for key in self.prop))
+
+    def result(self, state):
+        if not state.scoped:
+            return False, 'nothing to check'
+        if not state.changed:
+            return False, 'unchanged from the original'
+        mixed = [group for group, values in state.values.items() if len(values) > 1]
+        if not mixed:
+            return True, 'consistent'
+        if self.group_by:
+            return False, 'inconsistent: %s' % ', '.join(sorted(str(group) for group in mixed))
+        return False, '%d distinct settings' % len(state.values[None])
+
+
+def _describe(item):
+    text = getattr(item, 'text', None)
+    if text:
+        return text.strip()
+    return type(item).__name__.lower()
+
+
+class Rule:
+    """A RequiredActions clause compiled to a predicate plus the task's locator"""
+
+    def __init__(self, task_id, action, predicate=None, locator=None):
+        self.task_id = task_id
+        self.action = action
+        self.predicate = predicate
+        self.locator = locator if predicate is not None and predicate.located else None
+
+    @property
+    def supported(self):
+        return self.predicate is not None and self.locatable
+
+    @property
+    def locatable(self):
+        """False when the rule needs a target its task's description does not name"""
+        return self.locator is None or bool(self.locator.alternatives)
+
+    @property
+    def key(self):
+        return self.predicate.part, self.predicate.element
+
+    def new_state(self):
+        if self.locator is None:
+            return State()
+        return [State() for _ in self.locator.alternatives]
+
+    def result(self, state, located):
+        """Return (passed, detail); located lists which locator alternatives selected anything"""
+        if self.locator is None:
+            return self.predicate.result(state)
+        for index, found in enumerate(located):
+            if found:
+                return self.predicate.result(state[index])
+        return False, 'target not found: ' + ', '.join(
+            repr(value) if kind == 'text' else kind for kind, value in self.locator.alternatives)
+
+
+# Predicate specs; each maps a regex match to a Predicate
+
+def _run(prop, op, expected, default=None):
+    return Predicate(DOCUMENT, RUN, prop, op, expected, default=default, located=True)
+
+
+def _paragraph(prop, op, expected, default=None):
+    return Predicate(DOCUMENT, PARAGRAPH, prop, op, expected, default=default, located=True)
+
+
+def _theme_color(match):
+    name = match.group(1).strip().lower()
+    return _run(None, 'theme', THEME_COLOR_NAMES.get(name, name))
+
+
+def _length(match):
+    value = float(match.group(1))
+    unit = match.group(2).lower()
+    emu = int(round(value * (EMU_PER_CM if unit.startswith('c') else EMU_PER_INCH)))
+    return Predicate(DOCUMENT, DRAWING, 'width', 'near', emu)
+
+
+# (pattern, predicate builder) in priority order; first match wins
+ACTION_PATTERNS = [
+    (r'apply bold', lambda m: _run('bold', 'eq', True, False)),
+    (r'apply italics?', lambda m: _run('italic', 'eq', True, False)),
+    (r'apply underline', lambda m: _run('underline', 'eq', True, False)),
+    (r'set font size to (\d+(?:\.\d+)?)\s*pt',
+     lambda m: _run('size', 'eq', int(round(float(m.group(1)) * 2)))),
+    (r'apply ([a-z\- ]+?) theme colou?r', _theme_color),
+    (r'apply theme colou?r', lambda m: _run(None, 'theme', None)),
+    (r'center align headers',
+     lambda m: Predicate(DOCUMENT, PARAGRAPH, 'jc', 'eq', 'center', quantifier=EVERY,
+                         where='is_table_header')),
+    (r'(?:center|centre) align', lambda m: _paragraph('jc', 'in', ('center',), 'left')),
+    (r'left align', lambda m: _paragraph('jc', 'in', ('left', 'start'), 'left')),
+    (r'right align', lambda m: _paragraph('jc', 'in', ('right', 'end'), 'left')),
+    (r'justify', lambda m: _paragraph('jc', 'in', ('both', 'distribute'), 'left')),
+    (r'apply (heading \d|title|normal) style',
+     lambda m: _paragraph('style_name', 'eq', m.group(1).lower())),
+    (r'apply heading styles', lambda m: _paragraph('is_heading', 'eq', True)),
+    (r'add spacing after', lambda m: _paragraph('spacing_after', 'gt', 0, 0)),
+    (r'add spacing between sections',
+     lambda m: Predicate(DOCUMENT, PARAGRAPH, ('spacing_before', 'spacing_after'), 'gt', 0,
+                         default=0, quantifier=EVERY, where='is_heading')),
+    (r'apply consistent spacing|set proper spacing',
+     lambda m: Consistency(DOCUMENT, PARAGRAPH, ('spacing_before', 'spacing_after',
+                                                 'spacing_line'), located=True)),
+    (r'apply consistent indentation',
+     lambda m: Consistency(DOCUMENT, PARAGRAPH, ('ilvl', 'ind_left', 'ind_hanging'),
+                           where='num_id', located=True)),
+    (r'set proper indentation', lambda m: _paragraph('ind_left', 'gt', 0, 0)),
+    (r'ensure consistent formatting',
+     lambda m: Consistency(DOCUMENT, RUN, None, group_by='style_id', where='is_heading')),
+    (r'create bulleted list', lambda m: _paragraph('num_fmt', 'in', BULLET_FORMATS)),
+    (r'create numbered list', lambda m: _paragraph('num_fmt', 'in', NUMBER_FORMATS)),
+    (r'(?:insert|update) table of contents',
+     lambda m: Predicate(DOCUMENT, FIELD, 'instruction', 'keyword', 'TOC')),
+    (r'insert table',
+     lambda m: Predicate(DOCUMENT, TABLE, 'present', 'eq', True, quantifier=NEW)),
+    (r'apply borders', lambda m: Predicate(DOCUMENT, TABLE, 'has_borders', 'eq', True)),
+    (r'merge header cells', lambda m: Predicate(DOCUMENT, TABLE, 'merged_header', 'eq', True)),
+    (r'add page numbers',
+     lambda m: Predicate(HEADER_FOOTER, FIELD, 'instruction', 'keyword', 'PAGE')),
+    (r'add company name',
+     lambda m: Predicate(HEADER_FOOTER, PARAGRAPH, 'text', 'match', _LETTERS)),
+    (r'set different first page',
+     lambda m: Predicate(DOCUMENT, SECTION, 'title_page', 'eq', True)),
+    (r'insert (?:image|picture)',
+     lambda m: Predicate(DOCUMENT, DRAWING, 'present', 'eq', True, quantifier=NEW)),
+    (r'set width to (\d+(?:\.\d+)?)\s*(inch(?:es)?|in|cm)', _length),
+    (r'apply text wrapping', lambda m: Predicate(DOCUMENT, DRAWING, 'anchored', 'eq', True)),
+    (r'apply currency format', lambda m: _paragraph('text', 'match', _CURRENCY)),
+    (r'align decimals', lambda m: Predicate(DOCUMENT, PARAGRAPH, 'tabs', 'contains', 'decimal')),
+]
+
+_COMPILED_PATTERNS = [(re.compile(pattern, re.IGNORECASE), build)
+                      for pattern, build in ACTION_PATTERNS]
+
+
+def compile_action(action, task_id=None, locator=None):
+    """Compile one RequiredActions clause into a Rule"""
+    action = action.strip()
+    for pattern, build in _COMPILED_PATTERNS:
+        match = pattern.search(action)
+        if match:
+            return Rule(task_id, action, build(match), locator)
+    return Rule(task_id, action)
+
+
+class CompiledTask:
+    """A task's description locator and rules, compiled once"""
+
+    def __init__(self, task):
+        self.task_id = task.task_id
+        self.locator = Locator.from_description(task.description)
+        self.rules = [compile_action(action, task.task_id, self.locator)
+                      for action in task.required_actions if action.strip()]
+
+
+class RuleIndex:
+    """Every task's rules indexed by the (part, element type) they inspect
+
+    baseline identifies the pristine document submissions are compared with
+    (its SHA-256), so outcomes graded against different originals never
+    share a cache entry.
+    """
+
+    def __init__(self, tasks, baseline=None):
+        self.tasks = [CompiledTask(task) for task in tasks]
+        self.baseline = baseline
+        self.by_key = {}
+        for compiled in self.tasks:
+            for rule in compiled.rules:
+                if rule.supported:
+                    self.by_key.setdefault(rule.key, []).append(rule)
+
+        self.locators = [compiled.locator for compiled in self.tasks]
+        self._paragraph_rules = {
+            part: list(self.rules_for(part, PARAGRAPH)) + list(self.rules_for(part, RUN))
+            for part in (DOCUMENT, HEADER_FOOTER)}
+        self._fingerprints = {}
+        self.original_counts = {}   # {NEW rule: items matching in the original}
+
+    def rules_for(self, part, element):
+        return self.by_key.get((part, element), ())
+
+    def rules_in(self, part):
+        """Supported rules reading a part, in a stable order"""
+        return [rule for compiled in self.tasks for rule in compiled.rules
+                if rule.supported and rule.key[0] == part]
+
+    def fingerprint(self, part):
+        """SHA-256 identifying the rules reading a part, their locators, the baseline
+        and GRADER_VERSION"""
+        if part not in self._fingerprints:
+            spec = [GRADER_VERSION, part, self.baseline] + [
+                [str(rule.task_id), rule.action,
+                 rule.locator.alternatives if rule.locator else None]
+                for rule in self.rules_in(part)]
+            self._fingerprints[part] = hashlib.sha256(
+                json.dumps(spec).encode('utf-8')).hexdigest()
+        return self._fingerprints[part]
+
+    def count_original(self, doc):
+        """Count what the NEW rules match in the original document"""
+        states, _ = self._walk(doc, (DOCUMENT, HEADER_FOOTER), None)
+        self.original_counts = {rule: state.matched for rule, state in states.items()
+                                if rule.predicate.quantifier == NEW}
+
+    def evaluate(self, doc, parts=None, changed=None):
+        """Walk the document once and return {rule: (passed, detail)}
+
+        With parts, only those parts are read and only their rules evaluated.
+        changed holds the items the candidate changed (a diff.ChangedItems);
+        None counts every item as changed.
+        """
+        states, located = self._walk(doc, parts or (DOCUMENT, HEADER_FOOTER), changed)
+        return {rule: rule.result(states[rule], located[id(rule.locator)] if rule.locator else None)
+                for rule in states}
+
+    def _walk(self, doc, parts, changed):
+        """Return ({rule: state}, {id(locator): [alternative found]}) for one pass"""
+        states = {rule: rule.new_state()
+                  for key, rules in self.by_key.items() if key[0] in parts for rule in rules}
+        for rule, count in self.original_counts.items():
+            if rule in states:
+                states[rule].before = count
+        located = {id(locator): [False] * len(locator.alternatives) for locator in self.locators}
+
+        for part, element, item in walk_document(doc, parts=parts):
+            is_changed = changed is None or item in changed
+            if element == PARAGRAPH:
+                hits = {}
+                if part == DOCUMENT:
+                    for locator in self.locators:
+                        hits[id(locator)] = found = locator.hits(item)
+                        for index in found:
+                            located[id(locator)][index] = True
+                # RUN rules are evaluated on the paragraph that carries the runs
+                for rule in self._paragraph_rules.get(part, ()):
+                    self._visit(rule, states[rule], item, doc, hits, is_changed)
+            else:
+                for rule in self.rules_for(part, element):
+                    self._visit(rule, states[rule], item, doc, None, is_changed)
+        return states, located
+
+    def _visit(self, rule, state, item, doc, hits, changed):
+        if rule.locator is None:
+            rule.predicate.visit(state, item, doc, changed)
+            return
+        # The locator picks the target whether or not it changed; only changes earn credit
+        for index in hits.get(id(rule.locator), ()):
+            rule.predicate.visit(state[index], item, doc, changed)
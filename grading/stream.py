@@ -0,0 +1,108 @@
+"""Single-pass streaming reader for document.xml and header/footer parts
+
+Parts are read with iterparse straight out of the zip. Each paragraph, table,
+drawing, section and field is turned into an item with its effective
+formatting as soon as its end tag is seen, and every top-level block is
+dropped from the tree once handled, so memory is bounded by the largest
+single block rather than the document size. Items are tagged with the
+part and top-level block they come from, numbered as diff.read_blocks
+numbers them, so grading can tell which ones the candidate changed.
+"""
+import xml.etree.ElementTree as ET
+
+from .document import (DOCUMENT, HEADER_FOOTER, PARAGRAPH, RUN, TABLE, DRAWING,
+                       SECTION, FIELD, Field, Run)
+from .package import W, DOCUMENT_PART, w_val
+
+
+_P = W + 'p'
+_TBL = W + 'tbl'
+_TR = W + 'tr'
+_DRAWING = W + 'drawing'
+_SECT_PR = W + 'sectPr'
+_INSTR_TEXT = W + 'instrText'
+_FLD_SIMPLE = W + 'fldSimple'
+_DOC_PART_GALLERY = W + 'docPartGallery'
+
+# Parts whose content lives under a container rather than directly under the root
+_CONTAINERS = (W + 'body', W + 'hdr', W + 'ftr')
+
+# Top-level elements Word adds and moves on every save; they are not blocks
+SAVE_MARKERS = frozenset(W + tag for tag in (
+    'proofErr', 'lastRenderedPageBreak', 'bookmarkStart', 'bookmarkEnd'))
+
+
+def is_block(element):
+    """True for the top-level elements counted as blocks: all but save markers"""
+    return element.tag not in SAVE_MARKERS
+
+
+def iter_part(doc, part_name, part, include_runs=False):
+    """Yield (part, element type, item) events for one WordprocessingML part"""
+    stack = []          # open elements, outermost first
+    tables = []         # [table number, current row index] for each open table
+    table_count = 0
+    container_depth = None
+    block = 0           # index of the top-level block being read
+
+    with doc.package.open(part_name) as source:
+        for event, element in ET.iterparse(source, events=('start', 'end')):
+            tag = element.tag
+
+            if event == 'start':
+                stack.append(element)
+                if tag in _CONTAINERS and container_depth is None:
+                    container_depth = len(stack)
+                elif tag == _TBL:
+                    table_count += 1
+                    tables.append([table_count, -1])
+                elif tag == _TR and tables:
+                    tables[-1][1] += 1
+                continue
+
+            stack.pop()
+
+            items = ()
+            if tag == _P:
+                table, row_index = tables[-1] if tables else (None, None)
+                paragraph = doc.build_paragraph(element, table, row_index)
+                items = [(PARAGRAPH, paragraph)]
+                if include_runs:
+                    items[:0] = [(RUN, Run(text, props)) for text, props in paragraph.runs]
+            elif tag == _TBL:
+                tables.pop()
+                items = [(TABLE, doc.build_table(element))]
+            elif tag == _DRAWING:
+                items = [(DRAWING, drawing) for drawing in doc.build_drawings(element)]
+            elif tag == _SECT_PR:
+                items = [(SECTION, doc.build_section(element))]
+            elif tag == _INSTR_TEXT:
+                items = [(FIELD, Field(element.text or ''))]
+            elif tag == _FLD_SIMPLE:
+                items = [(FIELD, Field(element.get(W + 'instr', '')))]
+            elif tag == _DOC_PART_GALLERY and w_val(element) == 'Table of Contents':
+                # A table of contents inside a content control counts as a TOC field
+                items = [(FIELD, Field('TOC'))]
+
+            for element_type, item in items:
+                item.block = (part_name, block)
+                yield part, element_type, item
+
+            # Drop finished top-level blocks so the tree never holds the whole body
+            if container_depth is not None and len(stack) == container_depth:
+                stack[-1].remove(element)
+                if is_block(element):
+                    block += 1
+
+
+def walk_document(doc, include_runs=False, parts=(DOCUMENT, HEADER_FOOTER)):
+    """Yield (part, element type, item) for the body, then every header and footer"""
+    if DOCUMENT in parts:
+        for event in iter_part(doc, DOCUMENT_PART, DOCUMENT, include_runs):
+            yield event
+    if HEADER_FOOTER not in parts:
+        return
+    for part_name in doc.package.header_footer_parts():
+        if doc.package.has_part(part_name):
+            for event in iter_part(doc, part_name, HEADER_FOOTER, include_runs):
+                yield event
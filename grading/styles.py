@@ -0,0 +1,306 @@
+"""Effective formatting: docDefaults, style chains, direct formatting and theme
+
+StyleResolver walks the inheritance chain once per distinct combination of
+paragraph style, character style and direct formatting, and hands out the
+same property dict to every run or paragraph that shares that combination.
+Callers must treat the returned dicts as read-only.
+"""
+import colorsys
+
+from .package import W, A, w_val
+
+
+TRUE_VALUES = ('1', 'true', 'on')
+
+# Theme colour slots in the order Word's colour picker names them
+THEME_SLOTS = ('dk1', 'lt1', 'dk2', 'lt2', 'accent1', 'accent2', 'accent3',
+               'accent4', 'accent5', 'accent6', 'hlink', 'folHlink')
+
+# w:themeColor values map onto theme slots under different names
+THEME_COLOR_ALIASES = {
+    'text1': 'dk1', 'background1': 'lt1', 'text2': 'dk2', 'background2': 'lt2',
+    'dark1': 'dk1', 'light1': 'lt1', 'dark2': 'dk2', 'light2': 'lt2',
+    'hyperlink': 'hlink', 'followedHyperlink': 'folHlink',
+}
+
+
+def toggle(element):
+    """Interpret an OOXML on/off property element"""
+    return w_val(element, default='true').lower() in TRUE_VALUES
+
+
+def to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_ppr(ppr):
+    """Extract the paragraph properties the grader understands from a w:pPr"""
+    props = {}
+    if ppr is None:
+        return props
+
+    jc = ppr.find(W + 'jc')
+    if jc is not None:
+        props['jc'] = w_val(jc)
+
+    spacing = ppr.find(W + 'spacing')
+    if spacing is not None:
+        for attr, key in (('before', 'spacing_before'), ('after', 'spacing_after'),
+                          ('line', 'spacing_line')):
+            value = to_int(w_val(spacing, attr))
+            if value is not None:
+                props[key] = value
+
+    ind = ppr.find(W + 'ind')
+    if ind is not None:
+        for attr, key in (('left', 'ind_left'), ('start', 'ind_left'),
+                          ('hanging', 'ind_hanging'), ('firstLine', 'ind_first_line')):
+            value = to_int(w_val(ind, attr))
+            if value is not None:
+                props[key] = value
+
+    num_pr = ppr.find(W + 'numPr')
+    if num_pr is not None:
+        num_id = to_int(w_val(num_pr.find(W + 'numId')))
+        if num_id is not None:
+            props['num_id'] = num_id
+            props['ilvl'] = to_int(w_val(num_pr.find(W + 'ilvl'))) or 0
+
+    tabs = ppr.find(W + 'tabs')
+    if tabs is not None:
+        props['tabs'] = tuple(w_val(tab) for tab in tabs.findall(W + 'tab'))
+
+    return props
+
+
+def read_rpr(rpr):
+    """Extract the run properties the grader understands from a w:rPr"""
+    props = {}
+    if rpr is None:
+        return props
+
+    for tag, key in (('b', 'bold'), ('i', 'italic'), ('caps', 'caps')):
+        element = rpr.find(W + tag)
+        if element is not None:
+            props[key] = toggle(element)
+
+    underline = rpr.find(W + 'u')
+    if underline is not None:
+        props['underline'] = w_val(underline, default='single') != 'none'
+
+    size = to_int(w_val(rpr.find(W + 'sz')))
+    if size is not None:
+        props['size'] = size
+
+    color = rpr.find(W + 'color')
+    if color is not None:
+        props['color'] = (w_val(color) or '').upper()
+        theme_color = w_val(color, 'themeColor')
+        props['theme_color'] = THEME_COLOR_ALIASES.get(theme_color, theme_color)
+        if theme_color:
+            props['theme_shade'] = w_val(color, 'themeShade')
+            props['theme_tint'] = w_val(color, 'themeTint')
+
+    fonts = rpr.find(W + 'rFonts')
+    if fonts is not None:
+        # A theme font reference wins over the explicit name Word caches next to it
+        font = w_val(fonts, 'asciiTheme') or w_val(fonts, 'ascii')
+        if font:
+            props['font'] = font
+
+    return props
+
+
+# Only these children of w:pPr / w:rPr affect what read_ppr / read_rpr return,
+# so they alone make up the memo keys (rsids and the like are ignored)
+_PPR_TAGS = frozenset(W + tag for tag in ('jc', 'spacing', 'ind', 'numPr', 'tabs'))
+_RPR_TAGS = frozenset(W + tag for tag in ('b', 'i', 'caps', 'u', 'sz', 'color', 'rFonts'))
+
+
+def _element_key(element):
+    return (element.tag, tuple(sorted(element.attrib.items())),
+            tuple(_element_key(child) for child in element))
+
+
+def formatting_key(element, tags):
+    """Hashable digest of the formatting children of a w:pPr or w:rPr"""
+    if element is None:
+        return ()
+    return tuple(_element_key(child) for child in element if child.tag in tags)
+
+
+def _adjust_luminance(hex_color, shade=None, tint=None):
+    """Apply w:themeShade / w:themeTint (hex bytes) to an RGB hex colour"""
+    try:
+        red, green, blue = (int(hex_color[i:i + 2], 16) / 255.0 for i in (0, 2, 4))
+    except ValueError:
+        return hex_color
+    hue, lightness, saturation = colorsys.rgb_to_hls(red, green, blue)
+    if shade:
+        lightness *= int(shade, 16) / 255.0
+    if tint:
+        factor = int(tint, 16) / 255.0
+        lightness = lightness * factor + (1 - factor)
+    red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+    return '%02X%02X%02X' % tuple(int(round(c * 255)) for c in (red, green, blue))
+
+
+class StyleResolver:
+    """Resolves effective paragraph and run properties for one document"""
+
+    def __init__(self, styles_root, theme_root=None, numbering=None):
+        self.numbering = numbering
+        self.styles = {}
+        self.style_names = {}
+        self.default_styles = {}
+        self.default_ppr = {}
+        self.default_rpr = {}
+        self.theme_colors = {}
+        self.theme_fonts = {}
+
+        self._chains = {}
+        self._style_props = {}
+        self._paragraph_cache = {}
+        self._run_cache = {}
+        self.hits = 0
+        self.misses = 0
+
+        self._load_styles(styles_root)
+        self._load_theme(theme_root)
+
+    def _load_styles(self, root):
+        if root is None:
+            return
+
+        defaults = root.find(W + 'docDefaults')
+        if defaults is not None:
+            self.default_ppr = read_ppr(defaults.find(W + 'pPrDefault/' + W + 'pPr'))
+            self.default_rpr = read_rpr(defaults.find(W + 'rPrDefault/' + W + 'rPr'))
+
+        for style in root.findall(W + 'style'):
+            style_id = style.get(W + 'styleId')
+            self.styles[style_id] = style
+            self.style_names[style_id] = (w_val(style.find(W + 'name')) or style_id).lower()
+            if style.get(W + 'default') in TRUE_VALUES:
+                self.default_styles[style.get(W + 'type')] = style_id
+
+    def _load_theme(self, root):
+        if root is None:
+            return
+        scheme = root.find('.//' + A + 'clrScheme')
+        if scheme is not None:
+            for slot in THEME_SLOTS:
+                element = scheme.find(A + slot)
+                if element is None or len(element) == 0:
+                    continue
+                value = element[0].get('val') or element[0].get('lastClr')
+                if value:
+                    self.theme_colors[slot] = value.upper()
+
+        fonts = root.find('.//' + A + 'fontScheme')
+        if fonts is not None:
+            for kind in ('major', 'minor'):
+                latin = fonts.find(A + kind + 'Font/' + A + 'latin')
+                if latin is not None:
+                    self.theme_fonts[kind] = latin.get('typeface')
+
+    # Style chains
+
+    def style_chain(self, style_id):
+        """Return the style elements from the root of the basedOn chain to style_id"""
+        if style_id in self._chains:
+            return self._chains[style_id]
+        chain = []
+        seen = set()
+        current = style_id
+        while current and current in self.styles and current not in seen:
+            seen.add(current)
+            style = self.styles[current]
+            chain.append(style)
+            current = w_val(style.find(W + 'basedOn'))
+        chain.reverse()
+        self._chains[style_id] = chain
+        return chain
+
+    def style_name(self, style_id):
+        return self.style_names.get(style_id, (style_id or '').lower())
+
+    def style_props(self, style_id):
+        """Return (pPr props, rPr props) accumulated along a style's basedOn chain"""
+        if style_id not in self._style_props:
+            ppr, rpr = {}, {}
+            for style in self.style_chain(style_id):
+                ppr.update(read_ppr(style.find(W + 'pPr')))
+                rpr.update(read_rpr(style.find(W + 'rPr')))
+            self._style_props[style_id] = (ppr, rpr)
+        return self._style_props[style_id]
+
+    # Effective properties
+
+    def paragraph_style_id(self, ppr):
+        style_id = w_val(ppr.find(W + 'pStyle')) if ppr is not None else None
+        return style_id or self.default_styles.get('paragraph')
+
+    def paragraph_props(self, style_id, ppr):
+        """Effective paragraph properties: defaults, style chain, list level, direct"""
+        key = (style_id, formatting_key(ppr, _PPR_TAGS))
+        props = self._paragraph_cache.get(key)
+        if props is not None:
+            self.hits += 1
+            return props
+        self.misses += 1
+
+        props = dict(self.default_ppr)
+        props.update(self.style_props(style_id)[0])
+        direct = read_ppr(ppr)
+        num_id = direct.get('num_id', props.get('num_id'))
+        if num_id == 0:
+            # numId 0 switches off numbering inherited from the style
+            direct.pop('num_id', None)
+            direct.pop('ilvl', None)
+            props.pop('num_id', None)
+            props.pop('ilvl', None)
+        elif num_id is not None and self.numbering is not None:
+            level = self.numbering(num_id, direct.get('ilvl', props.get('ilvl', 0)))
+            if level is not None:
+                props['num_fmt'] = level.num_fmt
+                props['num_text'] = level.level_text
+                props.update(level.props)
+        props.update(direct)
+
+        self._paragraph_cache[key] = props
+        return props
+
+    def run_props(self, paragraph_style_id, rpr):
+        """Effective run properties: defaults, paragraph style, character style, direct, theme"""
+        char_style = w_val(rpr.find(W + 'rStyle')) if rpr is not None else None
+        key = (paragraph_style_id, char_style, formatting_key(rpr, _RPR_TAGS))
+        props = self._run_cache.get(key)
+        if props is not None:
+            self.hits += 1
+            return props
+        self.misses += 1
+
+        props = dict(self.default_rpr)
+        props.update(self.style_props(paragraph_style_id)[1])
+        if char_style:
+            props.update(self.style_props(char_style)[1])
+        props.update(read_rpr(rpr))
+        self._resolve_theme(props)
+
+        self._run_cache[key] = props
+        return props
+
+    def _resolve_theme(self, props):
+        slot = props.get('theme_color')
+        if slot in self.theme_colors:
+            props['color'] = _adjust_luminance(self.theme_colors[slot],
+                                               props.get('theme_shade'), props.get('theme_tint'))
+
+        font = props.get('font')
+        if font and font.endswith(('HAnsi', 'EastAsia', 'Bidi', 'Ascii')):
+            kind = 'major' if font.startswith('major') else 'minor'
+            props['font'] = self.theme_fonts.get(kind, font)
@@ -0,0 +1,186 @@
+"""Append-only journal of an exam session, for resuming after a crash
+
+Every event is one JSON line: navigation, marks, saves and timer
+checkpoints. Lines are written and fsync'd in batches, every FLUSH_EVENTS
+events or FLUSH_INTERVAL seconds. Events that must not be lost, such as
+marks and saves, are synced at once. replay() folds the lines back into the
+session state. A line torn by a crash is ignored, so a relaunch restores the
+session as of its last synced event. Once the file holds COMPACT_EVENTS
+events it is rewritten as a single snapshot event, which keeps the file
+small however long the exam runs.
+
+    python journal.py JOURNAL     print the state a journal replays to
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from session import SNAPSHOT_VERSION, STATE_CODES
+
+
+JOURNAL_NAME = 'session.journal'
+FLUSH_EVENTS = 20
+FLUSH_INTERVAL = 5.0   # seconds
+COMPACT_EVENTS = 500
+
+
+def new_state(project=None, count=0):
+    return {
+        'project': project,
+        'current_task': 1,
+        'session': {'version': SNAPSHOT_VERSION, 'states': '0' * count, 'events': []},
+        'seconds': 0,
+        'task_seconds': {},  # task number (as a string) -> seconds spent on it
+        'saves': {},        # source document path -> latest manifest
+        'ended': False,
+    }
+
+
+def fold(state, event):
+    """Apply one event to a replayed state; returns the state to continue with"""
+    kind = event['kind']
+    if kind == 'snapshot':
+        return event['state']
+    if kind == 'start':
+        return new_state(event['project'], event['count'])
+
+    state['ended'] = False
+    session = state['session']
+    if kind == 'navigate':
+        state['current_task'] = event['task']
+    elif kind == 'mark':
+        task, after = event['task'], STATE_CODES[event['state']]
+        states = session['states']
+        if 1 <= task <= len(states):
+            before = int(states[task - 1])
+            session['states'] = states[:task - 1] + str(after) + states[task:]
+            session['events'].append([event['t'], task, before, after])
+    elif kind == 'reset':
+        session['states'] = '0' * event['count']
+        session['events'].append([event['t'], 0, 0, 0])
+        state['current_task'] = 1
+        state['seconds'] = 0
+        state['task_seconds'] = {}
+    elif kind == 'tick':
+        state['seconds'] = event['seconds']
+        if 'task_seconds' in event:
+            state['task_seconds'] = event['task_seconds']
+    elif kind == 'save':
+        state['saves'][event['source']] = event['manifest']
+    elif kind == 'end':
+        state['ended'] = True
+    return state
+
+
+def read_events(path):
+    """Events in a journal, stopping at a line cut off by a crash"""
+    events = []
+    try:
+        with open(path, encoding='utf-8') as source:
+            for line in source:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    events.append(json.loads(line))
+                except ValueError:
+                    break
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def replay(path):
+    """The state a journal describes, or None if it is empty"""
+    state = None
+    for event in read_events(path):
+        state = fold(state if state is not None else new_state(), event)
+    return state
+
+
+class Journal:
+    """Appends session events to a file, syncing in batches and compacting as it grows"""
+
+    def __init__(self, path, flush_events=FLUSH_EVENTS, flush_interval=FLUSH_INTERVAL,
+                 compact_events=COMPACT_EVENTS):
+        self.path = path
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval
+        self.compact_events = compact_events
+
+        events = read_events(path)
+        self.state = new_state()
+        for event in events:
+            self.state = fold(self.state, event)
+        self.count = len(events)
+
+        self._file = None
+        self._buffer = []
+        if events:
+            # Start from one snapshot line, which also drops a torn last line
+            self.compact()
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+            self._last_sync = time.monotonic()
+
+    @property
+    def resumable(self):
+        """True when the journal holds a session that did not end cleanly"""
+        return self.state['project'] is not None and not self.state['ended']
+
+    def record(self, kind, durable=False, **fields):
+        """Append an event; durable events are on disk when this returns"""
+        if self._file is None:
+            return  # Closed: late events, such as a queued save result, are dropped
+        event = dict(fields, kind=kind, t=time.time())
+        self.state = fold(self.state, event)
+        self._buffer.append(json.dumps(event, ensure_ascii=False) + '\n')
+        self.count += 1
+        if (durable or len(self._buffer) >= self.flush_events
+                or time.monotonic() - self._last_sync >= self.flush_interval):
+            self.sync()
+        if self.count >= self.compact_events:
+            self.compact()
+
+    def sync(self):
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer = []
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def compact(self):
+        """Rewrite the journal as one snapshot of the current state"""
+        if self._file is not None:
+            self._file.close()
+        self._buffer = []
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as out:
+            out.write(json.dumps({'kind': 'snapshot', 't': time.time(), 'state': self.state},
+                                 ensure_ascii=False) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.count = 1
+        self._last_sync = time.monotonic()
+
+    def close(self, ended=True):
+        """Sync and close; ended marks the session finished so it is not resumed"""
+        if self._file is None:
+            return
+        if ended:
+            self.record('end', durable=True)
+        self.sync()
+        self._file.close()
+        self._file = None
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    print(json.dumps(replay(sys.argv[1]), indent=1))
@@ -0,0 +1,128 @@
+"""Task states of one exam session
+
+SessionState keeps one byte per task instead of a dict of strings, running
+totals so progress never needs a recount, a log of every transition with
+its time, and callbacks for the widgets that show it. A snapshot is a short
+digit string plus the log, cheap to persist and restore.
+"""
+import time
+
+
+INCOMPLETE, COMPLETE, REVIEW = 0, 1, 2
+STATE_NAMES = ('incomplete', 'complete', 'review')
+STATE_CODES = dict((name, code) for code, name in enumerate(STATE_NAMES))
+
+SNAPSHOT_VERSION = 1
+
+
+class SessionState:
+    """States of tasks 1..count, read and set by name like the old task_states dict
+
+    Listeners are called as listener(task, before, after) with state names;
+    after reset() task is None and before/after are None as well.
+    """
+
+    def __init__(self, count, clock=time.time):
+        self.clock = clock
+        self.events = []        # (timestamp, task, before code, after code); task 0 is a reset
+        self._listeners = []
+        self._start(count)
+
+    def _start(self, count):
+        self.count = count
+        self._states = bytearray(count + 1)    # indexed by task number; slot 0 unused
+        self._totals = [count, 0, 0]           # tasks per state code
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify(self, task, before, after):
+        for listener in list(self._listeners):
+            listener(task, before, after)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, task):
+        return 1 <= task <= self.count
+
+    def __getitem__(self, task):
+        if task not in self:
+            raise KeyError(task)
+        return STATE_NAMES[self._states[task]]
+
+    def __setitem__(self, task, state):
+        self.set(task, state)
+
+    def set(self, task, state):
+        """Move a task to a state by name; returns False if it was already there"""
+        if task not in self:
+            raise KeyError(task)
+        after = STATE_CODES[state]
+        before = self._states[task]
+        if before == after:
+            return False
+        self._states[task] = after
+        self._totals[before] -= 1
+        self._totals[after] += 1
+        self.events.append((self.clock(), task, before, after))
+        self._notify(task, STATE_NAMES[before], state)
+        return True
+
+    def items(self):
+        return [(task, STATE_NAMES[self._states[task]]) for task in range(1, self.count + 1)]
+
+    def values(self):
+        return [STATE_NAMES[code] for code in self._states[1:]]
+
+    def total(self, state):
+        return self._totals[STATE_CODES[state]]
+
+    @property
+    def completed(self):
+        return self._totals[COMPLETE]
+
+    @property
+    def for_review(self):
+        return self._totals[REVIEW]
+
+    @property
+    def all_complete(self):
+        return self._totals[COMPLETE] == self.count
+
+    @property
+    def progress(self):
+        """Whole percent of tasks complete"""
+        return self._totals[COMPLETE] * 100 // self.count if self.count else 0
+
+    def reset(self, count=None):
+        """Every task back to incomplete, optionally for a new number of tasks"""
+        self._start(self.count if count is None else count)
+        self.events.append((self.clock(), 0, INCOMPLETE, INCOMPLETE))
+        self._notify(None, None, None)
+
+    def snapshot(self):
+        """A JSON-ready copy of the states and the event log"""
+        return {
+            'version': SNAPSHOT_VERSION,
+            'states': ''.join(str(code) for code in self._states[1:]),
+            'events': [list(event) for event in self.events],
+        }
+
+    def restore(self, snapshot):
+        """Load a snapshot() in place; listeners see it as a reset"""
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported session snapshot version")
+        states = snapshot['states']
+        self._start(len(states))
+        for task, digit in enumerate(states, 1):
+            code = int(digit)
+            self._states[task] = code
+            self._totals[INCOMPLETE] -= 1
+            self._totals[code] += 1
+        self.events = [tuple(event) for event in snapshot['events']]
+        self._notify(None, None, None)
@@ -0,0 +1,95 @@
+"""Window startup work on a worker thread
+
+Reading the task workbook, replaying the session journal, restoring the
+documents of an interrupted session and starting Word all wait on the disk
+or on COM. Startup runs them on one thread once the window is painted and
+reports each stage and the outcome through Qt signals, so the window keeps
+repainting meanwhile. The window only applies the result: it builds its
+task list from the records the project has by then loaded, restores the
+journal's state and opens the first document.
+"""
+import os
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+RESUME_FOLDER = 'Resumed'
+
+
+class StartupResult:
+    def __init__(self):
+        self.journal = None         # the session journal, or None without a save folder
+        self.restored = {}          # source path key -> copy restored from its last save
+        self.errors = []            # messages to show once the window takes over
+        self.backend_ready = False
+
+
+class Startup(QObject):
+    """Loads tasks, reads the journal and starts the backend off the UI thread"""
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(object)   # StartupResult
+
+    def __init__(self, project, backend, save_folder, total_tasks, key, parent=None):
+        """key(path) normalizes a source path the way the document sessions do"""
+        super().__init__(parent)
+        self.project = project
+        self.backend = backend
+        self.save_folder = save_folder
+        self.total_tasks = total_tasks
+        self.key = key
+        self._thread = threading.Thread(target=self._run, name='startup', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        result = StartupResult()
+        if self.project is not None:
+            try:
+                # The project keeps the records; the window reads them from there
+                self.project.load_tasks()
+            except Exception:
+                pass    # Read again on the UI thread, which reports the error
+
+        if self.save_folder:
+            self.progress.emit("Restoring session...")
+            try:
+                result.journal, result.restored = self._open_journal()
+            except OSError as e:
+                result.errors.append(f"Error opening session journal: {str(e)}")
+
+        self.progress.emit("Starting Word...")
+        try:
+            self.backend.start()
+            result.backend_ready = True
+        except Exception as e:
+            result.errors.append(f"Error launching Word: {str(e)}")
+        self.finished.emit(result)
+
+    def _open_journal(self):
+        """Replay the journal; restore an unfinished session's documents as last saved"""
+        from journal import Journal, JOURNAL_NAME
+        from storage import store_for_manifest
+
+        journal = Journal(os.path.join(self.save_folder, JOURNAL_NAME))
+        restored = {}
+        if resumable(journal, self.project, self.total_tasks):
+            resume_folder = os.path.join(self.save_folder, RESUME_FOLDER)
+            for source, manifest in journal.state['saves'].items():
+                try:
+                    os.makedirs(resume_folder, exist_ok=True)
+                    path = os.path.join(resume_folder, os.path.basename(source))
+                    store_for_manifest(manifest).materialize(manifest, path)
+                    restored[self.key(source)] = path
+                except Exception:
+                    pass  # Falls back to the source document
+        return journal, restored
+
+
+def resumable(journal, project, total_tasks):
+    """True when the journal holds an unfinished session of this project"""
+    state = journal.state
+    project_id = project.id if project else None
+    return (journal.resumable and state['project'] == project_id
+            and len(state['session']['states']) == total_tasks)
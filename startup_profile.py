@@ -0,0 +1,94 @@
+"""Startup profiling for app.py
+
+    python app.py --profile-startup [--budget MS] [--top N]
+
+Relaunches the app with Python's import timing switched on, waits until the
+login window is shown, then prints how long that took, the slowest imports
+and whether the startup budget (MOS_STARTUP_BUDGET_MS, default 1500 ms) was
+met. Exits with status 1 when over budget so it can gate a lab image build.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+BUDGET_ENV = 'MOS_STARTUP_BUDGET_MS'
+DEFAULT_BUDGET_MS = 1500
+READY_MARKER = 'startup-ready'
+
+
+def report_ready(app):
+    """Called in the profiled child once the login window is up"""
+    print(READY_MARKER, flush=True)
+    app.quit()
+
+
+def parse_importtime(lines):
+    """[(module, self us, cumulative us, depth)] from PYTHONPROFILEIMPORTTIME output"""
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue    # the header line
+        name = fields[2].rstrip('\n')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), self_us, cumulative_us, depth))
+    return rows
+
+
+def _option(argv, name, default):
+    if name in argv:
+        index = argv.index(name)
+        if index + 1 < len(argv):
+            return int(argv[index + 1])
+    return default
+
+
+def profile_startup(script, argv):
+    budget = _option(argv, '--budget', int(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MS)))
+    top = _option(argv, '--top', 15)
+    env = dict(os.environ, PYTHONPROFILEIMPORTTIME='1')
+
+    with tempfile.TemporaryFile(mode='w+') as errors:
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, script, '--startup-report'],
+                                 stdout=subprocess.PIPE, stderr=errors,
+                                 universal_newlines=True, env=env)
+        ready = None
+        for line in child.stdout:
+            if line.strip() == READY_MARKER and ready is None:
+                ready = (time.perf_counter() - start) * 1000
+        child.wait()
+        errors.seek(0)
+        rows = parse_importtime(errors)
+
+    if ready is None:
+        print("The app exited before the login window was shown")
+        return 2
+
+    total_imports = sum(row[1] for row in rows) / 1000
+    print(f"Login window shown after {ready:.0f} ms "
+          f"({total_imports:.0f} ms importing {len(rows)} modules)")
+
+    print("\nSlowest top-level imports (cumulative):")
+    for name, _, cumulative, _ in sorted((row for row in rows if row[3] == 0),
+                                         key=lambda row: -row[2])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    print("\nSlowest modules (self):")
+    for name, self_us, _, _ in sorted(rows, key=lambda row: -row[1])[:top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    if ready > budget:
+        print(f"\nOver the startup budget of {budget} ms by {ready - budget:.0f} ms")
+        return 1
+    print(f"\nWithin the startup budget of {budget} ms")
+    return 0
@@ -0,0 +1,173 @@
+"""Content-addressed storage for saved submissions
+
+A saved .docx is split into its zip parts. Each part is stored once under
+its SHA-256 in objects/, zlib-compressed, and every save only writes a small
+JSON manifest listing the parts it is made of. Media such as the exam's
+1.5 MB photo is therefore kept once no matter how often the candidate saves.
+Any manifest can be turned back into a .docx with materialize(): the same
+parts in the same order, though not the same zip bytes.
+
+    python storage.py materialize MANIFEST.json OUT.docx
+    python storage.py stats STORE_DIR
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import zipfile
+import zlib
+from datetime import datetime
+
+
+MANIFEST_VERSION = 1
+
+# Under the save folder, next to the Task_N folders holding the manifests
+STORE_FOLDER = '.store'
+
+
+def working_copy_name(source):
+    """File name of a source document's working copy in the store, one per source"""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    digest = hashlib.sha256(os.path.abspath(source).encode('utf-8')).hexdigest()[:12]
+    return f'working-{stem}-{digest}.docx'
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file and rename, so readers never see half a file"""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as target:
+            target.write(data)
+        os.replace(temp_path, path)
+    except:
+        os.remove(temp_path)
+        raise
+
+
+class PartStore:
+    """Zip parts stored once by hash, plus manifests describing saved documents"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        os.makedirs(self.objects, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def has(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put(self, data):
+        """Store bytes if not already present; returns their SHA-256"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_atomic(path, zlib.compress(data))
+        return digest
+
+    def get(self, digest):
+        with open(self.object_path(digest), 'rb') as source:
+            return zlib.decompress(source.read())
+
+    def ingest(self, docx_path, manifest_path, **meta):
+        """Store the parts of a .docx and write its manifest; returns the manifest"""
+        parts = []
+        with zipfile.ZipFile(docx_path) as source:
+            for info in source.infolist():
+                parts.append({
+                    'name': info.filename,
+                    'sha256': self.put(source.read(info)),
+                    'size': info.file_size,
+                    'compress_type': info.compress_type,
+                    'date_time': list(info.date_time),
+                    'create_system': info.create_system,
+                    'external_attr': info.external_attr,
+                    'extra': info.extra.hex(),
+                    'comment': info.comment.decode('latin-1'),
+                })
+        manifest = dict(meta, version=MANIFEST_VERSION,
+                        saved_at=datetime.now().isoformat(timespec='seconds'), parts=parts)
+        _write_atomic(manifest_path, json.dumps(manifest, indent=1).encode('utf-8'))
+        return manifest
+
+    def materialize(self, manifest_path, docx_path):
+        """Rebuild the .docx a manifest describes
+
+        The parts come back byte for byte, in their original order, with
+        their names, dates, compression method and extra fields. The zip
+        file itself is not byte-identical to the one saved: the parts are
+        compressed again by zlib, and zipfile gives parts without file
+        attributes its own.
+        """
+        manifest = read_manifest(manifest_path)
+        folder = os.path.dirname(os.path.abspath(docx_path))
+        fd, temp_path = tempfile.mkstemp(suffix='.docx', dir=folder, prefix='.tmp-')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(temp_path, 'w') as target:
+                for part in manifest['parts']:
+                    info = zipfile.ZipInfo(part['name'], tuple(part['date_time']))
+                    info.compress_type = part['compress_type']
+                    # Older manifests lack these; ZipInfo's defaults stand in
+                    info.create_system = part.get('create_system', info.create_system)
+                    info.external_attr = part.get('external_attr', info.external_attr)
+                    info.extra = bytes.fromhex(part.get('extra', ''))
+                    info.comment = part.get('comment', '').encode('latin-1')
+                    target.writestr(info, self.get(part['sha256']))
+            os.replace(temp_path, docx_path)
+        except:
+            os.remove(temp_path)
+            raise
+        return docx_path
+
+    def stats(self):
+        """Return (object count, bytes on disk) for the object store"""
+        count = size = 0
+        for folder, _, files in os.walk(self.objects):
+            for name in files:
+                count += 1
+                size += os.path.getsize(os.path.join(folder, name))
+        return count, size
+
+
+def read_manifest(path):
+    with open(path, encoding='utf-8') as source:
+        manifest = json.load(source)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version in {path}")
+    return manifest
+
+
+class ManifestParts:
+    """Part names and hashes of a manifest, enough for a grading ResultCache lookup"""
+
+    def __init__(self, manifest):
+        self.digests = dict((part['name'], part['sha256']) for part in manifest['parts'])
+
+    def part_names(self):
+        return sorted(self.digests)
+
+    def part_digest(self, name):
+        return self.digests.get(name)
+
+
+def store_for_manifest(manifest_path):
+    """The PartStore a manifest under Completed_Tasks/Task_N belongs to"""
+    save_folder = os.path.dirname(os.path.dirname(os.path.abspath(manifest_path)))
+    return PartStore(os.path.join(save_folder, STORE_FOLDER))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == 'materialize':
+        store_for_manifest(sys.argv[2]).materialize(sys.argv[2], sys.argv[3])
+        print(f"Wrote {sys.argv[3]}")
+    elif len(sys.argv) == 3 and sys.argv[1] == 'stats':
+        count, size = PartStore(sys.argv[2]).stats()
+        print(f"{count} objects, {size / 1e6:.1f} MB")
+    else:
+        print(__doc__)
+        sys.exit(1)
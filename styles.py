@@ -0,0 +1,55 @@
+"""Stylesheets and colours for the exam window
+
+TASK_BUTTON_COLORS are the task strip's colours per task state.
+Stylesheets that depend on a value, such as the description's font size,
+are built once per value and reused.
+"""
+from functools import lru_cache
+
+
+TASK_BUTTON_COLORS = {
+    'incomplete': 'transparent',
+    'complete': '#4CAF50',
+    'review': '#FFA500'
+}
+
+
+@lru_cache(maxsize=None)
+def description_style(font_size):
+    """Stylesheet of the task description at a font size"""
+    return f'''
+        QTextEdit {{
+            background-color: white;
+            color: black;
+            border: none;
+            font-size: {font_size}px;
+            line-height: 1.6;
+            selection-background-color: #2b579a;
+            selection-color: white;
+        }}
+        QTextEdit:focus {{
+            border: none;
+            outline: none;
+        }}
+        QScrollBar:vertical {{
+            border: none;
+            background: #f0f0f0;
+            width: 10px;
+            margin: 0;
+        }}
+        QScrollBar::handle:vertical {{
+            background: #2b579a;
+            min-height: 20px;
+            border-radius: 5px;
+        }}
+        QScrollBar::handle:vertical:hover {{
+            background: #1e3f7a;
+        }}
+        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
+            height: 0;
+            background: none;
+        }}
+        QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {{
+            background: none;
+        }}
+    '''
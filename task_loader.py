@@ -0,0 +1,189 @@
+"""Task definitions straight from the requirements workbook, without pandas
+
+The first worksheet of the .xlsx is streamed with iterparse, resolving shared
+and inline strings, and each row becomes a task record with its
+RequiredActions already split. Records are cached as JSON in a .cache folder
+next to the workbook, keyed by its mtime and size with a SHA-256 fallback,
+so later launches skip the zip entirely.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+import tempfile
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+CACHE_FORMAT = 1
+CACHE_FOLDER = '.cache'
+
+S = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_COLUMN = re.compile(r'[A-Z]+')
+
+
+def _column_index(reference):
+    """'C7' -> 2"""
+    index = 0
+    for letter in _COLUMN.match(reference).group():
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def _string_text(element):
+    """Text of a shared string item or inline string, skipping phonetic runs"""
+    parts = []
+    for child in element:
+        if child.tag == S + 't':
+            parts.append(child.text or '')
+        elif child.tag == S + 'r':
+            parts.extend(t.text or '' for t in child.iter(S + 't'))
+    return ''.join(parts)
+
+
+def _first_sheet(workbook):
+    """Zip name of the workbook's first worksheet"""
+    root = ET.fromstring(workbook.read('xl/workbook.xml'))
+    sheet = root.find(S + 'sheets/' + S + 'sheet')
+    rel_id = sheet.get(R + 'id')
+    rels = ET.fromstring(workbook.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(PKG_REL + 'Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target[1:]
+            return posixpath.normpath(posixpath.join('xl', target))
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _shared_strings(workbook):
+    if 'xl/sharedStrings.xml' not in workbook.namelist():
+        return []
+    strings = []
+    with workbook.open('xl/sharedStrings.xml') as source:
+        for _, element in ET.iterparse(source):
+            if element.tag == S + 'si':
+                strings.append(_string_text(element))
+                element.clear()
+    return strings
+
+
+def _cell_value(cell, strings):
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr':
+        inline = cell.find(S + 'is')
+        return _string_text(inline) if inline is not None else ''
+    value = cell.findtext(S + 'v')
+    if value is None:
+        return None
+    if kind == 's':
+        return strings[int(value)]
+    if kind == 'b':
+        return value == '1'
+    if kind == 'n':
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def read_rows(path):
+    """Yield each data row of the first worksheet as {header: value}"""
+    with zipfile.ZipFile(path) as workbook:
+        strings = _shared_strings(workbook)
+        headers = None
+        with workbook.open(_first_sheet(workbook)) as source:
+            for _, element in ET.iterparse(source):
+                if element.tag != S + 'row':
+                    continue
+                values = {}
+                column = -1
+                for cell in element.iter(S + 'c'):
+                    # r is optional: without it a cell follows the one before
+                    reference = cell.get('r')
+                    column = _column_index(reference) if reference else column + 1
+                    values[column] = _cell_value(cell, strings)
+                element.clear()
+                if headers is None:
+                    headers = values
+                    continue
+                if any(value not in (None, '') for value in values.values()):
+                    yield dict((name, values.get(index)) for index, name in headers.items())
+
+
+def parse_tasks(path):
+    """Task records from the workbook: task_id, description, required_actions, file_name"""
+    records = []
+    for row in read_rows(path):
+        actions = row['RequiredActions']
+        records.append({
+            'task_id': row['TaskID'],
+            'description': row['Description'],
+            'required_actions': [action.strip() for action in actions.split(';')
+                                 if action.strip()] if isinstance(actions, str) else [],
+            'file_name': row['FileName'],
+        })
+    return records
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(path):
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_FOLDER, name + '.tasks.json')
+
+
+def _write_cache(path, cache):
+    target = cache_path(path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as out:
+                json.dump(cache, out, ensure_ascii=False)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError:
+        # A read-only install still works, it just parses every time
+        pass
+
+
+def load_task_records(path, use_cache=True):
+    """Task records for a workbook, from the compiled cache when it is still valid"""
+    stat = os.stat(path)
+    cache = None
+    if use_cache:
+        try:
+            with open(cache_path(path), encoding='utf-8') as source:
+                cache = json.load(source)
+        except (OSError, ValueError):
+            cache = None
+
+    if cache is not None and cache.get('format') == CACHE_FORMAT:
+        if cache['mtime_ns'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+            return cache['tasks']
+        # Touched (copied, checked out) but maybe not changed: compare content
+        digest = _file_hash(path)
+        if cache['sha256'] == digest:
+            cache['mtime_ns'], cache['size'] = stat.st_mtime_ns, stat.st_size
+            _write_cache(path, cache)
+            return cache['tasks']
+    else:
+        digest = _file_hash(path) if use_cache else None
+
+    tasks = parse_tasks(path)
+    if use_cache:
+        _write_cache(path, {'format': CACHE_FORMAT, 'mtime_ns': stat.st_mtime_ns,
+                            'size': stat.st_size, 'sha256': digest, 'tasks': tasks})
+    return tasks
@@ -0,0 +1,234 @@
+"""Task navigator that scales to projects with hundreds of tasks
+
+TaskStrip shows the tasks in a horizontal QListView over TaskListModel, a
+list model that reads the SessionState directly. The view only paints the
+items in sight and every item has the same size, so the strip costs the
+same with 10 tasks as with 500. A state change or a move to another task
+emits dataChanged for just the rows concerned. The search box jumps to a
+task by number, or filters the strip by words of the task text; the filter
+box limits it to incomplete, review or complete tasks.
+"""
+from PyQt5.QtCore import (QAbstractListModel, QModelIndex, QSize, QSortFilterProxyModel, Qt,
+                          pyqtSignal)
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (QComboBox, QFrame, QHBoxLayout, QLineEdit, QListView, QStyle,
+                             QStyledItemDelegate, QWidget)
+
+from styles import TASK_BUTTON_COLORS
+
+
+STATE_ROLE = Qt.UserRole
+CURRENT_ROLE = Qt.UserRole + 1
+TASK_ROLE = Qt.UserRole + 2
+
+CURRENT_COLOR = '#1e3f7a'
+FILTERS = [('All tasks', None), ('Incomplete', 'incomplete'),
+           ('For review', 'review'), ('Complete', 'complete')]
+
+CONTROL_STYLE = '''
+    QLineEdit, QComboBox {
+        background-color: white;
+        color: black;
+        border: none;
+        border-radius: 2px;
+        padding: 2px 5px;
+        font-size: 12px;
+    }
+'''
+
+VIEW_STYLE = '''
+    QListView {
+        background: transparent;
+        border: none;
+    }
+    QScrollBar:horizontal {
+        background: transparent;
+        height: 6px;
+    }
+    QScrollBar::handle:horizontal {
+        background: rgba(255, 255, 255, 0.4);
+        border-radius: 3px;
+        min-width: 20px;
+    }
+    QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
+        width: 0;
+    }
+'''
+
+
+class TaskListModel(QAbstractListModel):
+    """One row per task of a SessionState, updated through its listener"""
+
+    def __init__(self, states, parent=None):
+        super().__init__(parent)
+        self.states = states
+        self.current = 1
+        self.texts = {}     # task -> lower-case text searched by the filter
+        states.subscribe(self.on_state_changed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.states)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        task = index.row() + 1
+        if role == Qt.DisplayRole:
+            return f'Task {task}'
+        if role == STATE_ROLE:
+            return self.states[task]
+        if role == CURRENT_ROLE:
+            return task == self.current
+        if role == TASK_ROLE:
+            return task
+        return None
+
+    def task_changed(self, task):
+        if task in self.states:
+            index = self.index(task - 1)
+            self.dataChanged.emit(index, index)
+
+    def on_state_changed(self, task, before, after):
+        if task is None:
+            # Reset or restore: the number of tasks may have changed too
+            self.beginResetModel()
+            self.endResetModel()
+        else:
+            self.task_changed(task)
+
+    def set_current(self, task):
+        """Move the highlight; only the old and new current rows repaint"""
+        previous, self.current = self.current, task
+        if previous != task:
+            self.task_changed(previous)
+            self.task_changed(task)
+
+
+class TaskFilterModel(QSortFilterProxyModel):
+    """Tasks in one state and/or whose text holds every search word"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.state = None
+        self.words = []
+
+    def set_filter(self, state=None, words=()):
+        self.state = state
+        self.words = list(words)
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        model = self.sourceModel()
+        task = row + 1
+        if self.state is not None and model.states[task] != self.state:
+            return False
+        text = model.texts.get(task, '')
+        return all(word in text for word in self.words)
+
+
+class TaskDelegate(QStyledItemDelegate):
+    """Paints a task like the old task buttons: a colour by state, white label"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.size = QSize(80, 24)
+        self.colors = dict((state, QColor(color)) for state, color in TASK_BUTTON_COLORS.items())
+        self.current_color = QColor(CURRENT_COLOR)
+
+    def sizeHint(self, option, index):
+        return self.size
+
+    def paint(self, painter, option, index):
+        if index.data(CURRENT_ROLE) or option.state & QStyle.State_MouseOver:
+            color = self.current_color
+        else:
+            color = self.colors[index.data(STATE_ROLE)]
+        painter.save()
+        painter.fillRect(option.rect.adjusted(1, 0, -1, 0), color)
+        painter.setPen(Qt.white)
+        painter.drawText(option.rect, Qt.AlignCenter, index.data(Qt.DisplayRole))
+        painter.restore()
+
+
+class TaskStrip(QWidget):
+    """Scrolling task bar with jump-to-task search and a state filter"""
+
+    task_selected = pyqtSignal(int)
+
+    def __init__(self, states, parent=None):
+        super().__init__(parent)
+        self.model = TaskListModel(states, self)
+        self.proxy = TaskFilterModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.delegate = TaskDelegate(self)
+
+        self.view = QListView()
+        self.view.setModel(self.proxy)
+        self.view.setItemDelegate(self.delegate)
+        self.view.setFlow(QListView.LeftToRight)
+        self.view.setWrapping(False)
+        self.view.setUniformItemSizes(True)  # Layout never asks each item for its size
+        self.view.setSpacing(1)
+        self.view.setSelectionMode(QListView.NoSelection)
+        self.view.setFocusPolicy(Qt.NoFocus)
+        self.view.setMouseTracking(True)  # For the hover colour
+        self.view.setFrameShape(QFrame.NoFrame)
+        self.view.setHorizontalScrollMode(QListView.ScrollPerPixel)
+        self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.view.setStyleSheet(VIEW_STYLE)
+        self.view.clicked.connect(lambda index: self.task_selected.emit(index.data(TASK_ROLE)))
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText('Go to task / search')
+        self.search.setFixedWidth(140)
+        self.search.setClearButtonEnabled(True)
+        self.search.textChanged.connect(lambda text: self.apply_filter())
+        self.search.returnPressed.connect(self.on_search_entered)
+
+        self.filter_combo = QComboBox()
+        for label, state in FILTERS:
+            self.filter_combo.addItem(label, state)
+        self.filter_combo.currentIndexChanged.connect(lambda index: self.apply_filter())
+
+        for control in (self.search, self.filter_combo):
+            control.setStyleSheet(CONTROL_STYLE)
+            control.setFixedHeight(24)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+        layout.addWidget(self.view, 1)
+        layout.addWidget(self.search)
+        layout.addWidget(self.filter_combo)
+        self.set_item_size(self.delegate.size.width(), self.delegate.size.height())
+
+    def set_item_size(self, width, height):
+        self.delegate.size = QSize(width, height)
+        self.view.setFixedHeight(height + 8)  # Room for the thin scroll bar
+        self.view.doItemsLayout()
+
+    def set_texts(self, texts):
+        """Text to search per task, e.g. its description and required actions"""
+        self.model.texts = dict((task, text.lower()) for task, text in texts.items())
+        self.apply_filter()
+
+    def set_current(self, task):
+        self.model.set_current(task)
+        index = self.proxy.mapFromSource(self.model.index(task - 1))
+        if index.isValid():
+            self.view.scrollTo(index)
+
+    def apply_filter(self):
+        text = self.search.text().strip()
+        words = [] if text.isdigit() else text.lower().split()
+        self.proxy.set_filter(self.filter_combo.currentData(), words)
+
+    def on_search_entered(self):
+        """Go to the task typed, or to the first task that matches the search"""
+        text = self.search.text().strip()
+        if text.isdigit():
+            if int(text) in self.model.states:
+                self.task_selected.emit(int(text))
+                self.search.clear()
+        elif self.proxy.rowCount():
+            self.task_selected.emit(self.proxy.index(0, 0).data(TASK_ROLE))
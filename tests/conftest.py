@@ -0,0 +1,45 @@
+import os
+import shutil
+import sys
+import zipfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+EXAM_DOC = os.path.join(ROOT, '2019_WE_101_Houseboating.docx')
+REQUIREMENTS = os.path.join(ROOT, 'Project1_Requirements.xlsx')
+
+
+@pytest.fixture
+def exam_doc(tmp_path):
+    """A copy of the pristine exam document"""
+    path = str(tmp_path / 'exam.docx')
+    shutil.copyfile(EXAM_DOC, path)
+    return path
+
+
+@pytest.fixture
+def edited_doc(tmp_path):
+    """edited_doc(name, {part: (old, new)}) writes a copy of the exam document with replacements"""
+    def edit(name, replacements):
+        path = str(tmp_path / name)
+        with zipfile.ZipFile(EXAM_DOC) as source, \
+                zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                data = source.read(info)
+                if info.filename in replacements:
+                    old, new = replacements[info.filename]
+                    assert old in data
+                    data = data.replace(old, new, 1)
+                target.writestr(info, data)
+        return path
+    return edit
+
+
+@pytest.fixture
+def task_records():
+    """Task records of the exam's requirements workbook, parsed without the cache"""
+    from task_loader import load_task_records
+    return load_task_records(REQUIREMENTS, use_cache=False)
@@ -0,0 +1,150 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from batch_grade import Report, find_submissions, run
+
+
+def touch(root, *parts):
+    path = os.path.join(root, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as target:
+        target.write('{}')
+    return path
+
+
+def test_candidate_is_the_folder_holding_completed_tasks(tmp_path):
+    root = str(tmp_path)
+    touch(root, 'class_a', 'alice', 'Completed_Tasks', 'Task_1', 'Task_1_20240101_090000.json')
+    touch(root, 'bob', 'Completed_Tasks', 'Task_3', 'Task_3_20240101_090000.docx')
+
+    found = sorted(find_submissions(root))
+
+    assert found == [
+        ('bob/Completed_Tasks/Task_3/Task_3_20240101_090000.docx', 'bob', 3),
+        ('class_a/alice/Completed_Tasks/Task_1/Task_1_20240101_090000.json',
+         'class_a/alice', 1),
+    ]
+
+
+def test_root_is_a_completed_tasks_folder(tmp_path):
+    root = str(tmp_path / 'Completed_Tasks')
+    touch(root, 'Task_2', 'Task_2_20240101_090000.json')
+
+    assert list(find_submissions(root)) == [
+        ('Task_2/Task_2_20240101_090000.json', '.', 2)]
+
+
+def test_skips_hidden_folders_and_lock_files(tmp_path):
+    root = str(tmp_path)
+    touch(root, 'alice', 'Completed_Tasks', '.store', 'Task_1', 'working.docx')
+    touch(root, 'alice', 'Completed_Tasks', 'Task_1', '~$Task_1.docx')
+    touch(root, 'alice', 'Completed_Tasks', 'Task_1', 'Task_1_20240101_090000.json')
+
+    assert [candidate for _, candidate, _ in find_submissions(root)] == ['alice']
+
+
+def test_latest_keeps_the_newest_save_per_task(tmp_path):
+    root = str(tmp_path)
+    older = touch(root, 'alice', 'Completed_Tasks', 'Task_1', 'Task_1_20240101_090000.json')
+    touch(root, 'alice', 'Completed_Tasks', 'Task_1', 'Task_1_20240101_100000.json')
+    os.utime(older, (1, 1))
+
+    assert [path for path, _, _ in find_submissions(root, latest=True)] == [
+        'alice/Completed_Tasks/Task_1/Task_1_20240101_100000.json']
+
+
+def row(path, passed=True, error=''):
+    return {'file': path, 'candidate': 'alice', 'task': 1, 'saved_at': '', 'passed': passed,
+            'status': 'pass' if passed else 'fail', 'failed_actions': [],
+            'unsupported_actions': [], 'changes': [], 'error': error, 'seconds': 0.1}
+
+
+@pytest.mark.parametrize('name', ['report.csv', 'report.jsonl'])
+def test_report_resumes_from_its_rows(tmp_path, name):
+    path = str(tmp_path / name)
+    report = Report(path)
+    report.write(row('a.json'))
+    report.write(row('b.json', passed=False))
+    report.close()
+
+    resumed = Report(path)
+    assert resumed.done == {'a.json', 'b.json'}
+    resumed.write(row('c.json'))
+    resumed.close()
+    assert Report(path).done == {'a.json', 'b.json', 'c.json'}
+    assert Report(path, restart=True).done == set()
+
+
+@pytest.mark.parametrize('name', ['report.csv', 'report.jsonl'])
+def test_report_drops_a_cut_off_last_line(tmp_path, name):
+    path = str(tmp_path / name)
+    report = Report(path)
+    report.write(row('a.json'))
+    report.close()
+    with open(path, 'a', encoding='utf-8') as out:
+        out.write('b.json,ali')
+
+    resumed = Report(path)
+    assert resumed.done == {'a.json'}
+    resumed.close()
+    with open(path, encoding='utf-8') as source:
+        assert source.read().endswith('\n')
+
+
+def test_report_resumes_a_csv_row_spanning_lines(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    report = Report(path)
+    report.write(row('a.json', error='Bad zip\nfile\u2028here'))
+    report.write(row('b.json'))
+    report.close()
+
+    assert Report(path).done == {'a.json', 'b.json'}
+
+
+def test_report_drops_a_cut_off_quoted_csv_record(tmp_path):
+    path = str(tmp_path / 'report.csv')
+    report = Report(path)
+    report.write(row('a.json'))
+    report.close()
+    with open(path, encoding='utf-8') as source:
+        complete = source.read()
+    with open(path, 'a', encoding='utf-8', newline='') as out:
+        out.write('b.json,alice,1,,False,fail,[],[],[],"Bad zip\n')
+
+    resumed = Report(path)
+    assert resumed.done == {'a.json'}
+    resumed.close()
+    with open(path, encoding='utf-8') as source:
+        assert source.read() == complete
+
+
+def test_report_refuses_csv_columns_of_another_version(tmp_path):
+    path = tmp_path / 'report.csv'
+    path.write_text('file,candidate,passed\na.json,alice,True\n', encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        Report(str(path))
+    assert Report(str(path), restart=True).done == set()
+
+
+def test_run_grades_only_what_the_report_lacks(tmp_path, exam_doc, task_records):
+    root = str(tmp_path / 'submissions')
+    for candidate in ('alice', 'bob'):
+        folder = os.path.join(root, candidate, 'Completed_Tasks', 'Task_2')
+        os.makedirs(folder)
+        shutil.copyfile(exam_doc, os.path.join(folder, 'Task_2_20240101_090000.docx'))
+    path = str(tmp_path / 'report.jsonl')
+
+    report = Report(path)
+    report.write(dict(row('alice/Completed_Tasks/Task_2/Task_2_20240101_090000.docx')))
+    assert run(root, report, task_records, workers=1)[0] == 1
+    report.close()
+
+    with open(path, encoding='utf-8') as source:
+        rows = [json.loads(line) for line in source]
+    assert [(r['candidate'], r['task'], r['error']) for r in rows][1:] == [('bob', 2, '')]
+    assert rows[1]['passed'] is False
+    assert rows[1]['status'] == 'fail'
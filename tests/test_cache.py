@@ -0,0 +1,50 @@
+import types
+
+from grading import Grader, ResultCache
+
+
+TASKS = [
+    types.SimpleNamespace(task_id=1, description='Format "Types of Lodging"',
+                          required_actions=['Apply Heading 1 style', 'Apply bold']),
+    types.SimpleNamespace(task_id=2, description='Number the pages',
+                          required_actions=['Add page numbers']),
+]
+
+
+def outcomes(results):
+    return dict((task_id, [(action.passed, action.detail) for action in result.actions])
+                for task_id, result in results.items())
+
+
+def test_cached_outcomes_match_a_full_grade(tmp_path, exam_doc):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    expected = outcomes(Grader(TASKS).grade(exam_doc))
+
+    assert outcomes(Grader(TASKS, cache=cache).grade(exam_doc)) == expected
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert outcomes(Grader(TASKS, cache=cache).grade(exam_doc)) == expected
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_body_edit_only_regrades_body_rules(tmp_path, exam_doc, edited_doc):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    Grader(TASKS, cache=cache).grade(exam_doc)
+    submission = edited_doc('renamed.docx', {
+        'word/document.xml': (b'Types of Lodging', b'Kinds of Lodging')})
+
+    results = Grader(TASKS, cache=cache).grade(submission)
+
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert results[1].actions[0].detail.startswith('target not found')
+    assert results[2].passed
+
+
+def test_unreadable_entry_is_a_miss(tmp_path, exam_doc):
+    cache = ResultCache(str(tmp_path / 'cache'))
+    grader = Grader(TASKS, cache=cache)
+    grader.grade(exam_doc)
+    for path in (tmp_path / 'cache').rglob('*.json'):
+        path.write_text('{not json')
+
+    assert outcomes(grader.grade(exam_doc)) == outcomes(Grader(TASKS).grade(exam_doc))
+    assert cache.hits == 0
@@ -0,0 +1,43 @@
+import os
+import shutil
+
+from catalog import Catalog
+
+REQUIREMENTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'Project1_Requirements.xlsx')
+
+
+def add_project(root, *folders):
+    folder = os.path.join(str(root), *folders)
+    os.makedirs(folder, exist_ok=True)
+    shutil.copyfile(REQUIREMENTS, os.path.join(folder, 'Project1_Requirements.xlsx'))
+    return folder
+
+
+def test_refresh_finds_nested_projects_but_not_saves(tmp_path):
+    add_project(tmp_path)
+    add_project(tmp_path, 'mo200')
+    add_project(tmp_path, 'Completed_Tasks')
+
+    catalog = Catalog(str(tmp_path))
+    assert catalog.refresh() == 2
+    assert sorted(project.id for project in catalog.projects()) == ['Project1', 'mo200/Project1']
+    assert catalog.get('mo200/Project1').task_count == 10
+
+
+def test_unchanged_folders_are_not_listed_again(tmp_path):
+    add_project(tmp_path, 'a')
+    add_project(tmp_path, 'b', 'deep')
+    # The first refresh writes task caches next to the workbooks, touching their folders
+    Catalog(str(tmp_path)).refresh()
+    Catalog(str(tmp_path)).refresh()
+
+    catalog = Catalog(str(tmp_path))
+    assert catalog.refresh() == 0
+    assert catalog.listed == 0
+
+    add_project(tmp_path, 'b', 'deep', 'new')
+    catalog = Catalog(str(tmp_path))
+    assert catalog.refresh() == 1
+    assert catalog.listed == 2     # b/deep, whose mtime changed, and the new folder
+    assert len(catalog.projects()) == 3
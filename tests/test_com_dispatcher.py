@@ -0,0 +1,72 @@
+import shutil
+import threading
+
+import pytest
+
+import com_dispatcher
+from com_dispatcher import DispatchedBackend, Dispatcher, DispatchTimeout
+from fake_word import RPC_E_CALL_REJECTED, FakeComError, FakeWordBackend
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(com_dispatcher, 'RETRY_DELAY', 0.0)
+
+
+def test_adjacent_commands_with_a_key_run_once():
+    dispatcher = Dispatcher()
+    gate = threading.Event()
+    dispatcher.submit(gate.wait, 5)
+    runs = []
+    futures = [dispatcher.submit(runs.append, number, key='activate') for number in range(5)]
+    gate.set()
+
+    assert [future.result(5) for future in futures] == [None] * 5
+    dispatcher.stop(5)
+    assert runs == [4]
+    assert dispatcher.batched == 4
+
+
+def test_busy_calls_are_retried():
+    dispatcher = Dispatcher()
+    rejections = [FakeComError(RPC_E_CALL_REJECTED, "Call was rejected by callee.")] * 2
+
+    def flaky():
+        if rejections:
+            raise rejections.pop()
+        return 'done'
+
+    assert dispatcher.call(flaky, retries=4) == 'done'
+    assert dispatcher.retried == 2
+    rejections.extend([FakeComError(RPC_E_CALL_REJECTED, "Call was rejected by callee.")] * 2)
+    with pytest.raises(FakeComError):
+        dispatcher.call(flaky, retries=1)
+    dispatcher.stop(5)
+
+
+def test_hung_call_times_out():
+    dispatcher = Dispatcher()
+    gate = threading.Event()
+
+    with pytest.raises(DispatchTimeout):
+        dispatcher.call(gate.wait, 5, timeout=0.05)
+    gate.set()
+    assert dispatcher.call(lambda: 'next') == 'next'
+    dispatcher.stop(5)
+    assert dispatcher.timeouts == 1
+
+
+def test_fake_word_is_only_touched_from_the_worker(tmp_path, exam_doc):
+    path = str(tmp_path / 'task1.docx')
+    shutil.copyfile(exam_doc, path)
+    backend = DispatchedBackend(FakeWordBackend(busy_rate=0.3, seed=1))
+    backend.start()
+
+    doc = backend.open(path)
+    assert backend.is_saved(doc)
+    doc.edit()
+    assert not backend.is_saved(doc)
+    backend.save_as(doc, str(tmp_path / 'saved.docx'))
+    backend.close(doc)
+    backend.quit()
+    assert (tmp_path / 'saved.docx').exists()
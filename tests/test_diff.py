@@ -0,0 +1,84 @@
+import types
+
+from grading import diff_documents
+from grading.diff import DELETED, INSERTED, MODIFIED, align
+
+
+def test_align_keeps_common_blocks_and_pairs_the_gaps():
+    assert align('abcd', 'abxd') == [(0, 0), (1, 1), (2, 2), (3, 3)]
+    assert align('abc', 'abxc') == [(0, 0), (1, 1), (None, 2), (2, 3)]
+    assert align('abc', 'ac') == [(0, 0), (1, None), (2, 1)]
+
+
+def test_align_anchors_on_unique_blocks():
+    # 'c' moves to the front: the unique 'b' and 'd' stay matched
+    pairs = align('abcd', 'cabd')
+    assert (1, 2) in pairs and (3, 3) in pairs
+
+
+def test_untouched_document_has_no_changes(exam_doc, edited_doc):
+    # Rewritten by zipfile, like a save that changed nothing
+    copy = edited_doc('copy.docx', {})
+    diff = diff_documents(exam_doc, copy)
+    assert diff.unchanged
+    assert list(diff.changed_paragraphs()) == []
+
+
+def test_edited_paragraph_is_modified(exam_doc, edited_doc):
+    submission = edited_doc('edited.docx', {
+        'word/document.xml': (b'Types of Lodging', b'Kinds of Lodging')})
+    diff = diff_documents(exam_doc, submission)
+    assert [change.kind for change in diff.changes] == [MODIFIED]
+    assert diff.changes[0].describe() == 'Paragraph 4: text changed "Kinds of Lodging"'
+
+
+def test_formatting_change_is_reported_as_formatting(exam_doc, edited_doc):
+    submission = edited_doc('bold.docx', {
+        'word/document.xml': (b'<w:r><w:t>Contact Us</w:t>',
+                              b'<w:r><w:rPr><w:b/></w:rPr><w:t>Contact Us</w:t>')})
+    diff = diff_documents(exam_doc, submission)
+    assert [change.describe() for change in diff.changes] == [
+        'Paragraph 26: formatting changed "Contact Us"']
+    assert diff.changes[0].changed_parts == [0]
+
+
+def test_save_noise_is_ignored(exam_doc, edited_doc):
+    submission = edited_doc('noise.docx', {
+        'word/document.xml': (b'<w:r><w:t>Contact Us</w:t>',
+                              b'<w:proofErr w:type="spellStart"/><w:r><w:t>Contact Us</w:t>')})
+    assert diff_documents(exam_doc, submission).unchanged
+
+
+def test_regions_follow_the_task_locator(exam_doc, edited_doc):
+    submission = edited_doc('edited.docx', {
+        'word/document.xml': (b'Types of Lodging', b'Types of Lodging!')})
+    diff = diff_documents(exam_doc, submission)
+    tasks = [types.SimpleNamespace(task_id=1, description='Format "Types of Lodging"'),
+             types.SimpleNamespace(task_id=2, description='Format "Contact Us"'),
+             types.SimpleNamespace(task_id=3, description='Format "Executive Summary"')]
+    regions = diff.regions(tasks)
+    assert [change.kind for change in regions[1]] == [MODIFIED]
+    assert regions[2] == [] and regions[3] == []
+
+
+def test_inserted_paragraph(exam_doc, edited_doc):
+    submission = edited_doc('inserted.docx', {
+        'word/document.xml': (b'<w:p w14:paraId="3CDB0C5A"',
+                              b'<w:p><w:r><w:t>Call us</w:t></w:r></w:p>'
+                              b'<w:p w14:paraId="3CDB0C5A"')})
+    changes = diff_documents(exam_doc, submission).changes
+    assert [(change.kind, change.submission.text) for change in changes] == [
+        (INSERTED, 'Call us')]
+    assert DELETED not in [change.kind for change in changes]
+
+
+def test_closing_section_properties_are_a_block(exam_doc, edited_doc):
+    submission = edited_doc('title_page.docx', {
+        'word/document.xml': (b'<w:sectPr w:rsidR="00E33EBC" w:rsidSect="00E97BC0">',
+                              b'<w:sectPr w:rsidR="00E33EBC" w:rsidSect="00E97BC0">'
+                              b'<w:titlePg/>')})
+    diff = diff_documents(exam_doc, submission)
+    assert [change.element for change in diff.changes] == ['section']
+    assert diff.changes[0].submission.index == len(diff.submission_blocks) - 1
+    assert diff.changes[0].describe() == 'Section %d: formatting changed' % len(
+        diff.submission_blocks)
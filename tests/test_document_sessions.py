@@ -0,0 +1,130 @@
+import os
+import shutil
+import threading
+
+from backends import LocalBackend
+from document_sessions import DocumentSessions, Prefetcher, likely_next
+
+
+class GatedBackend(LocalBackend):
+    """Prefetch opens wait until the test releases them"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.prefetched = []
+
+    def prefetch(self, editor, path):
+        self.started.set()
+        self.release.wait(5)
+        self.prefetched.append(path)
+        return super().prefetch(editor, path)
+
+
+def copies(tmp_path, exam_doc, count):
+    paths = []
+    for number in range(count):
+        paths.append(str(tmp_path / f'task{number + 1}.docx'))
+        shutil.copyfile(exam_doc, paths[-1])
+    return paths
+
+
+def test_likely_next_prefers_earlier_followers():
+    assert likely_next(3, [], 10) == [4, 2]
+    assert likely_next(3, [3, 7, 3], 10) == [7, 4]
+    assert likely_next(10, [], 10) == [9]
+
+
+def test_switching_back_reuses_the_open_document(tmp_path, exam_doc):
+    first, second = copies(tmp_path, exam_doc, 2)
+    sessions = DocumentSessions(LocalBackend(), limit=4)
+    doc = sessions.switch(first)
+    sessions.switch(second)
+    assert sessions.switch(first) is doc
+    assert sessions.opens == 2
+
+
+def test_unsaved_documents_are_not_evicted(tmp_path, exam_doc):
+    paths = copies(tmp_path, exam_doc, 3)
+    sessions = DocumentSessions(LocalBackend(), limit=2)
+    sessions.switch(paths[0]).replace_part('word/extra.xml', b'edit')
+    sessions.switch(paths[1])
+    sessions.switch(paths[2])
+    assert paths[0] in sessions and paths[1] not in sessions
+    assert sessions.dirty_paths() == [os.path.normcase(os.path.abspath(paths[0]))]
+
+
+def test_evicted_document_reopens_from_its_working_copy(tmp_path, exam_doc):
+    paths = copies(tmp_path, exam_doc, 3)
+    backend = LocalBackend()
+    sessions = DocumentSessions(backend, limit=2)
+    doc = sessions.switch(paths[0])
+    doc.replace_part('word/extra.xml', b'edit')
+    working_copy = str(tmp_path / 'working.docx')
+    backend.save_as(doc, working_copy)     # as the autosaver does
+    sessions.switch(paths[1])
+    sessions.switch(paths[2])
+    assert paths[0] not in sessions and sessions.evicted == 1
+
+    reopened = sessions.switch(paths[0])
+    assert reopened.path == os.path.normcase(os.path.abspath(working_copy))
+    assert reopened.read_part('word/extra.xml') == b'edit'
+
+
+def test_take_waits_for_the_document_being_opened(tmp_path, exam_doc):
+    path, = copies(tmp_path, exam_doc, 1)
+    backend = GatedBackend()
+    prefetcher = Prefetcher(backend)
+    prefetcher.request([path])
+    assert backend.started.wait(5)
+    threading.Timer(0.05, backend.release.set).start()
+
+    ready = prefetcher.take(path)
+    prefetcher.stop(5)
+    assert [key for key, _ in ready] == [path]
+
+
+def test_take_gives_up_on_a_hung_open(tmp_path, exam_doc):
+    path, = copies(tmp_path, exam_doc, 1)
+    backend = GatedBackend()
+    prefetcher = Prefetcher(backend)
+    prefetcher.request([path])
+    assert backend.started.wait(5)
+
+    assert prefetcher.take(path, timeout=0.05) == []    # the caller opens it directly
+    backend.release.set()
+    prefetcher.cancel()
+    assert [key for key, _ in prefetcher.take()] == [path]
+    prefetcher.stop(5)
+
+
+def test_take_drops_a_document_that_is_only_queued(tmp_path, exam_doc):
+    first, second = copies(tmp_path, exam_doc, 2)
+    backend = GatedBackend()
+    prefetcher = Prefetcher(backend)
+    prefetcher.request([first, second])
+    assert backend.started.wait(5)
+
+    assert prefetcher.take(second) == []    # the caller opens it directly
+    backend.release.set()
+    prefetcher.cancel()
+    assert [key for key, _ in prefetcher.take()] == [first]
+    prefetcher.stop(5)
+    assert backend.prefetched == [first]
+
+
+def test_switch_adopts_the_prefetched_document(tmp_path, exam_doc):
+    first, second = copies(tmp_path, exam_doc, 2)
+    backend = GatedBackend()
+    sessions = DocumentSessions(backend, limit=4)
+    sessions.switch(first)
+    sessions.start_prefetch()
+    sessions.prefetch([second])
+    assert backend.started.wait(5)
+    backend.release.set()
+
+    doc = sessions.switch(second)
+    sessions.shutdown()
+    assert (sessions.opens, sessions.prefetched) == (1, 1)
+    assert doc.path == os.path.normcase(os.path.abspath(second))
@@ -0,0 +1,63 @@
+from exam_timer import ExamTimer, configured_limit, format_elapsed
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_elapsed_follows_the_clock_not_the_polls():
+    clock = Clock()
+    timer = ExamTimer(clock)
+    timer.start()
+    clock.now += 2.5
+    assert timer.poll() == 2
+    assert timer.poll() is None     # same second, nothing to repaint
+    clock.now += 60
+    assert timer.poll() == 62
+    assert format_elapsed(timer.elapsed) == '00:01:02'
+
+
+def test_pause_stops_the_clock_and_the_task():
+    clock = Clock()
+    timer = ExamTimer(clock)
+    timer.start(task=1)
+    clock.now += 10
+    timer.switch_task(2)
+    clock.now += 5
+    timer.pause()
+    clock.now += 100
+    timer.resume()
+    clock.now += 1
+
+    assert timer.elapsed == 16
+    assert timer.task_seconds() == {1: 10, 2: 6}
+
+
+def test_limits_fire_once_and_reset_restores_time():
+    clock = Clock()
+    timer = ExamTimer(clock)
+    fired = []
+    timer.add_limit(30, fired.append)
+    timer.start()
+    clock.now += 31
+    timer.poll()
+    timer.poll()
+    assert fired == [31]
+    assert timer.remaining() == 0
+
+    timer.reset(elapsed=40, task_seconds={3: 40})
+    assert not timer.running
+    assert timer.task_seconds(3) == 40
+    timer.poll()
+    assert fired == [31]     # already past the limit when restored
+
+
+def test_configured_limit(monkeypatch):
+    monkeypatch.setenv('MOS_EXAM_MINUTES', '50')
+    assert configured_limit() == 3000
+    monkeypatch.setenv('MOS_EXAM_MINUTES', 'soon')
+    assert configured_limit() is None
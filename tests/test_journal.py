@@ -0,0 +1,81 @@
+import json
+
+from journal import Journal, read_events, replay
+
+
+def start(journal, count=5):
+    journal.record('start', durable=True, project='p1', count=count)
+
+
+def test_replay_folds_events(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    journal = Journal(path)
+    start(journal)
+    journal.record('navigate', task=3)
+    journal.record('mark', durable=True, task=3, state='complete')
+    journal.record('tick', seconds=42, task_seconds={'3': 40})
+    journal.record('save', durable=True, source='Task.docx', manifest='Task_3.json')
+    journal.sync()
+
+    state = replay(path)
+    assert state['project'] == 'p1'
+    assert state['current_task'] == 3
+    assert state['session']['states'] == '00100'
+    assert (state['seconds'], state['task_seconds']) == (42, {'3': 40})
+    assert state['saves'] == {'Task.docx': 'Task_3.json'}
+    assert Journal(path).resumable
+
+
+def test_events_are_batched_until_durable(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    journal = Journal(path, flush_events=10, flush_interval=3600)
+    start(journal)
+    journal.record('navigate', task=2)
+    assert len(read_events(path)) == 1
+    journal.record('mark', durable=True, task=2, state='review')
+    assert len(read_events(path)) == 3
+
+
+def test_compaction_keeps_the_state(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    journal = Journal(path, compact_events=10)
+    start(journal)
+    for task in range(1, 5):
+        journal.record('navigate', task=task)
+        journal.record('mark', task=task, state='complete')
+    journal.record('navigate', task=2)
+    journal.sync()
+
+    events = read_events(path)
+    assert len(events) < 10
+    assert events[0]['kind'] == 'snapshot'
+    state = replay(path)
+    assert state == journal.state
+    assert state['session']['states'] == '11110'
+    assert state['current_task'] == 2
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    journal = Journal(path)
+    start(journal)
+    journal.record('navigate', durable=True, task=4)
+    with open(path, 'a', encoding='utf-8') as out:
+        out.write(json.dumps({'kind': 'navigate', 'task': 5, 't': 0})[:-3])
+
+    assert replay(path)['current_task'] == 4
+    reopened = Journal(path)
+    assert reopened.state['current_task'] == 4
+    assert len(read_events(path)) == 1
+
+
+def test_closed_journal_ignores_late_events(tmp_path):
+    path = str(tmp_path / 'session.journal')
+    journal = Journal(path)
+    start(journal)
+    journal.close()
+    journal.record('save', durable=True, source='Task.docx', manifest='late.json')
+
+    state = replay(path)
+    assert state['ended'] and state['saves'] == {}
+    assert not Journal(path).resumable
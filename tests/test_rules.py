@@ -0,0 +1,136 @@
+import types
+
+from grading import (FAIL, UNSUPPORTED, DocxPackage, Grader, Locator, WordDocument,
+                     compile_action, diff_packages, walk_document)
+
+LAKE_LODGING = (b'<w:pStyle w:val="Title"/></w:pPr><w:r><w:rPr><w:noProof/>',
+                b'<w:pStyle w:val="Heading1"/></w:pPr><w:r><w:rPr><w:noProof/>')
+WIDER_IMAGE = (b'<wp:extent cx="3200400"', b'<wp:extent cx="3657600"')
+FIRST_LIST_ITEM = (b'<w:pPr><w:numPr><w:ilvl w:val="0"/><w:numId w:val="38"/>',
+                   b'<w:pPr><w:pStyle w:val="Heading2"/><w:numPr><w:ilvl w:val="0"/>'
+                   b'<w:numId w:val="38"/>')
+
+
+def task(task_id, description, *actions):
+    return types.SimpleNamespace(task_id=task_id, description=description,
+                                 required_actions=list(actions), file_name='exam.docx')
+
+
+def test_quoted_text_is_the_only_target():
+    locator = Locator.from_description('Format the "EXECUTIVE SUMMARY" heading as a title')
+    assert locator.alternatives == [('text', 'executive summary')]
+
+
+def test_structure_words_locate_without_quotes():
+    locator = Locator.from_description('Apply heading styles and format the list')
+    assert locator.alternatives == [('is_heading', True), ('listed', True)]
+
+
+def test_description_without_a_target_locates_nothing():
+    assert Locator.from_description('Apply appropriate formatting').alternatives == []
+
+
+def test_action_patterns():
+    assert compile_action('Apply Heading 1 style').predicate.expected == 'heading 1'
+    assert compile_action('Set font size to 14pt').predicate.expected == 28
+    assert not compile_action('Make it look nice').supported
+
+
+def test_rule_passes_on_the_located_paragraph(exam_doc, edited_doc):
+    submission = edited_doc('heading.docx', {'word/document.xml': LAKE_LODGING})
+    result = Grader([task(1, 'Format "Lake Lodging"', 'Apply Heading 1 style')],
+                    original=exam_doc).grade(submission)[1]
+    assert result.passed
+    assert result.actions[0].detail == 'Lake Lodging'
+
+
+def test_located_paragraph_left_as_it_was_earns_no_credit(exam_doc):
+    result = Grader([task(1, 'Format "Types of Lodging"', 'Apply Heading 1 style')],
+                    original=exam_doc).grade(exam_doc)[1]
+    assert not result.passed
+    assert result.actions[0].detail == 'already in the original: Types of Lodging'
+
+
+def test_structural_locator_credits_only_changed_paragraphs(exam_doc, edited_doc):
+    # The heading locator selects headings, so only a new heading can pass the check
+    grader = Grader([task(1, 'Apply styles to all document headings', 'Apply Heading styles')],
+                    original=exam_doc)
+    assert not grader.grade(exam_doc)[1].passed
+
+    submission = edited_doc('list.docx', {'word/document.xml': FIRST_LIST_ITEM})
+    result = grader.grade(submission)[1]
+    assert result.passed
+    assert result.actions[0].detail == 'Camping'
+
+
+def test_changed_items_are_the_edited_blocks(exam_doc, edited_doc):
+    submission = edited_doc('heading.docx', {'word/document.xml': LAKE_LODGING})
+    with DocxPackage(exam_doc) as original, DocxPackage(submission) as package:
+        changed = diff_packages(original, package).changed_items()
+        texts = [item.text for _, element, item in walk_document(WordDocument(package))
+                 if element == 'paragraph' and item in changed]
+    assert texts == ['Lake Lodging']
+
+
+def test_pristine_document_fails_every_located_rule(exam_doc, task_records):
+    tasks = [types.SimpleNamespace(**record) for record in task_records]
+    grader = Grader(tasks, original=exam_doc)
+    results = grader.grade(exam_doc)
+    for compiled in grader.index.tasks:
+        for rule, action in zip(compiled.rules, results[compiled.task_id].actions):
+            if rule.locator is not None:
+                assert not action.passed, action
+
+
+def test_rule_only_sees_the_located_paragraph(exam_doc):
+    # "Lake Lodging" is the title; other paragraphs being Heading 1 does not count
+    result = Grader([task(1, 'Format "Lake Lodging"', 'Apply Heading 1 style')]
+                    ).grade(exam_doc)[1]
+    assert not result.passed
+
+
+def test_missing_quoted_target_fails(exam_doc):
+    result = Grader([task(1, 'Format the "EXECUTIVE SUMMARY" heading',
+                          'Apply Heading 1 style')]).grade(exam_doc)[1]
+    assert not result.passed
+    assert result.failed_actions == ['Apply Heading 1 style']
+    assert result.actions[0].detail == "target not found: 'executive summary'"
+
+
+def test_task_without_a_target_is_not_gradable(exam_doc):
+    result = Grader([task(1, 'Format the contact information', 'Left align')]
+                    ).grade(exam_doc)[1]
+    assert result.unsupported_actions == ['Left align']
+    assert result.status == UNSUPPORTED
+    assert not result.passed
+
+
+def test_unsupported_action_keeps_the_task_from_passing(exam_doc, edited_doc):
+    submission = edited_doc('heading.docx', {'word/document.xml': LAKE_LODGING})
+    result = Grader([task(1, 'Format "Lake Lodging"', 'Apply Heading 1 style',
+                          'Make it look nice')], original=exam_doc).grade(submission)[1]
+    assert result.failed_actions == []
+    assert result.status == UNSUPPORTED
+    assert not result.passed
+
+
+def test_unlocated_rules_read_the_whole_document(exam_doc):
+    # Without an original every item counts as the candidate's
+    result = Grader([task(1, 'Insert the pricing image', 'Insert image',
+                          'Set width to 3.5 inches')]).grade(exam_doc)[1]
+    assert result.passed
+
+
+def test_resizing_the_exam_image_is_not_an_insert(exam_doc, edited_doc):
+    submission = edited_doc('wider.docx', {'word/document.xml': WIDER_IMAGE})
+    result = Grader([task(1, 'Insert the pricing image', 'Insert image',
+                          'Set width to 4 inches')], original=exam_doc).grade(submission)[1]
+    assert [action.passed for action in result.actions] == [False, True]
+    assert result.actions[0].detail == 'none added to the 1 in the original'
+
+
+def test_pristine_document_fails_every_gradable_task(exam_doc, task_records):
+    tasks = [types.SimpleNamespace(**record) for record in task_records]
+    for task_id, result in Grader(tasks, original=exam_doc).grade(exam_doc).items():
+        graded = [action for action in result.actions if action.supported]
+        assert result.status == (FAIL if graded else UNSUPPORTED), result.actions
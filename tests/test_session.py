@@ -0,0 +1,52 @@
+import pytest
+
+from session import SessionState
+
+
+def test_totals_follow_transitions():
+    states = SessionState(4)
+    states[1] = 'complete'
+    states[2] = 'complete'
+    states[3] = 'review'
+
+    assert states.completed == 2 and states.for_review == 1
+    assert states.total('incomplete') == 1
+    assert states.progress == 50
+    assert not states.all_complete
+    assert states.set(1, 'complete') is False
+    assert len(states.events) == 3
+
+
+def test_listeners_see_each_change_and_resets():
+    states = SessionState(3)
+    seen = []
+    listener = states.subscribe(lambda *change: seen.append(change))
+    states[2] = 'review'
+    states.reset()
+    states.unsubscribe(listener)
+    states[1] = 'complete'
+
+    assert seen == [(2, 'incomplete', 'review'), (None, None, None)]
+    assert states.values() == ['complete', 'incomplete', 'incomplete']
+
+
+def test_unknown_task_raises_key_error():
+    states = SessionState(2)
+    with pytest.raises(KeyError):
+        states[3]
+    with pytest.raises(KeyError):
+        states.set(0, 'complete')
+
+
+def test_snapshot_round_trips():
+    states = SessionState(3)
+    states[1] = 'complete'
+    states[3] = 'review'
+
+    restored = SessionState(0)
+    restored.restore(states.snapshot())
+    assert restored.items() == [(1, 'complete'), (2, 'incomplete'), (3, 'review')]
+    assert (restored.completed, restored.for_review) == (1, 1)
+    assert restored.events == states.events
+    with pytest.raises(ValueError):
+        restored.restore({'version': 0, 'states': '', 'events': []})
@@ -0,0 +1,51 @@
+import json
+import zipfile
+
+from storage import ManifestParts, PartStore, read_manifest, working_copy_name
+
+
+def test_materialize_round_trips_every_part(tmp_path, exam_doc):
+    store = PartStore(str(tmp_path / '.store'))
+    manifest_path = str(tmp_path / 'Task_1.json')
+    store.ingest(exam_doc, manifest_path, task=1)
+    rebuilt = str(tmp_path / 'rebuilt.docx')
+    store.materialize(manifest_path, rebuilt)
+
+    with zipfile.ZipFile(exam_doc) as original, zipfile.ZipFile(rebuilt) as copy:
+        assert copy.namelist() == original.namelist()
+        for before, after in zip(original.infolist(), copy.infolist()):
+            assert copy.read(after) == original.read(before)
+            assert (after.date_time, after.compress_type, after.extra) == (
+                before.date_time, before.compress_type, before.extra)
+
+
+def test_parts_are_stored_once(tmp_path, exam_doc, edited_doc):
+    store = PartStore(str(tmp_path / '.store'))
+    store.ingest(exam_doc, str(tmp_path / 'first.json'))
+    count, _ = store.stats()
+    store.ingest(exam_doc, str(tmp_path / 'again.json'))
+    assert store.stats()[0] == count
+
+    edited = edited_doc('edited.docx', {
+        'word/document.xml': (b'Types of Lodging', b'Kinds of Lodging')})
+    store.ingest(edited, str(tmp_path / 'edited.json'))
+    assert store.stats()[0] == count + 1
+
+
+def test_manifest_lists_part_digests(tmp_path, exam_doc):
+    store = PartStore(str(tmp_path / '.store'))
+    manifest = store.ingest(exam_doc, str(tmp_path / 'm.json'), task=3, reason='manual')
+
+    assert read_manifest(str(tmp_path / 'm.json')) == json.loads(json.dumps(manifest))
+    assert (manifest['task'], manifest['reason']) == (3, 'manual')
+    parts = ManifestParts(manifest)
+    assert 'word/document.xml' in parts.part_names()
+    assert store.has(parts.part_digest('word/document.xml'))
+    assert parts.part_digest('word/missing.xml') is None
+
+
+def test_working_copy_per_source(tmp_path):
+    first = working_copy_name(str(tmp_path / 'a' / 'Task.docx'))
+    assert first == working_copy_name(str(tmp_path / 'a' / 'Task.docx'))
+    assert first != working_copy_name(str(tmp_path / 'b' / 'Task.docx'))
+    assert first.startswith('working-Task-') and first.endswith('.docx')
@@ -0,0 +1,54 @@
+import zipfile
+
+from task_loader import load_task_records, read_rows
+
+WORKBOOK = (
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Tasks" sheetId="1" r:id="rId1"/></sheets></workbook>')
+RELS = (
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>')
+
+
+def cell(value, reference=None):
+    r = ' r="%s"' % reference if reference else ''
+    if isinstance(value, str):
+        return '<c%s t="inlineStr"><is><t>%s</t></is></c>' % (r, value)
+    return '<c%s><v>%s</v></c>' % (r, value)
+
+
+def workbook(path, rows):
+    sheet = ''.join('<row>%s</row>' % ''.join(row) for row in rows)
+    with zipfile.ZipFile(path, 'w') as target:
+        target.writestr('xl/workbook.xml', WORKBOOK)
+        target.writestr('xl/_rels/workbook.xml.rels', RELS)
+        target.writestr('xl/worksheets/sheet1.xml',
+                        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/'
+                        '2006/main"><sheetData>%s</sheetData></worksheet>' % sheet)
+    return path
+
+
+def test_cells_without_a_reference_follow_the_previous_cell(tmp_path):
+    path = workbook(str(tmp_path / 'tasks.xlsx'), [
+        [cell('TaskID'), cell('Description'), cell('RequiredActions'), cell('FileName')],
+        [cell(1), cell('Bold it', 'B2'), cell('Apply bold; Center align'), cell('a.docx')],
+        [cell(2, 'A3'), cell('Sized', 'C3'), cell('b.docx')],
+    ])
+    assert list(read_rows(path)) == [
+        {'TaskID': 1, 'Description': 'Bold it', 'RequiredActions': 'Apply bold; Center align',
+         'FileName': 'a.docx'},
+        {'TaskID': 2, 'Description': None, 'RequiredActions': 'Sized', 'FileName': 'b.docx'},
+    ]
+
+
+def test_records_are_cached_next_to_the_workbook(tmp_path):
+    path = workbook(str(tmp_path / 'tasks.xlsx'), [
+        [cell('TaskID'), cell('Description'), cell('RequiredActions'), cell('FileName')],
+        [cell(1), cell('Bold it'), cell('Apply bold; Center align'), cell('a.docx')],
+    ])
+    records = load_task_records(path)
+    assert records[0]['required_actions'] == ['Apply bold', 'Center align']
+    assert (tmp_path / '.cache' / 'tasks.xlsx.tasks.json').exists()
+    assert load_task_records(path) == records
+    assert [name for name in (tmp_path / '.cache').iterdir() if name.name.startswith('.tmp-')] == []
@@ -0,0 +1,25 @@
+import pytest
+
+QtCore = pytest.importorskip('PyQt5.QtCore')
+
+from window_geometry import clamp_rect  # noqa: E402
+
+QRect = QtCore.QRect
+SCREEN = QRect(0, 0, 1920, 1040)
+
+
+def test_window_on_screen_is_left_alone():
+    assert clamp_rect(QRect(100, 100, 800, 600), SCREEN) == QRect(100, 100, 800, 600)
+
+
+def test_window_off_the_side_is_moved_back():
+    assert clamp_rect(QRect(1500, -20, 800, 600), SCREEN) == QRect(1120, 0, 800, 600)
+    assert clamp_rect(QRect(-300, 10, 3000, 600), SCREEN) == QRect(0, 10, 1920, 600)
+
+
+def test_window_off_the_bottom_is_made_shorter():
+    assert clamp_rect(QRect(0, 800, 800, 600), SCREEN) == QRect(0, 800, 800, 240)
+
+
+def test_window_is_moved_up_to_keep_its_minimum_height():
+    assert clamp_rect(QRect(0, 1000, 800, 600), SCREEN, min_height=200) == QRect(0, 840, 800, 200)
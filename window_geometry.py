@@ -0,0 +1,166 @@
+"""Screen geometry and window placement for the exam panel
+
+ScreenGeometry reads every screen's available geometry once and refreshes
+it only when Qt reports a screen added, removed or changed, instead of
+building a QDesktopWidget per lookup. WindowGeometry keeps a window on the
+screen it is over. Move and resize events only restart a short timer, and
+the window is clamped once the drag settles, so there are no moves from
+inside moveEvent. Word is activated at most once per interval while the
+window is being resized, with one last activation after the final resize.
+"""
+import time
+
+from PyQt5.QtCore import QObject, QRect, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+
+SNAP_DELAY_MS = 150
+ACTIVATE_INTERVAL = 0.5  # seconds between Word activations while resizing
+
+
+def clamp_rect(rect, area, min_height=0):
+    """rect moved and shrunk to fit inside area
+
+    Like the panel always did, a window hanging off the bottom is made
+    shorter rather than moved up, down to min_height.
+    """
+    width = min(rect.width(), area.width())
+    x = min(max(rect.x(), area.left()), area.right() + 1 - width)
+    y = max(rect.y(), area.top())
+    height = min(rect.height(), area.bottom() + 1 - y)
+    if height < min_height:
+        height = min(min_height, area.height())
+        y = area.bottom() + 1 - height
+    return QRect(x, y, width, height)
+
+
+class ScreenGeometry(QObject):
+    """Available geometry of every screen, cached until the screens change"""
+
+    changed = pyqtSignal()
+
+    def __init__(self, app=None, parent=None):
+        super().__init__(parent)
+        self.app = app or QApplication.instance()
+        self._screens = []      # (geometry, available geometry) per screen
+        self._primary = QRect()
+        for screen in self.app.screens():
+            self._watch(screen)
+        self.app.screenAdded.connect(self._screen_added)
+        self.app.screenRemoved.connect(lambda screen: self.refresh())
+        self.app.primaryScreenChanged.connect(lambda screen: self.refresh())
+        self.refresh()
+
+    def _watch(self, screen):
+        screen.geometryChanged.connect(lambda rect: self.refresh())
+        screen.availableGeometryChanged.connect(lambda rect: self.refresh())
+
+    def _screen_added(self, screen):
+        self._watch(screen)
+        self.refresh()
+
+    def refresh(self):
+        self._screens = [(screen.geometry(), screen.availableGeometry())
+                         for screen in self.app.screens()]
+        primary = self.app.primaryScreen()
+        self._primary = primary.availableGeometry() if primary else QRect(0, 0, 1024, 768)
+        self.changed.emit()
+
+    @property
+    def primary(self):
+        """Available geometry of the primary screen"""
+        return QRect(self._primary)
+
+    def area_for(self, rect):
+        """Available geometry of the screen rect is on: by its centre, else by most overlap"""
+        center = rect.center()
+        for geometry, available in self._screens:
+            if geometry.contains(center):
+                return QRect(available)
+        best, overlap = self._primary, 0
+        for geometry, available in self._screens:
+            common = geometry.intersected(rect)
+            if common.width() * common.height() > overlap:
+                best, overlap = available, common.width() * common.height()
+        return QRect(best)
+
+
+class WindowGeometry(QObject):
+    """Keeps a window inside its screen, snapped once per drag, and throttles activation"""
+
+    def __init__(self, window, screens, activate, min_height=0,
+                 snap_delay=SNAP_DELAY_MS, activate_interval=ACTIVATE_INTERVAL):
+        super().__init__(window)
+        self.window = window
+        self.screens = screens
+        self.activate = activate
+        self.min_height = min_height
+        self.activate_interval = activate_interval
+        self.snaps = 0          # moves and resizes actually made, for load tests
+        self.activations = 0
+        self._snapping = False
+        self._last_activation = None
+
+        self._snap_timer = QTimer(self)
+        self._snap_timer.setSingleShot(True)
+        self._snap_timer.setInterval(snap_delay)
+        self._snap_timer.timeout.connect(self.snap)
+        self._activate_timer = QTimer(self)
+        self._activate_timer.setSingleShot(True)
+        self._activate_timer.timeout.connect(self._activate_now)
+        screens.changed.connect(self.snap)
+
+    def moved(self):
+        """Call from moveEvent; the window is snapped when the moves stop"""
+        if not self._snapping:
+            self._snap_timer.start()
+
+    def resized(self):
+        """Call from resizeEvent; snaps like a move and keeps Word visible"""
+        self.moved()
+        if not self._snapping:
+            self.request_activation()
+
+    def snap(self):
+        """Fit the window inside the screen it is on"""
+        frame = self.window.frameGeometry()
+        target = clamp_rect(frame, self.screens.area_for(frame), self.min_height)
+        if target == frame:
+            return
+        self._snapping = True
+        try:
+            # The frame adds the same border whatever the size
+            self.window.resize(self.window.width() + target.width() - frame.width(),
+                               self.window.height() + target.height() - frame.height())
+            self.window.move(target.topLeft())
+            self.snaps += 1
+        finally:
+            self._snapping = False
+
+    def dock_bottom(self, x=None):
+        """Put the window at the bottom of its screen, centred unless x is given"""
+        frame = self.window.frameGeometry()
+        area = self.screens.area_for(frame)
+        if x is None:
+            x = area.x() + (area.width() - frame.width()) // 2
+        self._snapping = True
+        try:
+            self.window.move(x, area.bottom() + 1 - frame.height())
+        finally:
+            self._snapping = False
+        self.snap()
+
+    def request_activation(self):
+        """Activate Word now if it has not been lately, else once the interval is up"""
+        now = time.monotonic()
+        if self._last_activation is None or now - self._last_activation >= self.activate_interval:
+            self._activate_now()
+        elif not self._activate_timer.isActive():
+            wait = self.activate_interval - (now - self._last_activation)
+            self._activate_timer.start(int(wait * 1000) + 1)
+
+    def _activate_now(self):
+        self._activate_timer.stop()
+        self._last_activation = time.monotonic()
+        self.activations += 1
+        self.activate()